@@ -1,13 +1,58 @@
-from django.contrib import admin
-from .models import Checklist, ChecklistItem
+from django.contrib import admin, messages
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
+
+from .models import Checklist, ChecklistItem, Owner, ChecklistTemplate, TemplateItem, ArchivedChecklist, EvidenceAttachment
+from .repositories import ChecklistRepository
+from .services import ChecklistService
+
+
+class ChecklistItemInlineFormSet(BaseInlineFormSet):
+    """
+    Only the first max_items items of the checklist - one with thousands of
+    items would otherwise render (and post back) a form row for each.
+    The rest are edited from the item list (see ChecklistAdmin.all_items).
+    """
+    
+    max_items = 50
+    
+    def get_queryset(self):
+        
+        queryset = super().get_queryset()
+        if not queryset.query.is_sliced:
+            # Each row's title names the checklist (ChecklistItem.__str__)
+            self._queryset = queryset = queryset.select_related('checklist')[:self.max_items]
+        return queryset
 
 
 class ChecklistItemInline(admin.TabularInline):
     
     model = ChecklistItem
+    formset = ChecklistItemInlineFormSet
     extra = 1  # Show 1 empty form for adding new items
-    fields = ['title', 'status', 'assigned_owner', 'completed_at']
+    fields = ['title', 'status', 'owner', 'completed_at']
     readonly_fields = ['completed_at']
+    # A dropdown of every owner in each row - use an id lookup instead
+    raw_id_fields = ['owner']
+
+
+class TemplateItemInline(admin.TabularInline):
+    
+    model = TemplateItem
+    extra = 1
+    fields = ['title', 'description', 'owner']
+    raw_id_fields = ['owner']
+
+
+@admin.register(Owner)
+class OwnerAdmin(admin.ModelAdmin):
+    
+    list_display = ['name', 'created_by', 'user', 'created_at']
+    search_fields = ['name', 'user__username']
+    list_select_related = ['created_by', 'user']
+    raw_id_fields = ['created_by', 'user']
+    readonly_fields = ['created_at', 'updated_at']
 
 
 @admin.register(Checklist)
@@ -24,6 +69,16 @@ class ChecklistAdmin(admin.ModelAdmin):
         'completion_display'
     ]
     
+    # Avoid one user query per row
+    list_select_related = ['created_by']
+    
+    # Newest first by primary key: an index scan, where -created_at (plus
+    # the pk tie-breaker the changelist adds) sorts the whole table
+    ordering = ['-id']
+    
+    # "N results (Show all)" would COUNT the whole table on every page
+    show_full_result_count = False
+    
     # Add filters in the right sidebar
     list_filter = ['status', 'due_date', 'created_at']
     
@@ -31,7 +86,7 @@ class ChecklistAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     
     # Fields that are read-only (can't be edited)
-    readonly_fields = ['created_at', 'updated_at', 'created_by']
+    readonly_fields = ['created_at', 'updated_at', 'created_by', 'all_items']
     
     # How to organize fields in the detail view
     fieldsets = (
@@ -44,14 +99,32 @@ class ChecklistAdmin(admin.ModelAdmin):
         ('Ownership', {
             'fields': ('created_by',)
         }),
+        ('Items', {
+            'fields': ('all_items',)
+        }),
     )
     
-    # Show checklist items inline
+    # Show checklist items inline (the first ChecklistItemInlineFormSet.max_items)
     inlines = [ChecklistItemInline]
     
+    actions = ['mark_completed', 'mark_active']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service = ChecklistService()
+    
+    def get_queryset(self, request):
+        
+        # Item counts for the page's rows only, in the same query - not two
+        # COUNTs per row (see ITEM_COUNT_SUBQUERIES)
+        return ChecklistRepository().with_item_count_subqueries(
+            super().get_queryset(request),
+            ['item_count', 'completed_item_count']
+        )
+    
     def item_count(self, obj):
         
-        return obj.items.count()
+        return obj.get_item_count()
     item_count.short_description = 'Items'
     
     def completion_display(self, obj):
@@ -59,6 +132,38 @@ class ChecklistAdmin(admin.ModelAdmin):
         return f"{obj.get_completion_percentage():.1f}%"
     completion_display.short_description = 'Completion'
     
+    def all_items(self, obj):
+        
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:checklists_checklistitem_changelist') + f'?checklist__id__exact={obj.pk}'
+        return format_html(
+            '<a href="{}">All {} items</a> (the first {} are listed below)',
+            url,
+            obj.get_item_count(),
+            ChecklistItemInlineFormSet.max_items
+        )
+    all_items.short_description = 'Items'
+    
+    @admin.action(description='Mark selected checklists as completed')
+    def mark_completed(self, request, queryset):
+        
+        self.set_status(request, queryset, 'completed', 'already completed or with incomplete items')
+    
+    @admin.action(description='Mark selected checklists as active')
+    def mark_active(self, request, queryset):
+        
+        self.set_status(request, queryset, 'active', 'already active')
+    
+    def set_status(self, request, queryset, status, skipped_reason):
+        
+        # A few UPDATE statements, whatever was selected - no save() per checklist
+        selected = queryset.count()
+        updated = self.service.set_status(queryset, status)
+        self.message_user(request, f'{updated} checklist(s) marked as {status}.', messages.SUCCESS)
+        if updated < selected:
+            self.message_user(request, f'{selected - updated} checklist(s) skipped: {skipped_reason}.', messages.WARNING)
+    
     def save_model(self, request, obj, form, change):
         
         if not change:  # If creating a new object
@@ -74,16 +179,28 @@ class ChecklistItemAdmin(admin.ModelAdmin):
         'title',
         'checklist',
         'status',
-        'assigned_owner',
+        'owner',
         'completed_at',
         'created_at'
     ]
     
-    # Add filters
-    list_filter = ['status', 'checklist', 'created_at']
+    # Avoid one owner/checklist query per row
+    list_select_related = ['checklist', 'owner']
+    
+    # Oldest first by primary key, an index scan (see ChecklistAdmin.ordering)
+    ordering = ['id']
+    
+    show_full_result_count = False
+    
+    # Owner and checklist dropdowns would load every row - use id lookups instead
+    raw_id_fields = ['checklist', 'owner']
+    
+    # Add filters - not by checklist: the sidebar would list every checklist.
+    # ?checklist__id__exact=<id> still works (ChecklistAdmin links to it)
+    list_filter = ['status', 'created_at']
     
     # Enable search
-    search_fields = ['title', 'description', 'assigned_owner']
+    search_fields = ['title', 'description', 'owner__name']
     
     # Read-only fields
     readonly_fields = ['created_at', 'updated_at', 'completed_at']
@@ -94,7 +211,7 @@ class ChecklistItemAdmin(admin.ModelAdmin):
             'fields': ('checklist', 'title', 'description')
         }),
         ('Status & Assignment', {
-            'fields': ('status', 'assigned_owner', 'completed_at')
+            'fields': ('status', 'owner', 'completed_at')
         }),
         ('Evidence', {
             'fields': ('evidence_notes',)
@@ -104,3 +221,53 @@ class ChecklistItemAdmin(admin.ModelAdmin):
             'classes': ('collapse',)  # Collapse this section by default
         }),
     )
+
+
+@admin.register(ChecklistTemplate)
+class ChecklistTemplateAdmin(admin.ModelAdmin):
+    
+    list_display = ['name', 'created_by', 'due_in_days', 'recurrence', 'next_run_on', 'updated_at']
+    list_filter = ['recurrence']
+    list_select_related = ['created_by']
+    search_fields = ['name', 'description']
+    readonly_fields = ['created_at', 'updated_at', 'created_by']
+    inlines = [TemplateItemInline]
+    
+    def save_model(self, request, obj, form, change):
+        
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(ArchivedChecklist)
+class ArchivedChecklistAdmin(admin.ModelAdmin):
+    
+    # Archived checklists are read-only - restore them to edit (POST /api/checklists/<id>/restore/)
+    list_display = ['name', 'created_by', 'item_count', 'completed_item_count', 'updated_at', 'archived_at']
+    list_select_related = ['created_by']
+    search_fields = ['name', 'description']
+    # The packed payload is not shown
+    exclude = ['payload']
+    
+    def has_add_permission(self, request):
+        
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        
+        return False
+
+
+@admin.register(EvidenceAttachment)
+class EvidenceAttachmentAdmin(admin.ModelAdmin):
+    
+    list_display = ['filename', 'item', 'content_type', 'uploaded_by', 'created_at']
+    list_select_related = ['item', 'item__checklist', 'uploaded_by']
+    search_fields = ['filename', 'blob__sha256']
+    # Uploaded through the API - stored files are shared, so they are not edited here
+    readonly_fields = ['item', 'blob', 'filename', 'content_type', 'uploaded_by', 'created_at']
+    
+    def has_add_permission(self, request):
+        
+        return False
@@ -12,3 +12,8 @@ class ChecklistsConfig(AppConfig):
     
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'checklists'
+    
+    def ready(self):
+        
+        # Connect the change feed receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,74 @@
+"""
+Hot/cold tiering of completed checklists.
+
+Completed checklists that nobody has touched for ARCHIVE_AFTER_DAYS days
+(365 by default) are moved out of the Checklist and ChecklistItem tables
+into ArchivedChecklist, one row per checklist:
+
+- the columns the checklist list shows (name, status, dates, item counts)
+  stay plain columns, so ?include_archived=1 lists archived checklists
+  next to live ones - same fast list serializer, one UNION ALL query;
+- everything else, every checklist field, every item and every evidence
+  attachment, is packed into one zlib-compressed JSON document that is
+  only unpacked when the checklist is opened or restored. The stored
+  evidence files themselves stay where they are (ArchivedChecklist
+  .evidence_blobs keeps them from being cleared).
+
+The live tables, their indexes and backups stop growing with history.
+Archiving runs in batches (python manage.py archive_checklists, see
+ArchiveService); a restore puts the rows back with their ids, versions
+and timestamps (POST /api/checklists/<id>/restore/).
+
+Archived checklists are read-only. In the change feed they are deleted
+when archived and created again when restored.
+"""
+
+import json
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+
+
+# Archiving is a background job: spend the CPU on a smaller archive
+COMPRESSION_LEVEL = 9
+
+
+def _encode(value):
+
+    # Full precision (DjangoJSONEncoder cuts microseconds), parsed back by the fields' to_python
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def field_names(model):
+    """The columns of a model as values() names them (created_by_id, not created_by)."""
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def pack(checklist, items, attachments=()):
+    """
+    Compress a checklist row with its item and attachment rows (values()
+    dicts). Returns (payload, uncompressed size).
+    """
+    document = {'checklist': checklist, 'items': items, 'attachments': list(attachments)}
+    document = json.dumps(document, default=_encode, separators=(',', ':')).encode()
+    return zlib.compress(document, COMPRESSION_LEVEL), len(document)
+
+
+def unpack(payload):
+    """(checklist row, item rows, attachment rows) of a packed payload."""
+    document = json.loads(zlib.decompress(bytes(payload)))
+    return document['checklist'], document['items'], document.get('attachments', [])
+
+
+def to_instance(model, row):
+    """An unsaved model instance with a packed row's values, converted back by each field."""
+    values = {
+        field.attname: field.to_python(row[field.attname])
+        for field in model._meta.concrete_fields
+        if field.attname in row
+    }
+    return model(**values)
@@ -0,0 +1,487 @@
+"""
+Async views, used when the API is served by compliance_api.asgi.
+
+Under ASGI a regular DRF view runs in a worker thread, which costs a
+thread hop per request and caps concurrency at the thread pool size. The
+read endpoints below are async variants that evaluate the same querysets
+with Django's async ORM (acount, afirst, async for) through the async
+repositories, and produce the same responses:
+
+    GET /api/auth/health/
+    GET /api/stats/
+    GET /api/checklists/            GET /api/checklists/<id>/
+    GET /api/checklists/<id>/items/ GET /api/items/
+
+compliance_api/urls_asgi.py puts them in front of the regular URLs.
+Everything they do not handle - writes, HEAD/OPTIONS, the browsable API -
+goes to the regular DRF view, so behaviour only changes in speed.
+
+The streaming endpoint (/api/events/) is async-only and lives here too.
+"""
+
+import asyncio
+import json
+import logging
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import resolve
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed, NotAcceptable, NotAuthenticated, NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .broker import broker, change_event
+from .conditional import request_validators, not_modified_response, add_validators
+from .exceptions import ValidationError
+from .pagination import ChecklistItemCursorPagination
+from .repositories import AsyncChecklistRepository
+from .serializers import ChecklistItemSerializer, ChecklistStatsSerializer
+from .services import AsyncChecklistService, ChangeService
+from .views import ChecklistViewSet, ChecklistItemViewSet
+
+logger = logging.getLogger(__name__)
+
+
+async def aauthenticate(request, query_param=None):
+    """
+    TokenAuthentication for async views.
+    
+    Returns the user, or None when no token was sent. A bad token raises
+    AuthenticationFailed with DRF's messages. query_param also accepts
+    the token from the query string (for EventSource, which cannot send
+    headers).
+    """
+    key = request.GET.get(query_param) if query_param else None
+    header = request.headers.get('Authorization', '').split()
+    if header and header[0].lower() == 'token':
+        if len(header) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        key = header[1]
+    if not key:
+        return None
+    
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        raise AuthenticationFailed('Invalid token.')
+    if not token.user.is_active:
+        raise AuthenticationFailed('User inactive or deleted.')
+    return token.user
+
+
+def negotiate(request):
+    """
+    Content negotiation as APIView does it: sets the renderer (JSON,
+    MessagePack, CBOR) on the DRF request. Returns False when the request
+    is left to DRF - the browsable API, or no acceptable format (406).
+    """
+    # The browsable API (and ?format=api) is left to DRF
+    if 'text/html' in request.headers.get('Accept', ''):
+        return False
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+    try:
+        renderer, media_type = negotiator.select_renderer(request, renderers, api_settings.URL_FORMAT_OVERRIDE)
+    except (NotAcceptable, Http404):
+        return False
+    if renderer.format == 'api':
+        return False
+    request.accepted_renderer, request.accepted_media_type = renderer, media_type
+    return True
+
+
+def finalize_response(response, request):
+    """Render a DRF Response the way APIView.finalize_response would."""
+    if getattr(response, 'accepted_renderer', None) is not None:
+        # From a regular view (see regular_view) - DRF has finalized it already
+        return response
+    patch_vary_headers(response, ('Accept',))
+    if not isinstance(response, Response):
+        # A 304 - there is nothing to render
+        return response
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = {}
+    return response.render()
+
+
+def handle_exception(exc, request):
+    
+    # Same as APIView.handle_exception: 401s name the auth scheme
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        exc.auth_header = 'Token'
+    response = api_settings.EXCEPTION_HANDLER(exc, {'request': request, 'view': None, 'args': (), 'kwargs': {}})
+    if response is None:
+        raise exc
+    return finalize_response(response, request)
+
+
+async def regular_view(request):
+    """The response of the view the regular URLconf maps request's path to, run in a thread."""
+    request = getattr(request, '_request', request)
+    match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+    return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+def async_read_view(view_func):
+    """
+    Serve GET requests with view_func and everything else with the view
+    the regular URLconf maps the path to.
+    
+    view_func is called as view_func(request, *args, **kwargs) with a DRF
+    Request and returns a DRF Response; exceptions are rendered by the
+    API's exception handler.
+    """
+    @wraps(view_func)
+    async def view(request, *args, **kwargs):
+        
+        drf_request = Request(request) if request.method == 'GET' else None
+        if drf_request is None or not negotiate(drf_request):
+            return await regular_view(request)
+        
+        try:
+            response = await view_func(drf_request, *args, **kwargs)
+        except Exception as exc:
+            return handle_exception(exc, drf_request)
+        return finalize_response(response, drf_request)
+    
+    # DRF views are CSRF exempt (SessionAuthentication enforces it itself);
+    # on Django 4.2 the csrf_exempt decorator would hide that view is async
+    view.csrf_exempt = True
+    return view
+
+
+async def require_user(request):
+    
+    user = await aauthenticate(request)
+    if user is None:
+        raise NotAuthenticated()
+    request.user = user
+    return user
+
+
+def get_viewset(viewset_class, request, action, **kwargs):
+    """A viewset instance for building querysets and serializers - its handlers are not called."""
+    return viewset_class(request=request, action=action, args=(), kwargs=kwargs, format_kwarg=None)
+
+
+async def apaginate_queryset(view, queryset):
+    """
+    PageNumberPagination.paginate_queryset() with the async ORM.
+    
+    The page count is primed with an async COUNT, so the Django paginator
+    never queries; the page itself is fetched with async for.
+    """
+    paginator = view.paginator
+    page_size = paginator.get_page_size(view.request) if paginator is not None else None
+    if not page_size:
+        return None
+    
+    repo = AsyncChecklistRepository()
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Paginator.count is a cached_property - setting it skips the sync count()
+    django_paginator.count = await repo.acount(queryset)
+    
+    page_number = paginator.get_page_number(view.request, django_paginator)
+    try:
+        paginator.page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    paginator.request = view.request
+    return await repo.alist(paginator.page.object_list)
+
+
+async def alist_response(view, aget_freshness, filter_in_thread=False):
+    """ConditionalGetMixin.list() and FastListMixin.list() with the async ORM."""
+    if filter_in_thread:
+        freshness_queryset = await sync_to_async(view.filter_queryset)(view.get_freshness_queryset())
+        queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+    else:
+        freshness_queryset = view.filter_queryset(view.get_freshness_queryset())
+        queryset = view.filter_queryset(view.get_queryset())
+    
+    validators = view.get_validators(await aget_freshness(freshness_queryset))
+    not_modified = not_modified_response(view.request, validators)
+    if not_modified is not None:
+        return not_modified
+    
+    fast_serializer = view.fast_list_serializer_class(
+        context=view.get_serializer_context(),
+        **view.get_sparse_fieldset()
+    )
+    rows = fast_serializer.values_list(queryset)
+    
+    page = await apaginate_queryset(view, rows)
+    if page is not None:
+        response = view.get_paginated_response(fast_serializer.to_representation(page))
+    else:
+        response = Response(fast_serializer.to_representation(await AsyncChecklistRepository().alist(rows)))
+    return add_validators(response, validators)
+
+
+@async_read_view
+async def health_check(request):
+    
+    return Response({
+        'success': True,
+        'message': 'API is running'
+    }, status=status.HTTP_200_OK)
+
+
+@async_read_view
+async def dashboard_stats(request):
+    """Async DashboardStatsView.get()."""
+    user = await require_user(request)
+    try:
+        service = AsyncChecklistService()
+        freshness = await service.aget_dashboard_freshness(user)
+        validators = request_validators(request, freshness, 'stats')
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        
+        stats = await service.aget_dashboard_stats(user, freshness)
+        return add_validators(Response({
+            'success': True,
+            'stats': ChecklistStatsSerializer(stats).data
+        }, status=status.HTTP_200_OK), validators)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_read_view
+async def checklist_list(request):
+    """Async ChecklistViewSet.list()."""
+    await require_user(request)
+    view = get_viewset(ChecklistViewSet, request, 'list')
+    if view.include_archived():
+        # The archive UNION is rare - served by the regular view
+        return await regular_view(request)
+    return await alist_response(view, AsyncChecklistService().aget_freshness)
+
+
+@async_read_view
+async def checklist_detail(request, pk):
+    """Async ChecklistViewSet.retrieve(), including the embedded items page."""
+    await require_user(request)
+    view = get_viewset(ChecklistViewSet, request, 'retrieve', pk=pk)
+    
+    freshness = await AsyncChecklistService().aget_freshness(view.filter_queryset(view.get_freshness_queryset()).filter(pk=pk))
+    validators = view.get_validators(freshness, freshness['version']) if freshness['count'] else None
+    not_modified = not_modified_response(request, validators)
+    if not_modified is not None:
+        return not_modified
+    
+    queryset = view.filter_queryset(view.get_queryset())
+    checklist = await AsyncChecklistRepository().aget_by_id(pk, queryset)
+    if checklist is None:
+        # Maybe archived - the regular view falls back to the archive
+        return await regular_view(request)
+    
+    serializer = view.get_serializer(checklist)
+    await serializer.aload_items_page(checklist)
+    response = Response(serializer.data)
+    return add_validators(view.add_version_etag(response, response.data), validators)
+
+
+@async_read_view
+async def checklist_items(request, pk):
+    """Async ChecklistViewSet.items()."""
+    user = await require_user(request)
+    view = get_viewset(ChecklistViewSet, request, 'items', pk=pk)
+    
+    try:
+        service = AsyncChecklistService()
+        freshness = await service.aget_checklist_freshness(pk, user)
+        validators = view.get_validators(freshness) if freshness['count'] else None
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        
+        statuses = [s for s in request.query_params.get('status', '').split(',') if s]
+        items = await service.aget_checklist_items(pk, user, statuses=statuses)
+        items = view.apply_sparse_fieldset(items, ChecklistItemSerializer)
+        
+        paginator = ChecklistItemCursorPagination()
+        page = await paginator.apaginate_queryset(items, request, view=view)
+        serializer = ChecklistItemSerializer(page, many=True, **view.get_sparse_fieldset())
+        return add_validators(paginator.get_paginated_response(serializer.data), validators)
+    except ValidationError:
+        # Maybe archived - the regular view falls back to the archive
+        return await regular_view(request)
+    except NotFound:
+        # Invalid cursor - rendered as a 404 like the sync view
+        raise
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_read_view
+async def item_list(request):
+    """Async ChecklistItemViewSet.list()."""
+    await require_user(request)
+    # ?checklist= is a model choice filter - validating it queries, so it runs in a thread
+    return await alist_response(
+        get_viewset(ChecklistItemViewSet, request, 'list'),
+        AsyncChecklistService().aget_item_freshness,
+        filter_in_thread=True
+    )
+
+
+
+def format_event(event, data, event_id=None):
+    """One Server-Sent Events message."""
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
+
+
+async def aget_stats_data(user):
+    
+    # Freshness first, so an event sent after a commit never joins a computation from before it
+    service = AsyncChecklistService()
+    stats = await service.aget_dashboard_stats(user, await service.aget_dashboard_freshness(user))
+    return dict(ChecklistStatsSerializer(stats).data)
+
+
+class EventStreamView(View):
+    """
+    Live updates for the user's checklists, as Server-Sent Events.
+    
+    GET /api/events/?token=<token>
+    
+    Events:
+        stats   - dashboard statistics: all of them when the stream opens,
+                  then only the values that changed
+        change  - a change feed entry (see /api/changes/), sent when the
+                  write commits; "id:" is its sequence
+        resync  - the stream fell behind; catch up with
+                  /api/changes/?since=<cursor>
+    
+    EventSource cannot send headers, so the token may be passed as ?token=
+    (an Authorization: Token header works too). Reconnecting browsers send
+    Last-Event-ID and get the changes they missed first.
+    
+    Needs the ASGI server (compliance_api.asgi): an idle stream is one
+    coroutine and a small queue, no thread. Django 4.2 does not notice a
+    client that went away mid-stream, so streams end after
+    EVENTS_STREAM_MAX_AGE seconds and the browser reconnects.
+    """
+    
+    async def get(self, request):
+        
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({
+                'success': False,
+                'error': 'Live updates need the ASGI server (compliance_api.asgi)'
+            }, status=status.HTTP_501_NOT_IMPLEMENTED)
+        
+        try:
+            user = await aauthenticate(request, query_param='token')
+        except AuthenticationFailed:
+            user = None
+        if user is None:
+            return JsonResponse({
+                'success': False,
+                'error': 'Invalid or missing token'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        
+        response = StreamingHttpResponse(
+            self.stream(user, last_event_id),
+            content_type='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    async def stream(self, user, last_event_id):
+        
+        loop = asyncio.get_running_loop()
+        heartbeat = getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15)
+        debounce = getattr(settings, 'EVENTS_STATS_DEBOUNCE', 0.5)
+        closes_at = loop.time() + getattr(settings, 'EVENTS_STREAM_MAX_AGE', 300)
+        
+        # Subscribe before reading anything, so no commit falls in between
+        subscription = broker.subscribe(user.id)
+        try:
+            yield f"retry: {getattr(settings, 'EVENTS_RETRY_MS', 3000)}\n\n"
+            
+            # Replay what was missed while disconnected
+            cursor = last_event_id or 0
+            if last_event_id is not None:
+                changes, has_more = await sync_to_async(ChangeService().get_missed_changes)(user, last_event_id)
+                if has_more:
+                    yield format_event('resync', {'cursor': str(cursor)})
+                else:
+                    for change in changes:
+                        cursor = change.id
+                        yield format_event('change', change_event(change), change.id)
+            
+            stats = await aget_stats_data(user)
+            yield format_event('stats', stats)
+            
+            while (remaining := closes_at - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    # Comment line - keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                    continue
+                
+                # Let a burst of writes settle, then send one stats delta for all of it
+                stats_due = loop.time() + debounce
+                while True:
+                    if subscription.overflowed:
+                        break
+                    if event['sequence'] > cursor:
+                        cursor = event['sequence']
+                        yield format_event('change', event, cursor)
+                    wait = stats_due - loop.time()
+                    if wait <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(subscription.get(), wait)
+                    except asyncio.TimeoutError:
+                        break
+                
+                if subscription.overflowed:
+                    # Events were dropped - the change feed has them all
+                    subscription.overflowed = False
+                    while not subscription.queue.empty():
+                        subscription.get_nowait()
+                    yield format_event('resync', {'cursor': str(cursor)})
+                
+                try:
+                    fresh = await aget_stats_data(user)
+                except Exception:
+                    logger.exception('Could not compute stats for the event stream')
+                    continue
+                delta = {name: value for name, value in fresh.items() if stats.get(name) != value}
+                stats = fresh
+                if delta:
+                    yield format_event('stats', delta)
+        finally:
+            broker.unsubscribe(subscription)
@@ -0,0 +1,194 @@
+"""
+Batch requests: several API operations in one round trip (POST /api/batch/).
+
+The checklist detail page needs the checklist, its items, the stats and
+the current user - four round trips, each paying for the network latency,
+the middleware chain and token authentication. A batch sends them as one
+request:
+
+    {"requests": [
+        {"id": "detail", "method": "GET", "path": "/api/checklists/5/"},
+        {"id": "item", "method": "PATCH", "path": "/api/items/9/", "body": {"status": "completed"},
+         "headers": {"If-Match": "\"3\""}}
+    ]}
+
+Each sub-request is resolved with the URL resolver and handed straight to
+its DRF view, as the batch's already authenticated user - no middleware,
+no second authentication. The views behave exactly as they do for a
+separate request (permissions, validation, If-Match, Idempotency-Key,
+conditional GET), and the results come back together, in order:
+
+    {"responses": [{"id": "detail", "status": 200, "headers": {...}, "body": {...}}, ...]}
+
+With "atomic": true the sub-requests share one transaction. The first
+one that fails (status >= 400) rolls all of them back, and the ones after
+it are not run (status 424).
+
+Only /api/ paths served by DRF views can be batched - not the batch
+endpoint itself and not the live updates stream.
+"""
+
+import json
+import logging
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.response import Response
+
+from .identity_map import identity_map_scope
+
+logger = logging.getLogger(__name__)
+
+
+# Status of the sub-requests skipped after a failure in an atomic batch
+FAILED_DEPENDENCY = 424
+
+# Request metadata the sub-requests inherit from the batch request
+INHERITED_META = (
+    'SERVER_NAME',
+    'SERVER_PORT',
+    'SERVER_PROTOCOL',
+    'REMOTE_ADDR',
+    'HTTP_HOST',
+    'HTTP_X_FORWARDED_PROTO',
+    'HTTP_ACCEPT_LANGUAGE',
+    'HTTP_USER_AGENT',
+    'wsgi.url_scheme',
+)
+
+
+def get_max_requests():
+    return getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+
+
+class BatchError(Exception):
+    """A sub-request that can't be dispatched (unknown or unbatchable path)."""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def build_request(parent, operation):
+    """A Django request for one operation, authenticated as the batch request's user."""
+    url = urlsplit(operation['path'])
+    body = b''
+    if operation.get('body') is not None:
+        body = json.dumps(operation['body']).encode()
+
+    request = HttpRequest()
+    request.method = operation['method']
+    request.path = request.path_info = url.path
+    request.META = {key: parent.META[key] for key in INHERITED_META if key in parent.META}
+    request.META.update({
+        'REQUEST_METHOD': operation['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        # Results are embedded in the JSON batch response
+        'HTTP_ACCEPT': 'application/json',
+    })
+    for name, value in (operation.get('headers') or {}).items():
+        request.META['HTTP_' + name.upper().replace('-', '_')] = value
+    request.GET = QueryDict(url.query)
+    request.COOKIES = parent.COOKIES
+    request._stream = BytesIO(body)
+    request._read_started = False
+
+    # DRF uses these instead of running the authentication classes again
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    return request
+
+
+def resolve_view(path):
+
+    if not path.startswith('/api/'):
+        raise BatchError(400, 'Only /api/ paths can be batched')
+    try:
+        match = resolve(path, urlconf=settings.ROOT_URLCONF)
+    except Resolver404:
+        raise BatchError(404, 'Not found')
+
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None or getattr(view_class, 'batchable', True) is False or getattr(view_class, 'view_is_async', False):
+        raise BatchError(400, f'{path} cannot be batched')
+    return match
+
+
+def result(operation, status_code, body, headers=None):
+
+    return {
+        'id': operation.get('id'),
+        'status': status_code,
+        'headers': headers or {},
+        'body': body,
+    }
+
+
+def response_body(response):
+
+    # DRF responses are not rendered yet - their data is embedded as is
+    if isinstance(response, Response):
+        return response.data
+    if not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset, errors='replace')
+
+
+def dispatch(parent, operation):
+    """Run one operation; returns its result entry (a 500 if the view raised)."""
+    try:
+        match = resolve_view(urlsplit(operation['path']).path)
+    except BatchError as e:
+        return result(operation, e.status_code, {'success': False, 'error': e.message})
+
+    request = build_request(parent, operation)
+    request.resolver_match = match
+    try:
+        # Each sub-request is a request of its own - including its identity map
+        with identity_map_scope():
+            response = match.func(request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('Batch operation %s %s failed', operation['method'], operation['path'])
+        return result(operation, 500, {'success': False, 'error': 'Internal server error'})
+
+    headers = {name: value for name, value in response.items() if name not in ('Content-Type', 'Vary', 'Allow')}
+    return result(operation, response.status_code, response_body(response), headers)
+
+
+def run_batch(parent, operations, atomic=False):
+    """
+    Dispatch the operations in order. Returns (results, rolled_back).
+
+    Without atomic, every operation runs and commits on its own, whatever
+    happens to the others.
+    """
+    if not atomic:
+        return [dispatch(parent, operation) for operation in operations], False
+
+    results = []
+    rolled_back = False
+    with transaction.atomic():
+        for operation in operations:
+            if rolled_back:
+                results.append(result(operation, FAILED_DEPENDENCY, {
+                    'success': False,
+                    'error': 'Not run: an earlier request in the atomic batch failed'
+                }))
+                continue
+            entry = dispatch(parent, operation)
+            results.append(entry)
+            if entry['status'] >= 400:
+                # Undo what the earlier operations wrote; skip the rest
+                transaction.set_rollback(True)
+                rolled_back = True
+    return results, rolled_back
@@ -0,0 +1,217 @@
+"""
+In-process event broker for live updates (/api/events/).
+
+Each open event stream subscribes with its user id and gets a small
+asyncio queue. When a write commits, the change feed rows it recorded are
+published to the owner's subscribers. Publishing happens on whatever
+thread ran the request, so delivery hops onto the subscriber's event loop
+with call_soon_threadsafe - the loop itself never blocks on a lock held by
+a request thread for more than a dict lookup.
+
+The broker only knows the subscribers of its own process. A backend
+decides how a published event reaches every process:
+
+    LocalBackend - deliver in this process only (one ASGI worker, dev)
+    RedisBackend - publish on a Redis channel; every worker listens and
+                   delivers to its own subscribers (needs redis-py)
+
+Settings:
+    EVENTS_BACKEND    - dotted path of the backend class
+    EVENTS_REDIS_URL  - Redis connection URL for RedisBackend
+    EVENTS_QUEUE_SIZE - events buffered per stream before it must resync
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One event stream's queue. Created and read on the stream's event loop."""
+
+    # Tens of thousands of these can be alive at once
+    __slots__ = ('user_id', 'loop', 'queue', 'overflowed')
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+
+        # A stream that fell this far behind is told to resync from the change feed
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        return await self.queue.get()
+
+    def get_nowait(self):
+        return self.queue.get_nowait()
+
+
+class LocalBackend:
+    """Deliver events to the subscribers of this process only."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def start(self):
+        pass
+
+    def publish(self, user_id, event):
+        self.broker.deliver(user_id, event)
+
+
+class RedisBackend:
+    """
+    Fan out through a Redis pub/sub channel.
+
+    publish() sends to Redis only; a listener thread started with the
+    first subscriber delivers every message - including this process's
+    own - to the local subscribers.
+    """
+
+    channel = 'checklists:events'
+
+    def __init__(self, broker):
+        if redis is None:
+            raise ImportError('RedisBackend needs the redis package (pip install redis)')
+        self.broker = broker
+        self.client = redis.Redis.from_url(getattr(settings, 'EVENTS_REDIS_URL', 'redis://localhost:6379/0'))
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def start(self):
+
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self.listen, name='events-redis', daemon=True)
+                self._listener.start()
+
+    def publish(self, user_id, event):
+        self.client.publish(self.channel, json.dumps({'user': user_id, 'event': event}))
+
+    def listen(self):
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            try:
+                payload = json.loads(message['data'])
+                self.broker.deliver(payload['user'], payload['event'])
+            except Exception:
+                logger.exception('Dropped malformed event message')
+
+
+class EventBroker:
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._backend = None
+
+    @property
+    def backend(self):
+
+        if self._backend is None:
+            backend_class = import_string(getattr(settings, 'EVENTS_BACKEND', 'checklists.broker.LocalBackend'))
+            self._backend = backend_class(self)
+        return self._backend
+
+    def subscribe(self, user_id):
+        """Register a stream for user_id. Must be called from the stream's event loop."""
+        self.backend.start()
+        subscription = Subscription(user_id, getattr(settings, 'EVENTS_QUEUE_SIZE', 100))
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id, event):
+        self.backend.publish(user_id, event)
+
+    def deliver(self, user_id, event):
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The stream's loop has shut down - nothing left to deliver to
+                self.unsubscribe(subscription)
+
+
+broker = EventBroker()
+
+
+def make_event(sequence, resource, object_id, checklist_id, action, version):
+    """The push payload of a change - the same fields as ChangeSerializer."""
+    return {
+        'sequence': sequence,
+        'resource': resource,
+        'id': object_id,
+        'checklist': checklist_id,
+        'action': action,
+        'version': version,
+    }
+
+
+def change_event(change):
+
+    return make_event(change.id, change.resource, change.object_id, change.checklist_id, change.action, change.version)
+
+
+def publish_changes_on_commit(changes):
+    """
+    Publish Change rows to their owners' streams once the transaction commits.
+
+    Rolled back writes are never announced. Outside a transaction the
+    events go out at once. A failing backend is logged, never raised into
+    the request that made the change.
+    """
+    publish_events_on_commit([(change.user_id, change_event(change)) for change in changes])
+
+
+def publish_events_on_commit(events):
+    """publish_changes_on_commit() for (user_id, event) pairs already built with make_event()."""
+    if events:
+        # One callback per batch - bulk writes record thousands of changes
+        transaction.on_commit(partial(publish_events, events), robust=True)
+
+
+def publish_events(events):
+
+    for user_id, event in events:
+        broker.publish(user_id, event)
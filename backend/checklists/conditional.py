@@ -0,0 +1,122 @@
+"""
+HTTP conditional GET (ETag / Last-Modified) for the read endpoints.
+
+A client that refreshes a checklist it already has sends back the ETag
+(If-None-Match) or Last-Modified (If-Modified-Since) of its copy and gets
+an empty 304 when nothing changed. The validators are not a hash of the
+body: they come from one aggregate query over the rows the response is
+built from - row counts and the newest updated_at of the checklists,
+their items and the items' owners (see ChecklistRepository.get_freshness).
+So a 304 is decided before anything is loaded or serialized.
+
+- Counts catch deletes, which leave no updated_at behind. Last-Modified
+  can't, so only responses built from one row with nothing embedded
+  (item detail) send it; lists and checklist detail rely on the ETag.
+- The query string is part of the ETag: ?fields=, ?page_size=, ?ordering=,
+  ?cursor= and filters all change the body. Parameters are sorted by name,
+  so their order in the URL doesn't matter.
+- Today's date is part of the ETag, and Last-Modified is never before
+  today's midnight (UTC): is_overdue changes without any write.
+- Single objects keep their version in front ("3.5f0c..."), so the ETag
+  of a GET can be sent back in If-Match (see VersionETagMixin).
+
+Responses are "Cache-Control: private, no-cache": browsers keep them but
+revalidate on every use, and shared caches don't store them.
+"""
+
+import hashlib
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class Validators:
+    """The ETag and (optionally) Last-Modified of a response."""
+
+    __slots__ = ('etag', 'last_modified')
+
+    def __init__(self, etag, last_modified=None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def timestamp(self):
+
+        if self.last_modified is None:
+            return None
+        return int(self.last_modified.timestamp())
+
+
+def make_validators(freshness, *scope, version=None, last_modified=False):
+    """
+    Validators for a response built from the rows described by freshness.
+
+    freshness is a get_freshness() dict; scope is whatever else the body
+    depends on (action, user, renderer format, query string). With
+    version, the ETag starts with it. last_modified adds a Last-Modified -
+    only for responses whose rows can't be deleted without a 404.
+    """
+    now = timezone.now()
+    fingerprint = repr((sorted(freshness.items()), scope, now.date()))
+    digest = hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+    etag = f'"{version}.{digest}"' if version is not None else f'"{digest}"'
+    if not last_modified:
+        return Validators(etag)
+
+    midnight = datetime.combine(now.date(), time.min, tzinfo=now.tzinfo)
+    timestamps = [value for value in freshness.values() if isinstance(value, datetime)]
+    return Validators(etag, max(timestamps + [midnight]))
+
+
+def query_scope(request):
+    """The query parameters, sorted by name - values keep their order."""
+    return tuple(sorted((name, tuple(values)) for name, values in request.query_params.lists()))
+
+
+def request_validators(request, freshness, *scope, version=None, last_modified=False):
+    """
+    make_validators() for a DRF request: the user, the renderer and the
+    query string are part of the scope. None for the browsable API, whose
+    pages also depend on the request itself.
+    """
+    renderer_format = request.accepted_renderer.format
+    if renderer_format == 'api':
+        return None
+    return make_validators(
+        freshness,
+        request.user.pk,
+        renderer_format,
+        query_scope(request),
+        *scope,
+        version=version,
+        last_modified=last_modified
+    )
+
+
+def not_modified_response(request, validators):
+    """
+    A 304 (or, for a failed If-Match, a 412) if the request's conditional
+    headers are satisfied by validators; None when the body must be sent.
+    """
+    if validators is None:
+        return None
+    response = get_conditional_response(
+        request,
+        etag=validators.etag,
+        last_modified=validators.timestamp
+    )
+    if response is not None and response.status_code == 304:
+        add_validators(response, validators)
+    return response
+
+
+def add_validators(response, validators):
+
+    if validators is not None and response.status_code in (200, 304):
+        response['ETag'] = validators.etag
+        if validators.last_modified is not None:
+            response['Last-Modified'] = http_date(validators.timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,299 @@
+"""
+Evidence file storage: streaming uploads, content-addressed dedupe and
+range downloads.
+
+Files are stored once per content, under their SHA-256, in EVIDENCE_ROOT:
+
+    evidence/ab/cd/abcd1234...      one file per distinct content
+    evidence/tmp/                   uploads in progress
+
+An EvidenceBlob row describes each stored file and an EvidenceAttachment
+row links it to an item under the name it was uploaded with - the same
+policy PDF attached to 300 items is one file and 300 small rows.
+
+Uploads (POST /api/items/<id>/attachments/, multipart "file") never pass
+through memory as a whole: HashingUploadHandler writes each chunk to a
+temporary file next to the store and feeds it to the hash as it arrives,
+and store() then renames the file into place - or drops it when that
+content is stored already. Nothing is read back to hash or copy it.
+
+Downloads (GET /api/attachments/<id>/download/) are FileResponses over the
+stored file, so the WSGI server's file wrapper (sendfile() on gunicorn)
+sends it without Python reading it. Single byte ranges (Range: bytes=...)
+get a 206, so interrupted downloads resume. With EVIDENCE_ACCEL_REDIRECT
+set, nginx (X-Accel-Redirect) serves the file and the ranges itself.
+
+Stored files that no attachment uses any more are removed when their last
+attachment is deleted, or by python manage.py clear_evidence.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.http import FileResponse, HttpResponse
+from django.http.request import QueryDict
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.datastructures import MultiValueDict
+from django.utils.http import content_disposition_header
+
+
+# The multipart field the file is uploaded in
+UPLOAD_FIELD = 'file'
+
+# Bigger chunks than Django's 64 KB: fewer write() and hash update() calls per file
+UPLOAD_CHUNK_SIZE = 256 * 2**10
+
+# bytes=<start>-<end>, bytes=<start>- and bytes=-<suffix length>
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_evidence_root():
+
+    return Path(getattr(settings, 'EVIDENCE_ROOT', settings.BASE_DIR / 'evidence'))
+
+
+def get_max_upload_size():
+
+    return getattr(settings, 'EVIDENCE_MAX_UPLOAD_SIZE', 50 * 2**20)
+
+
+def blob_path(sha256):
+    """Where the content with this hash is stored - two directory levels keep directories small."""
+    return get_evidence_root() / sha256[:2] / sha256[2:4] / sha256
+
+
+class HashedUploadedFile(UploadedFile):
+    """An upload written to a temporary file in the store, with its SHA-256."""
+
+    def __init__(self, file, name, content_type, size, charset, content_type_extra, sha256):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+
+        return self.file.name
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Streams the "file" field of a multipart upload to a temporary file in the
+    store, hashing it chunk by chunk. Other files in the form are skipped.
+
+    Requests larger than the upload limit are turned down before their body
+    is read (too_large is set and no file comes out).
+    """
+
+    chunk_size = UPLOAD_CHUNK_SIZE
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or get_max_upload_size()
+        self.too_large = False
+        self.temp_file = None
+        self.digest = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+
+        # The multipart envelope adds a few hundred bytes at most
+        if content_length > self.max_size + 64 * 2**10:
+            self.too_large = True
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, *args, **kwargs):
+
+        super().new_file(field_name, *args, **kwargs)
+        if field_name != UPLOAD_FIELD or self.temp_file is not None or self.too_large:
+            raise SkipFile()
+
+        temp_dir = get_evidence_root() / 'tmp'
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        # Same file system as the store, so store() is a rename
+        self.temp_file = tempfile.NamedTemporaryFile(dir=temp_dir, delete=False)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+
+        if start + len(raw_data) > self.max_size:
+            self.too_large = True
+            self.discard()
+            raise SkipFile()
+        self.temp_file.write(raw_data)
+        self.digest.update(raw_data)
+        # Stored - nothing left for other handlers
+        return None
+
+    def file_complete(self, file_size):
+
+        if self.temp_file is None or self.too_large:
+            return None
+        self.temp_file.flush()
+        self.temp_file.seek(0)
+        return HashedUploadedFile(
+            self.temp_file,
+            self.file_name,
+            self.content_type or 'application/octet-stream',
+            file_size,
+            self.charset,
+            self.content_type_extra,
+            self.digest.hexdigest()
+        )
+
+    def upload_interrupted(self):
+
+        self.discard()
+
+    def discard(self):
+
+        if self.temp_file is not None:
+            discard(self.temp_file)
+            self.temp_file = None
+
+
+def discard(file):
+    """Close and delete an upload's temporary file (one that was stored is gone already)."""
+    # An uploaded file's name is the client's file name, not where it is
+    path = file.temporary_file_path() if hasattr(file, 'temporary_file_path') else file.name
+    file.close()
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def store(uploaded_file):
+    """
+    Move an upload into the store under its hash. Returns False (and drops
+    the upload) when that content is stored already.
+    """
+    path = blob_path(uploaded_file.sha256)
+    if path.exists():
+        discard(uploaded_file)
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    uploaded_file.close()
+    # Atomic: a concurrent upload of the same content replaces it with identical bytes
+    os.replace(uploaded_file.temporary_file_path(), path)
+    if settings.FILE_UPLOAD_PERMISSIONS is not None:
+        os.chmod(path, settings.FILE_UPLOAD_PERMISSIONS)
+    return True
+
+
+def remove(sha256):
+
+    try:
+        os.unlink(blob_path(sha256))
+    except FileNotFoundError:
+        pass
+
+
+def clear_temp(max_age):
+    """Delete uploads left in tmp/ by interrupted processes, older than max_age seconds."""
+    temp_dir = get_evidence_root() / 'tmp'
+    if not temp_dir.is_dir():
+        return 0
+    cutoff = time.time() - max_age
+    deleted = 0
+    for path in temp_dir.iterdir():
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            deleted += 1
+    return deleted
+
+
+class RangeFile:
+    """The first length bytes of a file from its current position - what a bounded range sends."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single "bytes=" range, inclusive; None to send the whole
+    file (no range, several ranges or another unit); ValueError if the range
+    can't be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # The last n bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def download_response(request, path, size, content_type, filename, etag):
+    """
+    A FileResponse of the stored file at path: 304 for a matching
+    If-None-Match, 206 for a single satisfiable Range (ignored when If-Range
+    doesn't match), 416 for an unsatisfiable one.
+    """
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    byte_range = None
+    if request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    accel_redirect = getattr(settings, 'EVIDENCE_ACCEL_REDIRECT', None)
+    if accel_redirect:
+        # The front end server sends the file (and handles Range itself)
+        response = HttpResponse(content_type=content_type)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        response['X-Accel-Redirect'] = f"{accel_redirect.rstrip('/')}/{path.relative_to(get_evidence_root()).as_posix()}"
+    elif byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        file = open(path, 'rb')
+        file.seek(start)
+        # Up to the end of the file the file itself is sent (sendfile() still applies)
+        body = file if end == size - 1 else RangeFile(file, end - start + 1)
+        response = FileResponse(body, status=206, as_attachment=True, filename=filename, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    # Ranges and the strong ETag describe the stored bytes (see CompressionMiddleware)
+    response.skip_compression = True
+    # The content behind an attachment never changes
+    patch_cache_control(response, private=True, max_age=31536000, immutable=True)
+    return response
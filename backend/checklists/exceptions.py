@@ -31,6 +31,15 @@ class PermissionDeniedException(Exception):
         super().__init__(self.message)
 
 
+class ConcurrencyError(Exception):
+    
+    # Raised when If-Match doesn't match the row's current version
+    def __init__(self, resource, current_version=None):
+        self.message = f"{resource} was modified by someone else. Reload it and try again."
+        self.current_version = current_version
+        super().__init__(self.message)
+
+
 def custom_exception_handler(exc, context):
 
     # Call REST framework's default exception handler first to get the standard error response
@@ -40,6 +49,10 @@ def custom_exception_handler(exc, context):
     if response is not None:
         return response
     
+    # Stale If-Match - an expected outcome of optimistic concurrency, not worth logging
+    if isinstance(exc, ConcurrencyError):
+        return precondition_failed_response(exc)
+    
     # Log the exception for debugging purposes
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
     
@@ -183,3 +196,18 @@ def custom_exception_handler(exc, context):
         },
         status=status.HTTP_500_INTERNAL_SERVER_ERROR
     )
+
+
+def precondition_failed_response(exc):
+    
+    response = Response(
+        {
+            'success': False,
+            'error': exc.message,
+            'current_version': exc.current_version
+        },
+        status=status.HTTP_412_PRECONDITION_FAILED
+    )
+    if exc.current_version is not None:
+        response['ETag'] = f'"{exc.current_version}"'
+    return response
@@ -0,0 +1,165 @@
+"""
+Read-only fast serialization for list endpoints.
+
+A ModelSerializer builds a model instance per row and then walks every
+field object for every instance. For list endpoints that dominates the
+CPU time. The classes here produce exactly the same output, but:
+
+1. fetch plain tuples with values_list() (annotations included), and
+2. map each tuple to a dict with converters compiled once per request.
+
+Plain fields reuse the DRF field's own to_representation (or no conversion
+at all when DRF would return the value unchanged), and computed fields
+mirror the SerializerMethodField they replace. The result is the same
+JSON, byte for byte, as the serializer it stands in for.
+"""
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import ChecklistListSerializer, ChecklistItemSerializer
+
+
+# DRF fields whose to_representation returns database values unchanged
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesListSerializer:
+    """
+    Base class: reproduce serializer_class's output from values_list() rows.
+
+    Subclasses add compile_<field>() for fields that are not plain model
+    columns. Each returns a function taking a row tuple; self.column(name)
+    registers a column or annotation and returns its index in the row.
+    """
+
+    serializer_class = None
+
+    def __init__(self, fields=None, exclude=None, context=None):
+        self.context = context or {}
+        self.columns = []
+
+        template = self.serializer_class(context=self.context)
+        names = template.select_field_names(template.fields, fields, exclude)
+        self.field_names = names
+        self.converters = [self.compile_field(name, template.fields[name]) for name in names]
+
+    def column(self, name):
+
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def compile_field(self, name, field):
+
+        custom = getattr(self, f'compile_{name}', None)
+        if custom is not None:
+            return custom()
+
+        index = self.column(field.source.replace('.', '__'))
+        if isinstance(field, IDENTITY_FIELDS):
+            return lambda row: row[index]
+        if isinstance(field, serializers.DateTimeField):
+            return self.compile_datetime(index, field)
+
+        # Same as Serializer.to_representation: None is passed through as-is
+        to_representation = field.to_representation
+        return lambda row: None if row[index] is None else to_representation(row[index])
+
+    def compile_datetime(self, index, field):
+
+        # DateTimeField.to_representation looks up the timezone on every call;
+        # resolve it once and keep DRF's ISO 8601 formatting ("Z" for UTC)
+        to_representation = field.to_representation
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return lambda row: None if row[index] is None else to_representation(row[index])
+
+        def convert(row):
+            value = row[index]
+            if value is None:
+                return None
+            if value.utcoffset() is None:
+                return to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    def add_column_field(self, name):
+        """Also output a column or annotation that is not a serializer field, as it is."""
+        index = self.column(name)
+        self.field_names.append(name)
+        self.converters.append(lambda row: row[index])
+
+    def values_list(self, queryset):
+
+        # Prefetches and deferred loading do not apply to tuples
+        return queryset.prefetch_related(None).values_list(*self.columns)
+
+    def to_representation(self, rows):
+
+        names, converters = self.field_names, self.converters
+        return [
+            dict(zip(names, [convert(row) for convert in converters]))
+            for row in rows
+        ]
+
+
+class ChecklistListValuesSerializer(ValuesListSerializer):
+    """Same output as ChecklistListSerializer, for annotated checklist querysets."""
+
+    serializer_class = ChecklistListSerializer
+
+    def compile_is_overdue(self):
+
+        due_date, status = self.column('due_date'), self.column('status')
+        today = timezone.now().date()
+        return lambda row: (
+            row[due_date] is not None and row[status] != 'completed' and row[due_date] < today
+        )
+
+    def compile_completion_percentage(self):
+
+        # Mirrors Checklist.get_completion_percentage()
+        status = self.column('status')
+        total, completed = self.column('item_count'), self.column('completed_item_count')
+
+        def convert(row):
+            if row[total] == 0:
+                return 100.0 if row[status] == 'completed' else 0.0
+            return (row[completed] / row[total]) * 100
+        return convert
+
+    def compile_total_items(self):
+
+        index = self.column('item_count')
+        return lambda row: row[index]
+
+    def compile_completed_items(self):
+
+        index = self.column('completed_item_count')
+        return lambda row: row[index]
+
+
+class ChecklistItemValuesSerializer(ValuesListSerializer):
+    """Same output as ChecklistItemSerializer."""
+
+    serializer_class = ChecklistItemSerializer
+
+    def compile_assigned_owner(self):
+
+        index = self.column('owner__name')
+        return lambda row: row[index] or ''
+
+    def compile_is_completed(self):
+
+        index = self.column('status')
+        return lambda row: row[index] in ('completed', 'not-applicable')
@@ -0,0 +1,150 @@
+"""
+Idempotency-Key support for mutating endpoints.
+
+Clients on flaky networks retry POSTs whose response they never received.
+When such a request carries an Idempotency-Key header, the first response
+is stored (per user and key) for IDEMPOTENCY_KEY_TTL seconds, and a retry
+with the same key gets that stored response back - the service layer is
+not called again. The replayed response carries the stored ETag, Location
+and Last-Modified headers and an "Idempotent-Replayed: true" header.
+
+- A duplicate that arrives while the first request is still running waits
+  for it (up to IDEMPOTENCY_WAIT_TIMEOUT seconds, then 409).
+- Reusing a key for a different request (method, path or body) is a 422.
+- 5xx responses and exceptions raised by the view are not stored, so
+  those requests can be retried.
+
+Requests without the header are not affected.
+"""
+
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .repositories import IdempotencyKeyRepository
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+# Response headers stored with the body and replayed with it
+STORED_HEADERS = ('ETag', 'Location', 'Last-Modified')
+
+# Same length as IdempotencyKey.key
+MAX_KEY_LENGTH = 255
+
+# Polling interval while waiting for an in-flight duplicate (doubles up to the max)
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+
+def get_ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+
+def get_wait_timeout():
+    return getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 10)
+
+
+def request_fingerprint(request):
+    """sha256 of what makes two requests "the same": method, path and body."""
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), request.body):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def error_response(message, status_code):
+    return Response({'success': False, 'error': message}, status=status_code)
+
+
+def stored_headers(response):
+    return {name: response[name] for name in STORED_HEADERS if response.has_header(name)}
+
+
+def replay_response(record):
+
+    body = bytes(record.response_body or b'')
+    response = Response(json.loads(body) if body else None, status=record.response_status)
+    for name, value in (record.response_headers or {}).items():
+        response[name] = value
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    """
+    Decorator for view methods (def method(self, request, ...)) that honours Idempotency-Key.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        
+        if len(key) > MAX_KEY_LENGTH:
+            return error_response(
+                f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters',
+                status.HTTP_400_BAD_REQUEST
+            )
+        
+        repository = IdempotencyKeyRepository()
+        fingerprint = request_fingerprint(request)
+        deadline = time.monotonic() + get_wait_timeout()
+        interval = POLL_INTERVAL
+        
+        record, created = repository.claim(request.user, key, fingerprint, get_ttl())
+        while not created:
+            if record is None:
+                # The first request failed and released the key - run this one instead
+                record, created = repository.claim(request.user, key, fingerprint, get_ttl())
+                continue
+            
+            if record.fingerprint != fingerprint:
+                return error_response(
+                    f'{IDEMPOTENCY_HEADER} was already used for a different request',
+                    status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            
+            if record.is_completed():
+                return replay_response(record)
+            
+            # Still in flight - wait for it instead of executing twice
+            if time.monotonic() >= deadline:
+                response = error_response(
+                    'A request with this Idempotency-Key is still in progress',
+                    status.HTTP_409_CONFLICT
+                )
+                response['Retry-After'] = '1'
+                return response
+            
+            time.sleep(interval)
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+            record = repository.get(request.user, key)
+        
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            repository.release(record)
+            raise
+        
+        if response.status_code >= 500:
+            repository.release(record)
+        else:
+            repository.complete(
+                record,
+                response.status_code,
+                JSONRenderer().render(response.data),
+                stored_headers(response)
+            )
+        return response
+    
+    return wrapper
@@ -0,0 +1,113 @@
+"""
+Request-scoped identity map for the repositories.
+
+A write request used to load the same checklist several times: the view's
+get_object(), then the service (get_checklist_by_id_for_user), each with
+its own query. Within a request, the repositories now remember the rows
+they loaded - one instance per (model, id) - and hand that instance out
+again instead of querying:
+
+    ChecklistRepository().get_by_id_for_user(5, user)   # SELECT
+    ChecklistRepository().get_by_id_for_user(5, user)   # same instance, no query
+
+The map lives for one request (IdentityMapMiddleware); outside a request
+(management commands, the shell) there is none and every call queries.
+Writes made through the repositories update the mapped instance in place
+(see conditional_update) and deletes remove it, so it stays current for
+the rest of the request. Only fully loaded instances are kept - a
+projection with deferred fields is never handed out as a whole row.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+
+_current = ContextVar('identity_map', default=None)
+
+
+class IdentityMap:
+
+    def __init__(self):
+        self._instances = {}
+
+    def _key(self, model, pk):
+        """(model, normalized pk), or None for a pk that can't be an id ("abc")."""
+        try:
+            pk = model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+        return (model._meta.label, pk) if pk is not None else None
+
+    def get(self, model, pk):
+
+        key = self._key(model, pk)
+        return self._instances.get(key) if key is not None else None
+
+    def add(self, instance):
+
+        if instance is None or instance.pk is None or instance.get_deferred_fields():
+            return instance
+        self._instances[(instance._meta.label, instance.pk)] = instance
+        return instance
+
+    def discard(self, model, pk):
+
+        key = self._key(model, pk)
+        if key is not None:
+            self._instances.pop(key, None)
+
+
+class _NoIdentityMap:
+    """Stands in outside a request: remembers nothing."""
+
+    def get(self, model, pk):
+        return None
+
+    def add(self, instance):
+        return instance
+
+    def discard(self, model, pk):
+        pass
+
+
+_no_identity_map = _NoIdentityMap()
+
+
+def get_identity_map():
+    """The current request's identity map (one that remembers nothing outside a request)."""
+    return _current.get() or _no_identity_map
+
+
+@contextmanager
+def identity_map_scope():
+    """A fresh identity map for the duration of the block."""
+    token = _current.set(IdentityMap())
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class IdentityMapMiddleware:
+    """Opens an identity map per request. Works under WSGI and ASGI."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with identity_map_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_map_scope():
+            return await self.get_response(request)
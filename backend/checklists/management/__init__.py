@@ -0,0 +1 @@
+# This file makes management a Python package
@@ -0,0 +1 @@
+# This file makes commands a Python package
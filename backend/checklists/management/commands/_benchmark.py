@@ -0,0 +1,105 @@
+"""
+Shared helpers for the benchmark_* management commands.
+
+Benchmarks seed their own data inside a transaction that is always rolled
+back, so they can be run against a development database without leaving
+anything behind.
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from checklists.models import Checklist, ChecklistItem, Owner
+
+
+STATUSES = ['pending', 'in-progress', 'completed', 'not-applicable']
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is discarded afterwards."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def create_benchmark_user(username='benchmark-user'):
+    user, _ = User.objects.get_or_create(
+        username=username,
+        defaults={'email': f'{username}@example.com'}
+    )
+    return user
+
+
+def seed_checklist(user, item_count, name='Benchmark checklist'):
+    """Create one checklist with item_count items using bulk inserts."""
+    checklist = Checklist.objects.create(
+        name=name,
+        description='Seeded by a benchmark command',
+        status='active',
+        created_by=user
+    )
+    owners = [Owner.objects.get_or_create(name=f'Benchmark owner {i}', created_by=user)[0] for i in range(5)]
+    ChecklistItem.objects.bulk_create(
+        [
+            ChecklistItem(
+                checklist=checklist,
+                title=f'Control {i}',
+                description='Verify the control is documented, implemented and reviewed. ' * 3,
+                status=STATUSES[i % len(STATUSES)],
+                owner=owners[i % len(owners)],
+                evidence_notes='Evidence collected during the quarterly review. ' * 2
+            )
+            for i in range(item_count)
+        ],
+        batch_size=1000
+    )
+    return checklist
+
+
+def seed_checklists(user, checklist_count, items_per_checklist=0):
+    """Create checklist_count checklists, each with items_per_checklist items."""
+    checklists = Checklist.objects.bulk_create(
+        [
+            Checklist(
+                name=f'Benchmark checklist {i}',
+                description='Seeded by a benchmark command',
+                status=['draft', 'active', 'completed'][i % 3],
+                created_by=user
+            )
+            for i in range(checklist_count)
+        ],
+        batch_size=1000
+    )
+    if items_per_checklist:
+        ChecklistItem.objects.bulk_create(
+            [
+                ChecklistItem(
+                    checklist=checklist,
+                    title=f'Control {i}',
+                    status=STATUSES[i % len(STATUSES)]
+                )
+                for checklist in checklists
+                for i in range(items_per_checklist)
+            ],
+            batch_size=1000
+        )
+    return checklists
+
+
+def measure(func, repeat=5):
+    """Call func repeat times and return (best, median) wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def format_ms(seconds):
+    return f'{seconds * 1000:9.2f} ms'
@@ -0,0 +1,53 @@
+"""
+Move old completed checklists to the archive (see checklists/archive.py).
+
+Completed checklists whose checklist and items have not changed for
+--days days (ARCHIVE_AFTER_DAYS, 365 by default) are packed into
+ArchivedChecklist rows and removed from the live tables, in batched
+transactions (see ArchiveService). Reruns are safe: archived checklists
+are no longer due. Run it daily, e.g. from cron.
+
+Usage:
+    python manage.py archive_checklists
+    python manage.py archive_checklists --dry-run
+    python manage.py archive_checklists --days 730 --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from checklists.services import ArchiveService
+
+
+class Command(BaseCommand):
+    help = 'Archive completed checklists that have not changed for ARCHIVE_AFTER_DAYS days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive what is older than this (default: ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Checklists per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        totals = {'checklists': 0, 'items': 0, 'bytes': 0, 'packed_bytes': 0}
+        batches = ArchiveService().archive_due(options['days'], options['batch_size'], options['dry_run'])
+        for number, batch in enumerate(batches, 1):
+            for key in totals:
+                totals[key] += batch[key] or 0
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Batch {number}: {batch['checklists']} checklist(s), {batch['items']} item(s)")
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"Would archive {totals['checklists']} checklist(s) with {totals['items']} item(s)"
+            )
+            return
+        ratio = totals['bytes'] / totals['packed_bytes'] if totals['packed_bytes'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {totals['checklists']} checklist(s) with {totals['items']} item(s): "
+            f"{totals['bytes']} bytes packed into {totals['packed_bytes']} ({ratio:.1f}x)"
+        ))
@@ -0,0 +1,180 @@
+"""
+Compare read throughput of sync WSGI and async ASGI at high concurrency.
+
+Three ways of serving the same requests, all in this process:
+
+    wsgi        the WSGI application on a pool of --concurrency threads
+                (what gunicorn --threads does)
+    asgi-sync   the ASGI application with ASYNC_READ_VIEWS off - the DRF
+                views run in asgiref's thread pool
+    asgi-async  the ASGI application with the async read views
+                (checklists/async_views.py)
+
+ASGI requests are --concurrency coroutines on one event loop. No server
+is involved, so the numbers are Django's own per-request cost under
+contention, not network throughput.
+
+Unlike the other benchmarks the data cannot live in a rolled back
+transaction - the WSGI threads use their own database connections - so a
+benchmark user is created and deleted again (with everything it owns).
+
+Usage:
+    python manage.py benchmark_asgi
+    python manage.py benchmark_asgi --concurrency 256 --requests 5000
+    python manage.py benchmark_asgi --paths /api/stats/ /api/checklists/
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from rest_framework.authtoken.models import Token
+
+from compliance_api.asgi import application as asgi_application
+
+from ._benchmark import create_benchmark_user, format_ms, seed_checklists
+
+
+MODES = ['wsgi', 'asgi-sync', 'asgi-async']
+
+
+class Command(BaseCommand):
+    help = 'Compare sync WSGI and async ASGI throughput of the read endpoints at high concurrency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per path and mode')
+        parser.add_argument('--checklists', type=int, default=50, help='Checklists to seed')
+        parser.add_argument('--items', type=int, default=20, help='Items per seeded checklist')
+        parser.add_argument(
+            '--paths',
+            nargs='+',
+            help='Paths to request ({id} is replaced by a seeded checklist id)'
+        )
+
+    def handle(self, *args, **options):
+
+        user = create_benchmark_user('benchmark-asgi')
+        try:
+            checklists = seed_checklists(user, options['checklists'], options['items'])
+            token = Token.objects.create(user=user)
+            paths = options['paths'] or [
+                '/api/auth/health/',
+                '/api/stats/',
+                '/api/checklists/',
+                '/api/checklists/{id}/',
+                '/api/checklists/{id}/items/',
+            ]
+
+            self.stdout.write(
+                f"{options['requests']} requests per row, {options['concurrency']} in flight\n"
+                f"{'path':32}{'mode':12}{'req/s':>10}{'p50':>13}{'p99':>13}"
+            )
+            for path in paths:
+                path = path.replace('{id}', str(checklists[0].id))
+                for mode in MODES:
+                    elapsed, latencies = self.run(mode, path, token.key, options['concurrency'], options['requests'])
+                    latencies.sort()
+                    self.stdout.write(
+                        f"{path:32}{mode:12}{len(latencies) / elapsed:>10.0f}"
+                        f"{format_ms(statistics.median(latencies)):>13}"
+                        f"{format_ms(latencies[int(len(latencies) * 0.99) - 1]):>13}"
+                    )
+        finally:
+            # Cascades to the checklists, items and token
+            user.delete()
+
+    def run(self, mode, path, token, concurrency, total):
+
+        if mode == 'wsgi':
+            return self.run_wsgi(path, token, concurrency, total)
+
+        previous = getattr(settings, 'ASYNC_READ_VIEWS', True)
+        settings.ASYNC_READ_VIEWS = mode == 'asgi-async'
+        try:
+            return asyncio.run(self.run_asgi(path, token, concurrency, total))
+        finally:
+            settings.ASYNC_READ_VIEWS = previous
+
+    def run_wsgi(self, path, token, concurrency, total):
+
+        application = get_wsgi_application()
+        path_info, _, query_string = path.partition('?')
+
+        def request(_):
+            environ = {
+                'PATH_INFO': path_info,
+                'QUERY_STRING': query_string,
+                'HTTP_HOST': 'localhost',
+                'HTTP_AUTHORIZATION': f'Token {token}',
+                'wsgi.input': BytesIO(),
+            }
+            setup_testing_defaults(environ)
+            statuses = []
+            start = time.perf_counter()
+            response = application(environ, lambda status, headers: statuses.append(status))
+            b''.join(response)
+            response.close()
+            self.check_status(path, int(statuses[0].split()[0]))
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(request, range(total)))
+            return time.perf_counter() - start, latencies
+
+    async def run_asgi(self, path, token, concurrency, total):
+
+        path_info, _, query_string = path.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path_info,
+            'raw_path': path_info.encode(),
+            'query_string': query_string.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'authorization', f'Token {token}'.encode())],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def request():
+            statuses = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            start = time.perf_counter()
+            await asgi_application(dict(scope), receive, send)
+            self.check_status(path, statuses[0])
+            return time.perf_counter() - start
+
+        latencies = []
+
+        async def worker(count):
+            for _ in range(count):
+                latencies.append(await request())
+
+        # total requests split over `concurrency` clients
+        counts = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(count) for count in counts if count))
+        return time.perf_counter() - start, latencies
+
+    def check_status(self, path, status_code):
+
+        if status_code != 200:
+            raise CommandError(f'GET {path} returned {status_code}')
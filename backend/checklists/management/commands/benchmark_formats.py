@@ -0,0 +1,96 @@
+"""
+Compare JSON, MessagePack and CBOR payloads of the main read endpoints.
+
+For each endpoint the response data is produced once by the real view,
+then encoded and decoded with every available format: payload size (raw
+and gzip-compressed), encode time (the renderer) and decode time (what a
+client pays).
+
+    list     GET /api/checklists/
+    detail   GET /api/checklists/<id>/?items_page_size=<page>
+    items    GET /api/checklists/<id>/items/?page_size=<page>  (bulk item export)
+
+Usage:
+    python manage.py benchmark_formats
+    python manage.py benchmark_formats --items 5000 --page-size 500 --repeat 20
+"""
+
+import gzip
+import io
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from compliance_api import parsers, renderers
+
+from ._benchmark import create_benchmark_user, format_ms, measure, rolled_back, seed_checklist, seed_checklists
+
+
+class Command(BaseCommand):
+    help = 'Benchmark payload size and encode/decode time of JSON against MessagePack and CBOR'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=2000, help='Items in the seeded checklist')
+        parser.add_argument('--page-size', type=int, default=500, help='Items per detail/items response')
+        parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions')
+    
+    def get_formats(self):
+        formats = [('json', renderers.FastJSONRenderer(), parsers.FastJSONParser())]
+        if renderers.msgpack is not None:
+            formats.append(('msgpack', renderers.MessagePackRenderer(), parsers.MessagePackParser()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed - skipping MessagePack'))
+        if renderers.cbor2 is not None:
+            formats.append(('cbor', renderers.CBORRenderer(), parsers.CBORParser()))
+        else:
+            self.stdout.write(self.style.WARNING('cbor2 is not installed - skipping CBOR'))
+        return formats
+    
+    def get_data(self, user, path):
+        """The data the view at path returns for user (before rendering)."""
+        # The test factory's default host (testserver) is not in ALLOWED_HOSTS
+        request = APIRequestFactory().get(path, HTTP_HOST='localhost')
+        force_authenticate(request, user)
+        match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        return response.data
+    
+    def handle(self, *args, **options):
+        formats = self.get_formats()
+        page_size = options['page_size']
+        
+        with rolled_back():
+            user = create_benchmark_user()
+            seed_checklists(user, 50, items_per_checklist=5)
+            checklist = seed_checklist(user, options['items'])
+            endpoints = [
+                ('list', self.get_data(user, '/api/checklists/')),
+                ('detail', self.get_data(user, f'/api/checklists/{checklist.pk}/?items_page_size={page_size}')),
+                ('items', self.get_data(user, f'/api/checklists/{checklist.pk}/items/?page_size={page_size}')),
+            ]
+        
+        repeat = options['repeat']
+        self.stdout.write(
+            f"{'endpoint':10}{'format':10}{'bytes':>10}{'gzip':>10}{'encode':>15}{'decode':>15}"
+        )
+        for label, data in endpoints:
+            expected = None
+            for name, renderer, parser in formats:
+                body = renderer.render(data)
+                decoded = parser.parse(io.BytesIO(body))
+                # Every format must carry the same values as JSON
+                if expected is None:
+                    expected = decoded
+                elif decoded != expected:
+                    self.stdout.write(self.style.ERROR(f'{label}: {name} decodes differently from JSON'))
+                
+                encode_best, _ = measure(lambda: renderer.render(data), repeat)
+                decode_best, _ = measure(lambda: parser.parse(io.BytesIO(body)), repeat)
+                self.stdout.write(
+                    f'{label:10}{name:10}{len(body):>10}{len(gzip.compress(body)):>10}'
+                    f'   {format_ms(encode_best)}   {format_ms(decode_best)}'
+                )
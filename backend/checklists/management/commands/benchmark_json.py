@@ -0,0 +1,64 @@
+"""
+Compare JSON rendering/parsing cost for a large checklist detail response.
+
+Usage:
+    python manage.py benchmark_json
+    python manage.py benchmark_json --items 5000 --repeat 10
+"""
+
+import io
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from checklists.models import Checklist
+from checklists.serializers import ChecklistSerializer
+from compliance_api import renderers
+from compliance_api.parsers import FastJSONParser
+from compliance_api.renderers import FastJSONRenderer
+
+from ._benchmark import create_benchmark_user, format_ms, measure, rolled_back, seed_checklist
+
+
+class Command(BaseCommand):
+    help = 'Benchmark DRF JSONRenderer/JSONParser against the orjson-backed fast path'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=5000, help='Items in the checklist')
+        parser.add_argument('--repeat', type=int, default=10, help='Timing repetitions')
+    
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson is not installed - FastJSONRenderer falls back to stdlib json'
+            ))
+        
+        with rolled_back():
+            user = create_benchmark_user()
+            checklist = seed_checklist(user, options['items'])
+            checklist = Checklist.objects.select_related('created_by').get(pk=checklist.pk)
+            items = list(checklist.items.select_related('owner').order_by('created_at', 'id'))
+            # Embed every item, not just the first CHECKLIST_ITEMS_EMBED_SIZE of them
+            serializer = ChecklistSerializer(checklist)
+            serializer.set_items_page(checklist, items)
+            data = serializer.data
+        
+        stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stdlib_body = stdlib_renderer.render(data)
+        fast_body = fast_renderer.render(data)
+        if stdlib_body != fast_body:
+            self.stdout.write(self.style.ERROR('Rendered output differs between renderers'))
+        
+        repeat = options['repeat']
+        results = [
+            ('render  JSONRenderer', measure(lambda: stdlib_renderer.render(data), repeat)),
+            ('render  FastJSONRenderer', measure(lambda: fast_renderer.render(data), repeat)),
+            ('parse   JSONParser', measure(lambda: JSONParser().parse(io.BytesIO(stdlib_body)), repeat)),
+            ('parse   FastJSONParser', measure(lambda: FastJSONParser().parse(io.BytesIO(stdlib_body)), repeat)),
+        ]
+        
+        self.stdout.write(f"Checklist with {len(data['items'])} items, {len(stdlib_body) / 1024:.0f} KiB of JSON")
+        self.stdout.write(f"{'':28}{'best':>12}{'median':>12}")
+        for label, (best, median) in results:
+            self.stdout.write(f'{label:28}{format_ms(best)}   {format_ms(median)}')
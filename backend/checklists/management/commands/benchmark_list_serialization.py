@@ -0,0 +1,60 @@
+"""
+Compare ModelSerializer and values_list-based serialization of list endpoints.
+
+Usage:
+    python manage.py benchmark_list_serialization
+    python manage.py benchmark_list_serialization --sizes 100 1000 10000 --repeat 5
+"""
+
+from django.core.management.base import BaseCommand
+
+from checklists.fast_serializers import ChecklistListValuesSerializer, ChecklistItemValuesSerializer
+from checklists.models import ChecklistItem
+from checklists.repositories import ChecklistRepository
+from checklists.serializers import ChecklistListSerializer, ChecklistItemSerializer
+from compliance_api.renderers import FastJSONRenderer
+
+from ._benchmark import create_benchmark_user, format_ms, measure, rolled_back, seed_checklists
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the values_list fast path of /api/checklists/ and /api/items/'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='Row counts')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+    
+    def handle(self, *args, **options):
+        renderer = FastJSONRenderer()
+        repeat = options['repeat']
+        
+        self.stdout.write(f"{'endpoint':12}{'rows':>8}{'serializer':>14}{'fast path':>14}{'speedup':>10}")
+        for size in options['sizes']:
+            with rolled_back():
+                user = create_benchmark_user()
+                seed_checklists(user, size, items_per_checklist=1)
+                
+                repo = ChecklistRepository()
+                checklists = repo.with_item_counts(repo.get_by_user(user)).order_by('-created_at')
+                items = ChecklistItem.objects.filter(checklist__created_by=user).select_related('owner')
+                
+                cases = [
+                    ('checklists', checklists, ChecklistListSerializer, ChecklistListValuesSerializer()),
+                    ('items', items, ChecklistItemSerializer, ChecklistItemValuesSerializer()),
+                ]
+                for label, queryset, serializer_class, fast_serializer in cases:
+                    def slow():
+                        return renderer.render(serializer_class(queryset.all(), many=True).data)
+                    
+                    def fast():
+                        return renderer.render(fast_serializer.to_representation(fast_serializer.values_list(queryset.all())))
+                    
+                    if slow() != fast():
+                        self.stdout.write(self.style.ERROR(f'{label}: output differs'))
+                    
+                    slow_best, _ = measure(slow, repeat)
+                    fast_best, _ = measure(fast, repeat)
+                    self.stdout.write(
+                        f'{label:12}{size:>8}{format_ms(slow_best):>14}{format_ms(fast_best):>14}'
+                        f'{slow_best / fast_best:>9.1f}x'
+                    )
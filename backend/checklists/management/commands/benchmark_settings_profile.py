@@ -0,0 +1,115 @@
+"""
+Compare worker startup and per-request overhead between settings profiles.
+
+Each profile is measured in a fresh interpreter, because startup cost is
+mostly imports and those are cached after the first time. A worker is
+"started" once the WSGI application and the URLconf are loaded - what a
+gunicorn worker does before taking its first request. Per-request cost is
+measured by calling the WSGI application directly with GET /api/auth/health/,
+which touches no database, so the difference is the middleware chain.
+
+Usage:
+    python manage.py benchmark_settings_profile
+    python manage.py benchmark_settings_profile --requests 5000
+    python manage.py benchmark_settings_profile --profiles compliance_api.settings compliance_api.settings_api
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ._benchmark import format_ms
+
+
+def format_us(seconds):
+    return f'{seconds * 1000000:9.1f} us'
+
+
+# Runs inside the child interpreter; prints one JSON line with the results
+CHILD_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+
+import django
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+
+application = get_wsgi_application()
+get_resolver().url_patterns
+startup = time.perf_counter() - start
+modules = len(sys.modules)
+
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+def request():
+    environ = {'PATH_INFO': '/api/auth/health/', 'HTTP_HOST': 'localhost', 'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    response = application(environ, lambda status, headers: None)
+    b''.join(response)
+    response.close()
+
+from checklists.management.commands._benchmark import measure
+request()  # warm up lazy imports
+best, median = measure(request, repeat=%(requests)d)
+
+from django.conf import settings
+print(json.dumps({
+    'startup': startup,
+    'modules': modules,
+    'best': best,
+    'median': median,
+    'middleware': len(settings.MIDDLEWARE),
+    'apps': len(settings.INSTALLED_APPS),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure startup time and per-request overhead of the full and API-only settings profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            nargs='+',
+            default=['compliance_api.settings', 'compliance_api.settings_api'],
+            help='Settings modules to compare'
+        )
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per profile')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per profile (best startup wins)')
+
+    def handle(self, *args, **options):
+        script = CHILD_SCRIPT % {'requests': options['requests']}
+
+        self.stdout.write(
+            f"{'profile':32}{'apps':>6}{'mw':>5}{'modules':>9}"
+            f"{'startup':>13}{'request best':>16}{'request median':>16}"
+        )
+        for profile in options['profiles']:
+            runs = [self.run_profile(profile, script) for _ in range(options['runs'])]
+            startup = min(run['startup'] for run in runs)
+            best = min(run['best'] for run in runs)
+            median = min(run['median'] for run in runs)
+            run = runs[0]
+            self.stdout.write(
+                f"{profile:32}{run['apps']:>6}{run['middleware']:>5}{run['modules']:>9}"
+                f"{format_ms(startup):>13}{format_us(best):>16}{format_us(median):>16}"
+            )
+
+    def run_profile(self, profile, script):
+
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'{profile} failed:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,31 @@
+"""
+Delete stored evidence files that nothing uses any more.
+
+Deleting an attachment removes its file right away when it was the last
+one using it. Files whose attachments went with a deleted item or
+checklist are left behind until this runs, as are uploads abandoned by
+interrupted processes. Files of archived checklists are kept. Run it
+periodically, e.g. from cron.
+
+Usage:
+    python manage.py clear_evidence
+"""
+
+from django.core.management.base import BaseCommand
+
+from checklists import evidence
+from checklists.services import EvidenceService
+
+
+class Command(BaseCommand):
+    help = 'Delete stored evidence files no attachment or archived checklist uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--temp-age', type=int, default=86400, help='Delete abandoned uploads older than this (seconds)')
+
+    def handle(self, *args, **options):
+        files, size = EvidenceService().clear_unused()
+        temp_files = evidence.clear_temp(options['temp_age'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {files} unused evidence file(s) ({size} bytes) and {temp_files} abandoned upload(s)'
+        ))
@@ -0,0 +1,21 @@
+"""
+Delete expired Idempotency-Key records.
+
+Expired keys are already ignored (and replaced when the key is reused);
+this only keeps the table small. Run it periodically, e.g. from cron.
+
+Usage:
+    python manage.py clear_idempotency_keys
+"""
+
+from django.core.management.base import BaseCommand
+
+from checklists.repositories import IdempotencyKeyRepository
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses whose TTL has expired'
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyKeyRepository().delete_expired()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency key(s)'))
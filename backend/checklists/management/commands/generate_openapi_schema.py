@@ -0,0 +1,29 @@
+"""
+Write the OpenAPI schema to disk so the docs endpoints never generate it per request.
+
+Run it at build/deploy time - a new deploy is the only thing that changes
+the schema, and restarting the workers picks up the new file.
+
+Usage:
+    python manage.py generate_openapi_schema
+    python manage.py generate_openapi_schema --output-dir /app/openapi
+"""
+
+from django.core.management.base import BaseCommand
+
+from compliance_api.schema import get_schema_dir, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema (JSON and YAML) served by /swagger/ and /redoc/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            help='Directory to write schema.json / schema.yaml to (default: OPENAPI_SCHEMA_DIR)'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['output_dir'] or get_schema_dir()
+        for path in write_schema(directory):
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path} ({path.stat().st_size / 1024:.0f} KiB)'))
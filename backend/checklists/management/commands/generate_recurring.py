@@ -0,0 +1,57 @@
+"""
+Create the checklists of recurring templates that are due.
+
+Every template with a recurrence rule whose next occurrence is today or
+earlier gets a checklist per due occurrence, for all users at once, in
+batched transactions (see RecurrenceService). Reruns are safe: nothing
+is created twice. Run it daily, e.g. from cron.
+
+Usage:
+    python manage.py generate_recurring
+    python manage.py generate_recurring --dry-run
+    python manage.py generate_recurring --date 2026-12-31 --batch-size 500
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from checklists.services import RecurrenceService
+
+
+class Command(BaseCommand):
+    help = 'Create the checklists of recurring templates whose next occurrence is due'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Generate what is due on this date (YYYY-MM-DD) instead of today')
+        parser.add_argument('--batch-size', type=int, default=200, help='Templates per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be created')
+
+    def handle(self, *args, **options):
+
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid --date {options['date']!r}, expected YYYY-MM-DD")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        totals = {'templates': 0, 'checklists': 0, 'items': 0}
+        batches = RecurrenceService().generate_due(today, options['batch_size'], options['dry_run'])
+        for number, batch in enumerate(batches, 1):
+            for key in totals:
+                totals[key] += batch[key] or 0
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Batch {number}: {batch['templates']} template(s), {batch['checklists']} checklist(s)")
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"Would create {totals['checklists']} checklist(s) from {totals['templates']} due template(s)"
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['checklists']} checklist(s) with {totals['items']} item(s) "
+            f"from {totals['templates']} due template(s)"
+        ))
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forwards_copy_owners(apps, schema_editor):
+    """
+    Turn the free-text assigned_owner values into Owner rows.
+
+    Names are trimmed and deduplicated case-insensitively, so "Security Team"
+    and "security team " end up as one owner. Items are then re-pointed with
+    one UPDATE per distinct spelling instead of one save() per item.
+    """
+    Owner = apps.get_model('checklists', 'Owner')
+    ChecklistItem = apps.get_model('checklists', 'ChecklistItem')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    spellings = (
+        ChecklistItem.objects.exclude(assigned_owner='')
+        .values_list('assigned_owner', flat=True)
+        .distinct()
+    )
+
+    # First spelling seen for each case-insensitive name wins
+    canonical = {}
+    for raw in spellings:
+        name = raw.strip()
+        if name:
+            canonical.setdefault(name.casefold(), name)
+
+    if not canonical:
+        return
+
+    # Link owners to user accounts whose username matches exactly
+    users = dict(
+        User.objects.filter(username__in=canonical.values()).values_list('username', 'id')
+    )
+    Owner.objects.bulk_create(
+        [Owner(name=name, user_id=users.get(name)) for name in canonical.values()]
+    )
+    owner_ids = dict(Owner.objects.values_list('name', 'id'))
+
+    for raw in spellings:
+        name = raw.strip()
+        if name:
+            ChecklistItem.objects.filter(assigned_owner=raw).update(
+                owner_id=owner_ids[canonical[name.casefold()]]
+            )
+
+
+def backwards_copy_owners(apps, schema_editor):
+    Owner = apps.get_model('checklists', 'Owner')
+    ChecklistItem = apps.get_model('checklists', 'ChecklistItem')
+
+    for owner_id, name in Owner.objects.values_list('id', 'name'):
+        ChecklistItem.objects.filter(owner_id=owner_id).update(assigned_owner=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('checklists', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Owner',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='owner', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Owner',
+                'verbose_name_plural': 'Owners',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='checklistitem',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='checklists.owner'),
+        ),
+        migrations.RunPython(forwards_copy_owners, backwards_copy_owners),
+        migrations.RemoveField(
+            model_name='checklistitem',
+            name='assigned_owner',
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['owner', 'status'], name='checklists__owner_i_2e4918_idx'),
+        ),
+    ]
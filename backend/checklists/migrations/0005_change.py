@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_created_changes(apps, schema_editor):
+    """
+    Record a 'created' change for every existing checklist and item, so
+    syncing from sequence 0 yields the complete current data set.
+    """
+    Change = apps.get_model('checklists', 'Change')
+    Checklist = apps.get_model('checklists', 'Checklist')
+    ChecklistItem = apps.get_model('checklists', 'ChecklistItem')
+
+    checklists = Checklist.objects.order_by('id').values_list('id', 'created_by_id', 'version')
+    Change.objects.bulk_create(
+        (
+            Change(resource='checklist', object_id=pk, checklist_id=pk, user_id=user_id,
+                   action='created', version=version)
+            for pk, user_id, version in checklists.iterator()
+        ),
+        batch_size=1000
+    )
+
+    items = ChecklistItem.objects.order_by('id').values_list(
+        'id', 'checklist_id', 'checklist__created_by_id', 'version'
+    )
+    Change.objects.bulk_create(
+        (
+            Change(resource='item', object_id=pk, checklist_id=checklist_id, user_id=user_id,
+                   action='created', version=version)
+            for pk, checklist_id, user_id, version in items.iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('checklists', '0004_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('checklist', 'Checklist'), ('item', 'Checklist Item')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=20)),
+                ('checklist_id', models.BigIntegerField()),
+                ('version', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Change',
+                'verbose_name_plural': 'Changes',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user', 'id'], name='checklists__user_id_ced1f4_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_created_changes, migrations.RunPython.noop),
+    ]
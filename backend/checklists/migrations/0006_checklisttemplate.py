@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('checklists', '0005_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChecklistTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('due_in_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_templates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Checklist Template',
+                'verbose_name_plural': 'Checklist Templates',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TemplateItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='template_items', to='checklists.owner')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='checklists.checklisttemplate')),
+            ],
+            options={
+                'verbose_name': 'Template Item',
+                'verbose_name_plural': 'Template Items',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='checklisttemplate',
+            index=models.Index(fields=['created_by', 'name'], name='checklists__created_a758d5_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checklists', '0006_checklisttemplate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checklist',
+            name='occurrence',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='checklist',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checklists', to='checklists.checklisttemplate'),
+        ),
+        migrations.AddField(
+            model_name='checklisttemplate',
+            name='next_run_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='checklisttemplate',
+            name='recurrence',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('annually', 'Annually')], default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='checklisttemplate',
+            name='recurrence_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='checklisttemplate',
+            index=models.Index(fields=['next_run_on', 'id'], name='checklists__next_ru_74675a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='checklist',
+            constraint=models.UniqueConstraint(fields=('template', 'occurrence'), name='unique_template_occurrence'),
+        ),
+    ]
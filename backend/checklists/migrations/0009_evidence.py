@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('checklists', '0008_archivedchecklist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvidenceBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Evidence Blob',
+                'verbose_name_plural': 'Evidence Blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedchecklist',
+            name='evidence_blobs',
+            field=models.ManyToManyField(blank=True, related_name='archived_checklists', to='checklists.evidenceblob'),
+        ),
+        migrations.CreateModel(
+            name='EvidenceAttachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='checklists.evidenceblob')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='checklists.checklistitem')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='evidence_attachments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Evidence Attachment',
+                'verbose_name_plural': 'Evidence Attachments',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['item', 'created_at'], name='checklists__item_id_e33a96_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checklists', '0009_evidence'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='checklist',
+            name='checklists__created_d328e0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='checklistitem',
+            name='checklists__checkli_03c1fe_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='checklistitem',
+            name='checklists__status_74a76d_idx',
+        ),
+        migrations.AlterField(
+            model_name='checklist',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('active', 'Active'), ('completed', 'Completed')], default='draft', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='checklistitem',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('in-progress', 'In Progress'), ('completed', 'Completed'), ('not-applicable', 'Not Applicable')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=models.Index(fields=['created_by', 'created_at', 'updated_at', 'version'], name='checklists__created_9da1b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=models.Index(fields=['created_by', 'status', 'created_at', 'updated_at', 'version'], name='checklists__created_f14110_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['checklist', 'created_at', 'id'], name='checklists__checkli_75ff15_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['checklist', 'status', 'created_at'], name='checklists__checkli_a581d2_idx'),
+        ),
+    ]
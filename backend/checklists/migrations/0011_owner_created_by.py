@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:12
+
+from collections import defaultdict
+import json
+import zlib
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forwards_scope_owners(apps, schema_editor):
+    """
+    Give every owner the user whose items it is assigned to.
+
+    An owner used by several users stays with the first of them and is
+    copied for each of the others; their items and template items are
+    re-pointed at the copy with one UPDATE per owner and user. Archived
+    items keep their owner id (restoring maps it by name, see
+    ArchiveRepository.unpack). Owners nobody uses go to the user account
+    they are linked to, or are deleted.
+    """
+    Owner = apps.get_model('checklists', 'Owner')
+    ChecklistItem = apps.get_model('checklists', 'ChecklistItem')
+    TemplateItem = apps.get_model('checklists', 'TemplateItem')
+    ArchivedChecklist = apps.get_model('checklists', 'ArchivedChecklist')
+
+    users_by_owner = defaultdict(set)
+    references = [
+        ChecklistItem.objects.filter(owner__isnull=False).values_list('owner_id', 'checklist__created_by_id'),
+        TemplateItem.objects.filter(owner__isnull=False).values_list('owner_id', 'template__created_by_id'),
+    ]
+    for rows in references:
+        for owner_id, user_id in rows.distinct():
+            users_by_owner[owner_id].add(user_id)
+    for payload, user_id in ArchivedChecklist.objects.values_list('payload', 'created_by_id').iterator():
+        # Payloads are zlib-compressed JSON documents (see checklists/archive.py)
+        for row in json.loads(zlib.decompress(bytes(payload)))['items']:
+            if row.get('owner_id') is not None:
+                users_by_owner[row['owner_id']].add(user_id)
+
+    for owner in Owner.objects.filter(id__in=users_by_owner.keys()):
+        first, *others = sorted(users_by_owner[owner.id])
+        Owner.objects.filter(id=owner.id).update(created_by_id=first)
+        for user_id in others:
+            copy = Owner.objects.create(name=owner.name, user_id=owner.user_id, created_by_id=user_id)
+            ChecklistItem.objects.filter(owner_id=owner.id, checklist__created_by_id=user_id).update(owner_id=copy.id)
+            TemplateItem.objects.filter(owner_id=owner.id, template__created_by_id=user_id).update(owner_id=copy.id)
+
+    Owner.objects.filter(created_by__isnull=True, user__isnull=False).update(created_by_id=models.F('user_id'))
+    Owner.objects.filter(created_by__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('checklists', '0010_user_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='owner',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='owners', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='owner',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='owner',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='linked_owners', to=settings.AUTH_USER_MODEL),
+        ),
+        # Owners stay shared on the way back - created_by is simply dropped
+        migrations.RunPython(forwards_scope_owners, migrations.RunPython.noop),
+    ]
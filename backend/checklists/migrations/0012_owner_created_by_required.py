@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    # Separate from 0011: PostgreSQL can't alter a table with pending
+    # (deferred) foreign key checks from the data migration's UPDATEs
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('checklists', '0011_owner_created_by'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='owner',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owners', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='owner',
+            constraint=models.UniqueConstraint(fields=('created_by', 'name'), name='unique_owner_name_per_user'),
+        ),
+    ]
@@ -1,9 +1,87 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 
-class Checklist(models.Model):
+class VersionedModel(models.Model):
+    """
+    Abstract base for rows edited concurrently.
+    
+    version goes up by one on every write. It is exposed as the ETag, and
+    repositories update with "WHERE version = <If-Match>" so a stale edit
+    is rejected instead of silently overwriting a newer one.
+    """
+    
+    # Incremented on every update (see the repositories' conditional updates)
+    version = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        
+        # Plain save() (admin, mark_completed, ...) also bumps the version,
+        # done in SQL so a stale in-memory version can't be written back
+        if self.pk is not None and not self._state.adding:
+            self.version = F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'version'}
+        super().save(*args, **kwargs)
+        if not isinstance(self.version, int):
+            self.refresh_from_db(fields=['version'])
+
+
+class Owner(models.Model):
+
+    # Display name of the owner (e.g., "Security Team" or "Jane Doe")
+    # Unique per user (see Meta.constraints), so the same owner is never stored twice
+    name = models.CharField(max_length=100)
+    
+    # Whose owner this is - owners are private to the user who created them,
+    # like their checklists, and only assigned to that user's items
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='owners'
+    )
+    
+    # Optional link to a user account when the owner is a real user
+    # (several users may each have an owner for the same person)
+    # on_delete=models.SET_NULL keeps the owner (and its items) if the user is deleted
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='linked_owners'
+    )
+    
+    # When this owner was created
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    # When this owner was last updated (e.g., renamed)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+
+        # Default ordering - alphabetical by name
+        ordering = ['name']
+        
+        verbose_name = 'Owner'
+        verbose_name_plural = 'Owners'
+        
+        # Also the index behind the user's owner list and name lookups
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'name'], name='unique_owner_name_per_user'),
+        ]
+    
+    def __str__(self):
+
+        return self.name
+
+
+class Checklist(VersionedModel):
    
     # Status choices - using a tuple of tuples format
     STATUS_CHOICES = [
@@ -28,8 +106,7 @@ class Checklist(models.Model):
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
-        default='draft',
-        db_index=True
+        default='draft'
     )
     
     # Who created this checklist
@@ -41,6 +118,20 @@ class Checklist(models.Model):
         related_name='checklists'
     )
     
+    # Recurring template this checklist was generated from (see generate_recurring)
+    # on_delete=models.SET_NULL keeps generated checklists when the template goes
+    template = models.ForeignKey(
+        'ChecklistTemplate',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='checklists'
+    )
+    
+    # The scheduled date it was generated for - at most one checklist per
+    # template and occurrence, so reruns of the generator never duplicate
+    occurrence = models.DateField(null=True, blank=True)
+    
     # When this checklist was created
     # auto_now_add=True automatically sets this to the current time on creation
     created_at = models.DateTimeField(auto_now_add=True)
@@ -62,13 +153,29 @@ class Checklist(models.Model):
         # We often query by status and due_date
         indexes = [
             models.Index(fields=['status', 'due_date']),
-            models.Index(fields=['created_by', 'status']),
+            # Every list is one user's checklists, newest first - with or
+            # without a status filter. updated_at and version ride along, so
+            # COUNT and the freshness MAX()es are read from the index alone
+            models.Index(fields=['created_by', 'created_at', 'updated_at', 'version']),
+            models.Index(fields=['created_by', 'status', 'created_at', 'updated_at', 'version']),
         ]
+        
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'occurrence'], name='unique_template_occurrence'),
+        ]
+    
+    # Resource name in the change feed (see Change)
+    change_resource = 'checklist'
     
     def __str__(self):
 
         return self.name
     
+    def get_change_scope(self):
+        
+        # (checklist id, user id) a change of this checklist is filed under
+        return self.id, self.created_by_id
+    
     def is_overdue(self):
 
         if self.due_date and self.status != 'completed':
@@ -76,25 +183,43 @@ class Checklist(models.Model):
             return self.due_date < timezone.now().date()
         return False
     
+    def get_item_count(self):
+
+        # Use the count annotated by the repository when available (no extra query)
+        if hasattr(self, 'item_count'):
+            return self.item_count
+        return self.items.count()
+    
+    def get_completed_item_count(self):
+
+        # Completed and not-applicable items both count as done
+        if hasattr(self, 'completed_item_count'):
+            return self.completed_item_count
+        return self.items.filter(status__in=['completed', 'not-applicable']).count()
+    
+    def get_pending_item_count(self):
+
+        if hasattr(self, 'pending_item_count'):
+            return self.pending_item_count
+        return self.items.filter(status__in=['pending', 'in-progress']).count()
+    
     def get_completion_percentage(self):
 
         # Get all items for this checklist
-        total_items = self.items.count()
+        total_items = self.get_item_count()
         
         if total_items == 0:
             # If no items, return 100% if checklist is completed, otherwise 0%
             return 100.0 if self.status == 'completed' else 0.0
         
         # Count items that are completed or not applicable
-        completed_items = self.items.filter(
-            status__in=['completed', 'not-applicable']
-        ).count()
+        completed_items = self.get_completed_item_count()
         
         # Calculate percentage
         return (completed_items / total_items) * 100
 
 
-class ChecklistItem(models.Model):
+class ChecklistItem(VersionedModel):
     
     # Status choices for checklist items
     STATUS_CHOICES = [
@@ -123,11 +248,19 @@ class ChecklistItem(models.Model):
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
-        default='pending',
-        db_index=True
+        default='pending'
     )
     
-    assigned_owner = models.CharField(max_length=100, blank=True)
+    # Who is responsible for this item
+    # Renaming an owner only touches the owner row, not every item
+    # on_delete=models.SET_NULL leaves the item unassigned if the owner is deleted
+    owner = models.ForeignKey(
+        Owner,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='items'
+    )
     
     # Evidence or notes about completion
     evidence_notes = models.TextField(blank=True)
@@ -150,14 +283,34 @@ class ChecklistItem(models.Model):
         verbose_name_plural = 'Checklist Items'
         
         # Indexes for faster queries
+        # Items are reached through their checklist (a user's items are the
+        # items of the user's checklists), in created_at order; the status
+        # filter narrows that same range. There is no index on status alone:
+        # it matches a quarter of all items, and planners picked it over the
+        # user's checklists
         indexes = [
-            models.Index(fields=['checklist', 'status']),
-            models.Index(fields=['status']),
+            models.Index(fields=['checklist', 'created_at', 'id']),
+            models.Index(fields=['checklist', 'status', 'created_at']),
+            models.Index(fields=['owner', 'status']),
         ]
     
+    # Resource name in the change feed (see Change)
+    change_resource = 'item'
+    
     def __str__(self):
         return f"{self.checklist.name} - {self.title}"
     
+    def get_change_scope(self):
+        
+        # Item changes are visible to the owner of the checklist
+        return self.checklist_id, self.checklist.created_by_id
+    
+    @property
+    def assigned_owner(self):
+
+        # Name of the owner, kept for API compatibility with the old text field
+        return self.owner.name if self.owner_id else ''
+    
     def mark_completed(self):
 
         self.status = 'completed'
@@ -167,3 +320,349 @@ class ChecklistItem(models.Model):
     def is_completed(self):
         
         return self.status in ['completed', 'not-applicable']
+
+
+class ChecklistTemplate(models.Model):
+    """
+    A reusable checklist: name, description and a list of items.
+    
+    Checklists are created from it with POST /api/templates/<id>/instantiate/.
+    The items are copied inside the database in one INSERT ... SELECT, so
+    that takes the same time for 5 items or 500.
+    
+    With a recurrence rule, `manage.py generate_recurring` also creates one
+    every period (see checklists/recurrence.py).
+    """
+    
+    RECURRENCE_CHOICES = [
+        ('', 'None'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('quarterly', 'Quarterly'),
+        ('annually', 'Annually'),
+    ]
+    
+    # Name of the template - also the default name of checklists created from it
+    name = models.CharField(max_length=200)
+    
+    # Copied into the description of new checklists
+    description = models.TextField(blank=True)
+    
+    # New checklists are due this many days after they are created (no due date if empty)
+    due_in_days = models.PositiveIntegerField(null=True, blank=True)
+    
+    # How often a checklist is generated from it (blank: only on request)
+    recurrence = models.CharField(max_length=20, choices=RECURRENCE_CHOICES, blank=True, default='')
+    
+    # First occurrence - later ones fall on the same day of the week/month
+    recurrence_start = models.DateField(null=True, blank=True)
+    
+    # Next occurrence not generated yet (null without recurrence)
+    # Indexed: the generator only reads templates with next_run_on <= today
+    next_run_on = models.DateField(null=True, blank=True)
+    
+    # Templates are private to the user who created them
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='checklist_templates'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+
+        ordering = ['name']
+        
+        verbose_name = 'Checklist Template'
+        verbose_name_plural = 'Checklist Templates'
+        
+        indexes = [
+            models.Index(fields=['created_by', 'name']),
+            models.Index(fields=['next_run_on', 'id']),
+        ]
+    
+    def __str__(self):
+
+        return self.name
+
+
+class TemplateItem(models.Model):
+    """An item of a ChecklistTemplate - what a new checklist item starts from."""
+    
+    # on_delete=models.CASCADE - the items go with their template
+    template = models.ForeignKey(
+        ChecklistTemplate,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    
+    # Default owner of the items created from this one (kept unless asked otherwise)
+    owner = models.ForeignKey(
+        Owner,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='template_items'
+    )
+    
+    class Meta:
+
+        # Order in which the items are copied into new checklists
+        ordering = ['id']
+        
+        verbose_name = 'Template Item'
+        verbose_name_plural = 'Template Items'
+    
+    def __str__(self):
+        return f"{self.template.name} - {self.title}"
+    
+    @property
+    def assigned_owner(self):
+
+        return self.owner.name if self.owner_id else ''
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a request sent with an Idempotency-Key header.
+    
+    Retries with the same key replay the stored response instead of running
+    the request again (see checklists/idempotency.py).
+    """
+    
+    # Key chosen by the client, unique per user
+    key = models.CharField(max_length=255)
+    
+    # Keys are scoped to a user, so clients can't see each other's responses
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    
+    # sha256 of method, path and body - a key reused for a different request is rejected
+    fingerprint = models.CharField(max_length=64)
+    
+    # Stored response - empty while the first request is still running
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.BinaryField(null=True, blank=True)
+    # Headers a client may act on (ETag, Location, Last-Modified), replayed with the body
+    response_headers = models.JSONField(null=True, blank=True)
+    
+    # When this key was first used
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    # After this the key is forgotten and may be used again
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+    
+    def __str__(self):
+        return f"{self.user_id}:{self.key}"
+    
+    def is_completed(self):
+        
+        return self.response_status is not None
+
+
+class Change(models.Model):
+    """
+    One entry of the change feed (/api/changes/).
+    
+    A row is written for every create, update and delete of a checklist or
+    item. The auto-increment id is the change sequence clients sync from.
+    """
+    
+    RESOURCE_CHOICES = [
+        ('checklist', 'Checklist'),
+        ('item', 'Checklist Item'),
+    ]
+    
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),  # Tombstone - the row no longer exists
+    ]
+    
+    # What changed
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    
+    # Checklist the object belongs to (the checklist itself for checklist changes)
+    # A plain integer rather than a foreign key, so tombstones outlive the row
+    checklist_id = models.BigIntegerField()
+    
+    # Owner of the checklist - the only user who sees this change
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='changes'
+    )
+    
+    # Version of the object after the change (null for tombstones)
+    version = models.PositiveIntegerField(null=True, blank=True)
+    
+    # When the change happened
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+
+        # Sequence order
+        ordering = ['id']
+        
+        verbose_name = 'Change'
+        verbose_name_plural = 'Changes'
+        
+        # The feed reads "this user's changes after sequence N"
+        indexes = [
+            models.Index(fields=['user', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.resource} {self.object_id} {self.action}"
+
+
+class ArchivedChecklist(models.Model):
+    """
+    A completed checklist moved out of the Checklist / ChecklistItem tables
+    (see checklists/archive.py).
+    
+    The columns the checklist list shows are kept as they were, so archived
+    rows can be listed, filtered and ordered next to live ones. Everything
+    else - all checklist fields and all items - is one compressed JSON
+    document in payload, read only when the checklist is opened or restored.
+    """
+    
+    # The checklist's own id: links keep working and a restore puts it back under it
+    id = models.BigIntegerField(primary_key=True)
+    
+    # List columns, as they were when the checklist was archived
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    due_date = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=20, default='completed')
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_checklists'
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    item_count = models.PositiveIntegerField(default=0)
+    completed_item_count = models.PositiveIntegerField(default=0)
+    
+    # zlib-compressed JSON: {"checklist": {...}, "items": [...], "attachments": [...]}
+    payload = models.BinaryField()
+    
+    # Stored files the packed attachments use - kept while the checklist is archived
+    evidence_blobs = models.ManyToManyField(
+        'EvidenceBlob',
+        blank=True,
+        related_name='archived_checklists'
+    )
+    
+    # When the checklist was archived
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+
+        # Same default order as Checklist
+        ordering = ['-created_at']
+        
+        verbose_name = 'Archived Checklist'
+        verbose_name_plural = 'Archived Checklists'
+        
+        # Listed per user, like Checklist
+        indexes = [
+            models.Index(fields=['created_by', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+
+class EvidenceBlob(models.Model):
+    """
+    One stored evidence file, named by the SHA-256 of its content (see
+    checklists/evidence.py). Uploading the same content again only adds
+    an EvidenceAttachment that points here.
+    """
+    
+    # Hex SHA-256 of the content - also its path in the store
+    sha256 = models.CharField(max_length=64, unique=True)
+    
+    # Size in bytes
+    size = models.BigIntegerField()
+    
+    # When the content was first uploaded
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+
+        verbose_name = 'Evidence Blob'
+        verbose_name_plural = 'Evidence Blobs'
+    
+    def __str__(self):
+        return self.sha256
+
+
+class EvidenceAttachment(models.Model):
+    """An evidence file attached to a checklist item."""
+    
+    # on_delete=models.CASCADE - attachments go with their item
+    item = models.ForeignKey(
+        ChecklistItem,
+        on_delete=models.CASCADE,
+        related_name='attachments'
+    )
+    
+    # on_delete=models.PROTECT - a stored file is only removed once nothing uses it
+    blob = models.ForeignKey(
+        EvidenceBlob,
+        on_delete=models.PROTECT,
+        related_name='attachments'
+    )
+    
+    # Name and type as uploaded - the same content can be attached under different names
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='evidence_attachments'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+
+        # Upload order
+        ordering = ['created_at', 'id']
+        
+        verbose_name = 'Evidence Attachment'
+        verbose_name_plural = 'Evidence Attachments'
+        
+        # Listed per item
+        indexes = [
+            models.Index(fields=['item', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return self.filename
@@ -0,0 +1,165 @@
+"""
+Cursor pagination for checklist items.
+
+Items are paged with a keyset cursor on (created_at, id) instead of
+OFFSET, so every page is an index range scan no matter how deep the
+client has scrolled, and items created at the same instant are never
+skipped or repeated. The cursor is an opaque base64 token.
+
+"count" in the response is the number of matching items across all pages,
+as it was before the endpoint was paged, not the length of the page.
+
+Page sizes are configured in settings:
+    CHECKLIST_ITEMS_EMBED_SIZE    - items embedded in checklist detail
+    CHECKLIST_ITEMS_PAGE_SIZE     - default page size of the items endpoint
+    CHECKLIST_ITEMS_MAX_PAGE_SIZE - upper bound for ?page_size=
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def get_max_page_size():
+    return getattr(settings, 'CHECKLIST_ITEMS_MAX_PAGE_SIZE', 500)
+
+
+def get_embed_size(request=None):
+    """Number of items to embed in checklist detail (?items_page_size= overrides)."""
+    size = getattr(settings, 'CHECKLIST_ITEMS_EMBED_SIZE', 50)
+    if request is not None:
+        size = _positive_int(request.query_params.get('items_page_size'), default=size)
+    return min(size, get_max_page_size())
+
+
+def _positive_int(value, default):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+class ChecklistItemCursorPagination(BasePagination):
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Keyset ordering - id breaks ties between equal timestamps
+    ordering = ('created_at', 'id')
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'CHECKLIST_ITEMS_PAGE_SIZE', 100)
+        self.max_page_size = get_max_page_size()
+        self.base_url = None
+        self.next_cursor = None
+        self.count = None
+
+    def get_page_size(self, request):
+
+        size = _positive_int(request.query_params.get(self.page_size_query_param), self.page_size)
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, item):
+
+        token = f'{item.created_at.isoformat()}|{item.pk}'
+        return urlsafe_b64encode(token.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+
+        try:
+            created_at, pk = urlsafe_b64decode(cursor.encode('ascii')).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_page_queryset(self, queryset, page_size, cursor=None):
+
+        # One extra row tells whether another page follows
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+        return queryset[:page_size + 1]
+
+    def split_page(self, results, page_size):
+
+        page = results[:page_size]
+        next_cursor = self.encode_cursor(page[-1]) if len(results) > page_size else None
+        return page, next_cursor
+
+    def get_page(self, queryset, page_size, cursor=None):
+        """Return (items, next_cursor) for the page starting after cursor."""
+        results = list(self.get_page_queryset(queryset, page_size, cursor))
+        return self.split_page(results, page_size)
+
+    def get_list_page(self, items, page_size, cursor=None):
+        """get_page() for items already in memory (archived checklists)."""
+        items = sorted(items, key=lambda item: (item.created_at, item.pk))
+        if cursor:
+            position = self.decode_cursor(cursor)
+            items = [item for item in items if (item.created_at, item.pk) > position]
+        return self.split_page(items[:page_size + 1], page_size)
+
+    async def aget_page(self, queryset, page_size, cursor=None):
+        """get_page() for async views."""
+        results = [item async for item in self.get_page_queryset(queryset, page_size, cursor)]
+        return self.split_page(results, page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+
+        self.base_url = request.build_absolute_uri()
+        # Index-only COUNT on (checklist, status) - cheap next to the page itself
+        self.count = queryset.count()
+        page, self.next_cursor = self.get_page(
+            queryset,
+            self.get_page_size(request),
+            request.query_params.get(self.cursor_query_param)
+        )
+        return page
+
+    def paginate_list(self, items, request):
+
+        self.base_url = request.build_absolute_uri()
+        self.count = len(items)
+        page, self.next_cursor = self.get_list_page(
+            items,
+            self.get_page_size(request),
+            request.query_params.get(self.cursor_query_param)
+        )
+        return page
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+
+        self.base_url = request.build_absolute_uri()
+        self.count = await queryset.acount()
+        page, self.next_cursor = await self.aget_page(
+            queryset,
+            self.get_page_size(request),
+            request.query_params.get(self.cursor_query_param)
+        )
+        return page
+
+    def get_next_link(self):
+
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+
+        return Response({
+            'success': True,
+            'count': self.count,
+            'next': self.get_next_link(),
+            'items': data
+        })
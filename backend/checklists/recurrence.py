@@ -0,0 +1,76 @@
+"""
+Date arithmetic of recurring checklist templates.
+
+A rule repeats from an anchor date (the template's recurrence_start):
+weekly every 7 days, monthly/quarterly/annually every 1/3/12 months on
+the anchor's day of the month. Months are always counted from the
+anchor, so a schedule starting on the 31st runs on the last day of
+shorter months and returns to the 31st afterwards instead of drifting.
+
+Occurrences are computed, not stepped through: next_occurrence() jumps
+straight to the right period whatever the distance from the anchor.
+"""
+
+import calendar
+from datetime import timedelta
+
+
+# Months between two occurrences of the monthly rules
+MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'annually': 12,
+}
+
+
+def add_months(day, months):
+    """day moved by a number of months, clamped to the end of shorter months."""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence(rule, anchor, number):
+    """The number-th occurrence of a rule (the anchor itself is number 0)."""
+    if rule == 'weekly':
+        return anchor + timedelta(weeks=number)
+    return add_months(anchor, MONTHS[rule] * number)
+
+
+def next_occurrence(rule, anchor, after):
+    """The first occurrence strictly after the date `after`."""
+    if after < anchor:
+        return anchor
+
+    if rule == 'weekly':
+        number = (after - anchor).days // 7
+    else:
+        months = (after.year - anchor.year) * 12 + after.month - anchor.month
+        number = months // MONTHS[rule]
+
+    # The estimate is at most one period short (clamped days)
+    while occurrence(rule, anchor, number) <= after:
+        number += 1
+    return occurrence(rule, anchor, number)
+
+
+def occurrences_between(rule, anchor, start, end):
+    """The occurrences from start to end, both included."""
+    days = []
+    day = next_occurrence(rule, anchor, start - timedelta(days=1))
+    while day <= end:
+        days.append(day)
+        day = next_occurrence(rule, anchor, day)
+    return days
+
+
+def occurrence_label(rule, day):
+    """The period an occurrence stands for, e.g. "2026-Q4" - appended to checklist names."""
+    if rule == 'annually':
+        return str(day.year)
+    if rule == 'quarterly':
+        return f'{day.year}-Q{(day.month - 1) // 3 + 1}'
+    if rule == 'monthly':
+        return day.strftime('%Y-%m')
+    return day.isoformat()
@@ -1,22 +1,172 @@
-from django.db.models import QuerySet, Count, Q, Prefetch
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models import QuerySet, Count, Q, F, Max, Prefetch, Value, IntegerField, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from datetime import datetime
 from django.utils import timezone
 
-from .models import Checklist, ChecklistItem
+from .models import (
+    Checklist,
+    ChecklistItem,
+    Owner,
+    IdempotencyKey,
+    Change,
+    ChecklistTemplate,
+    TemplateItem,
+    ArchivedChecklist,
+    EvidenceBlob,
+    EvidenceAttachment
+)
+from .archive import field_names, pack, to_instance, unpack
+from .broker import make_event, publish_changes_on_commit, publish_events_on_commit
+from .identity_map import get_identity_map
+
+
+# Per-checklist item counts computed in SQL, instead of one COUNT query per checklist
+ITEM_COUNT_ANNOTATIONS = {
+    'item_count': Count('items'),
+    'completed_item_count': Count('items', filter=Q(items__status__in=['completed', 'not-applicable'])),
+    'pending_item_count': Count('items', filter=Q(items__status__in=['pending', 'in-progress'])),
+}
+
+
+def _count_items(**filters):
+    
+    items = ChecklistItem.objects.filter(checklist=OuterRef('pk'), **filters).order_by()
+    return Coalesce(Subquery(items.values('checklist').annotate(count=Count('id')).values('count')), 0)
+
+
+# The same counts as correlated subqueries - evaluated only for the rows a
+# page returns, where the JOIN and GROUP BY above count the items of every
+# matching checklist before the LIMIT applies (see ChecklistAdmin)
+ITEM_COUNT_SUBQUERIES = {
+    'item_count': _count_items(),
+    'completed_item_count': _count_items(status__in=['completed', 'not-applicable']),
+    'pending_item_count': _count_items(status__in=['pending', 'in-progress']),
+}
+
+# Whatever changes when a checklist (or one of its items, or their owner) is
+# written or deleted - the HTTP validators are derived from this
+CHECKLIST_FRESHNESS = {
+    'version': Max('version'),
+    'count': Count('id', distinct=True),
+    'updated_at': Max('updated_at'),
+    'item_count': Count('items'),
+    'items_updated_at': Max('items__updated_at'),
+    'owners_updated_at': Max('items__owner__updated_at'),
+}
+
+ITEM_FRESHNESS = {
+    'version': Max('version'),
+    'count': Count('id'),
+    'updated_at': Max('updated_at'),
+    'owners_updated_at': Max('owner__updated_at'),
+}
+
+# Dashboard item totals in one aggregate query, instead of one COUNT per status
+ITEM_STATUS_COUNTS = {
+    'total_items': Count('id'),
+    'completed_items': Count('id', filter=Q(status='completed')),
+    'pending_items': Count('id', filter=Q(status='pending')),
+    'in_progress_items': Count('id', filter=Q(status='in-progress')),
+}
+
+
+def conditional_update(model, instance, versions, values):
+    """
+    UPDATE ... SET <values>, version = version + 1 WHERE id = ? [AND version IN (?)]
+    
+    No read-modify-write and no row lock: concurrent editors either hit
+    different columns or, when they send If-Match, lose cleanly.
+    """
+    values = dict(values, updated_at=timezone.now())
+    
+    queryset = model.objects.filter(id=instance.id)
+    if versions is not None:
+        queryset = queryset.filter(version__in=versions)
+    
+    if not queryset.update(version=F('version') + 1, **values):
+        return None
+    
+    for key, value in values.items():
+        setattr(instance, key, value)
+    instance.refresh_from_db(fields=['version'])
+    
+    # QuerySet.update() sends no post_save signal, so record the change here
+    ChangeRepository().record(instance, 'updated')
+    return instance
+
+
+def insert_from_select(model, source, columns):
+    """
+    INSERT INTO <model> (<columns>) SELECT ... FROM <source> - one statement.
+    
+    columns maps fields of model to expressions over the source queryset
+    (F('title'), Value('pending'), ...). The rows are copied inside the
+    database; nothing is loaded into Python. Returns the number of rows.
+    """
+    # Aliased, since annotations can't reuse the source model's field names
+    aliases = {f'copy_{name}': expression for name, expression in columns.items()}
+    sql, params = source.annotate(**aliases).values_list(*aliases).query.sql_with_params()
+    
+    quote = connection.ops.quote_name
+    targets = ', '.join(quote(model._meta.get_field(name).column) for name in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {quote(model._meta.db_table)} ({targets}) {sql}', params)
+        return cursor.rowcount
+
+
+def delete_rows(queryset):
+    """
+    DELETE FROM <model> WHERE id IN (<queryset>) - one statement.
+    
+    Unlike QuerySet.delete(), nothing is loaded into Python: no post_delete
+    signal per row and no cascade, so dependent rows must be deleted first.
+    Returns the number of rows.
+    """
+    model = queryset.model
+    sql, params = queryset.values('pk').query.sql_with_params()
+    
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({sql})',
+            params
+        )
+        return cursor.rowcount
 
 
 class ChecklistRepository:
     
     def get_all(self):
 
-        return Checklist.objects.select_related('created_by').prefetch_related('items').all()
+        return Checklist.objects.select_related('created_by').prefetch_related('items__owner').all()
     
     def get_by_id(self, checklist_id):
-
-        try:
-            return Checklist.objects.select_related('created_by').prefetch_related('items').get(id=checklist_id)
-        except Checklist.DoesNotExist:
+        
+        # The checklist row only: serializers page the items themselves
+        identity_map = get_identity_map()
+        checklist = identity_map.get(Checklist, checklist_id)
+        if checklist is None:
+            checklist = identity_map.add(Checklist.objects.filter(id=checklist_id).first())
+        return checklist
+    
+    def get_by_id_only(self, checklist_id, *fields, user=None):
+        """
+        A projection: the checklist with only these fields loaded (and id),
+        e.g. get_by_id_only(5, 'status', 'created_by') to check a business
+        rule. An already loaded instance is returned as is. With user,
+        someone else's checklist is not found.
+        """
+        checklist = get_identity_map().get(Checklist, checklist_id)
+        if checklist is None:
+            queryset = Checklist.objects.only(*fields).filter(id=checklist_id)
+            if user is not None:
+                queryset = queryset.filter(created_by=user)
+            return queryset.first()
+        if user is not None and checklist.created_by_id != user.id:
             return None
+        return checklist
     
     def get_by_user(self, user):
         
@@ -24,37 +174,154 @@ class ChecklistRepository:
         if not user or not user.is_authenticated:
             return Checklist.objects.none()
         
-        return Checklist.objects.filter(created_by=user).select_related('created_by').prefetch_related('items')
+        return Checklist.objects.filter(created_by=user).select_related('created_by')
+    
+    def with_item_counts(self, queryset, names=None):
+        
+        # Annotate item_count / completed_item_count / pending_item_count
+        names = names or ITEM_COUNT_ANNOTATIONS.keys()
+        return queryset.annotate(**{name: ITEM_COUNT_ANNOTATIONS[name] for name in names})
+    
+    def with_item_count_subqueries(self, queryset, names=None):
+        
+        names = names or ITEM_COUNT_SUBQUERIES.keys()
+        return queryset.annotate(**{name: ITEM_COUNT_SUBQUERIES[name] for name in names})
+    
+    def load_item_counts(self, checklist):
+        
+        # The same counts for an already loaded checklist - one aggregate
+        # query instead of one COUNT per serializer field
+        counts = Checklist.objects.filter(id=checklist.id).aggregate(**ITEM_COUNT_ANNOTATIONS)
+        for name, value in counts.items():
+            setattr(checklist, name, value)
+        return checklist
+    
+    def exists(self, checklist_id, user=None):
+        
+        queryset = Checklist.objects.filter(id=checklist_id)
+        if user is not None:
+            queryset = queryset.filter(created_by=user)
+        return queryset.exists()
     
     def get_by_status(self, status):
         
-        return Checklist.objects.filter(status=status).select_related('created_by').prefetch_related('items')
+        return Checklist.objects.filter(status=status).select_related('created_by').prefetch_related('items__owner')
     
     def search(self, query):
         
         return Checklist.objects.filter(
             Q(name__icontains=query) | Q(description__icontains=query)
-        ).select_related('created_by').prefetch_related('items')
+        ).select_related('created_by').prefetch_related('items__owner')
     
     def create(self, **kwargs):
-       
-        return Checklist.objects.create(**kwargs)
-    
-    def update(self, checklist, **kwargs):
-
-        for key, value in kwargs.items():
-            setattr(checklist, key, value)
-        checklist.save()
+        
+        checklist = get_identity_map().add(Checklist.objects.create(**kwargs))
+        # A new checklist has no items yet - nothing to count
+        checklist.item_count = checklist.completed_item_count = checklist.pending_item_count = 0
         return checklist
     
+    def bulk_create(self, checklists):
+        
+        # Ids come back (INSERT ... RETURNING); no post_save signals fire,
+        # so the caller records the changes (ChangeRepository.record_checklists_created)
+        return Checklist.objects.bulk_create(checklists, batch_size=500)
+    
+    def get_occurrences(self, template_ids, since):
+        
+        # (template id, occurrence) of the checklists already generated - unique together
+        return set(
+            Checklist.objects.filter(template_id__in=template_ids, occurrence__gte=since)
+            .values_list('template_id', 'occurrence')
+        )
+    
+    def update(self, checklist, versions=None, **kwargs):
+        """
+        Update only the given columns in one conditional UPDATE.
+        
+        With versions (from If-Match) the row must still have one of them;
+        returns None if it doesn't (someone else changed it first).
+        """
+        return conditional_update(Checklist, checklist, versions, kwargs)
+    
+    def without_incomplete_items(self, queryset):
+        
+        return queryset.exclude(Exists(
+            ChecklistItem.objects.filter(checklist=OuterRef('pk')).exclude(status__in=['completed', 'not-applicable'])
+        ))
+    
+    def set_status(self, queryset, status, batch_size=1000):
+        """
+        Give every checklist in queryset this status: one UPDATE per batch of
+        ids, versions bumped and the changes recorded like any other update.
+        Checklists that have it already are left alone. Returns the number
+        of checklists updated.
+        """
+        with transaction.atomic():
+            checklist_ids = list(queryset.exclude(status=status).order_by().values_list('id', flat=True))
+            for start in range(0, len(checklist_ids), batch_size):
+                batch = checklist_ids[start:start + batch_size]
+                Checklist.objects.filter(id__in=batch).update(
+                    status=status,
+                    version=F('version') + 1,
+                    updated_at=timezone.now()
+                )
+                ChangeRepository().record_checklist_updates(batch)
+        return len(checklist_ids)
+    
+    def get_version(self, checklist_id):
+        
+        return Checklist.objects.filter(id=checklist_id).values_list('version', flat=True).first()
+    
+    def get_freshness(self, queryset):
+        
+        # One aggregate query; see checklists/conditional.py
+        return queryset.aggregate(**CHECKLIST_FRESHNESS)
+    
+    def status_counts(self):
+        
+        # Dashboard checklist totals in one aggregate query, instead of one COUNT per status
+        today = timezone.now().date()
+        return {
+            'total_checklists': Count('id'),
+            'active_checklists': Count('id', filter=Q(status='active')),
+            'completed_checklists': Count('id', filter=Q(status='completed')),
+            'draft_checklists': Count('id', filter=Q(status='draft')),
+            'overdue_checklists': Count('id', filter=Q(due_date__lt=today, status__in=['draft', 'active'])),
+        }
+    
+    def get_status_counts(self, user):
+        
+        return self.get_by_user(user).aggregate(**self.status_counts())
+    
+    def get_completion_percentages(self, user):
+        
+        counted = self.with_item_counts(self.get_by_user(user), ['item_count', 'completed_item_count'])
+        return [checklist.get_completion_percentage() for checklist in counted]
+    
+    def get_by_id_for_user(self, checklist_id, user):
+        
+        # The checklist row only - no items are loaded. The permission check
+        # is part of the query: someone else's checklist is simply not found
+        identity_map = get_identity_map()
+        checklist = identity_map.get(Checklist, checklist_id)
+        if checklist is not None:
+            return checklist if checklist.created_by_id == user.id else None
+        return identity_map.add(Checklist.objects.filter(id=checklist_id, created_by=user).first())
+    
+    def get_by_ids_for_user(self, checklist_ids, user):
+        
+        return self.with_item_counts(
+            Checklist.objects.filter(id__in=checklist_ids, created_by=user).select_related('created_by')
+        )
+    
     def delete(self, checklist_id):
         
-        try:
-            checklist = Checklist.objects.get(id=checklist_id)
-            checklist.delete()
-            return True
-        except Checklist.DoesNotExist:
+        checklist = self.get_by_id(checklist_id)
+        if checklist is None:
             return False
+        get_identity_map().discard(Checklist, checklist_id)
+        checklist.delete()
+        return True
     
     def get_with_items_count(self):
         
@@ -67,33 +334,69 @@ class ChecklistRepository:
         return Checklist.objects.filter(
             due_date__lt=timezone.now().date(),
             status__in=['draft', 'active']
-        ).select_related('created_by').prefetch_related('items')
+        ).select_related('created_by').prefetch_related('items__owner')
 
 
 class ChecklistItemRepository:
     
     def get_all(self):
 
-        return ChecklistItem.objects.select_related('checklist', 'checklist__created_by').all()
+        return ChecklistItem.objects.select_related('checklist', 'checklist__created_by', 'owner').all()
+    
+    def get_by_user(self, user):
+        
+        # The user's items only, filtered in the query (and its COUNT) - not
+        # the whole table filtered afterwards
+        if not user or not user.is_authenticated:
+            return ChecklistItem.objects.none()
+        
+        return ChecklistItem.objects.filter(checklist__created_by=user).select_related('checklist', 'owner')
     
     def get_by_id(self, item_id):
         
-        try:
-            return ChecklistItem.objects.select_related('checklist').get(id=item_id)
-        except ChecklistItem.DoesNotExist:
+        # The checklist comes along: item changes are filed under its owner
+        identity_map = get_identity_map()
+        item = identity_map.get(ChecklistItem, item_id)
+        if item is None:
+            item = identity_map.add(
+                ChecklistItem.objects.select_related('checklist', 'owner').filter(id=item_id).first()
+            )
+        return item
+    
+    def get_by_id_for_user(self, item_id, user):
+        
+        # Someone else's item is simply not found
+        identity_map = get_identity_map()
+        item = identity_map.get(ChecklistItem, item_id)
+        if item is None:
+            item = identity_map.add(
+                ChecklistItem.objects.select_related('checklist', 'owner').filter(
+                    id=item_id,
+                    checklist__created_by=user
+                ).first()
+            )
+        elif item.checklist.created_by_id != user.id:
             return None
+        return item
     
-    def get_by_checklist(self, checklist_id):
+    def get_by_checklist(self, checklist_id, statuses=None):
        
-        return ChecklistItem.objects.filter(checklist_id=checklist_id).select_related('checklist')
+        items = ChecklistItem.objects.filter(checklist_id=checklist_id).select_related('checklist', 'owner')
+        if statuses:
+            items = items.filter(status__in=statuses)
+        return items
     
     def get_by_status(self, status):
         
-        return ChecklistItem.objects.filter(status=status).select_related('checklist')
+        return ChecklistItem.objects.filter(status=status).select_related('checklist', 'owner')
+    
+    def get_by_owner(self, owner_id):
+        
+        return ChecklistItem.objects.filter(owner_id=owner_id).select_related('checklist', 'owner')
     
     def get_by_assigned_owner(self, owner):
         
-        return ChecklistItem.objects.filter(assigned_owner=owner).select_related('checklist')
+        return ChecklistItem.objects.filter(owner__name__iexact=owner).select_related('checklist', 'owner')
     
     def get_incomplete_items_for_checklist(self, checklist_id):
 
@@ -112,21 +415,37 @@ class ChecklistItemRepository:
     
         return ChecklistItem.objects.create(**kwargs)
     
-    def update(self, item, **kwargs):
+    def update(self, item, versions=None, **kwargs):
+        """Conditional update, see ChecklistRepository.update."""
+        return conditional_update(ChecklistItem, item, versions, kwargs)
+    
+    def get_version(self, item_id):
         
-        for key, value in kwargs.items():
-            setattr(item, key, value)
-        item.save()
-        return item
+        return ChecklistItem.objects.filter(id=item_id).values_list('version', flat=True).first()
     
-    def delete(self, item_id):
+    def get_freshness(self, queryset):
+        
+        return queryset.aggregate(**ITEM_FRESHNESS)
     
-        try:
-            item = ChecklistItem.objects.get(id=item_id)
-            item.delete()
-            return True
-        except ChecklistItem.DoesNotExist:
+    def get_status_counts(self, user):
+        
+        return ChecklistItem.objects.filter(checklist__created_by=user).aggregate(**ITEM_STATUS_COUNTS)
+    
+    def get_by_ids_for_user(self, item_ids, user):
+        
+        return ChecklistItem.objects.filter(
+            id__in=item_ids,
+            checklist__created_by=user
+        ).select_related('owner')
+    
+    def delete(self, item_id):
+        
+        item = self.get_by_id(item_id)
+        if item is None:
             return False
+        get_identity_map().discard(ChecklistItem, item_id)
+        item.delete()
+        return True
     
     def delete_by_checklist(self, checklist_id):
         
@@ -139,7 +458,7 @@ class ChecklistItemRepository:
             Q(title__icontains=query) | 
             Q(description__icontains=query) | 
             Q(evidence_notes__icontains=query)
-        ).select_related('checklist')
+        ).select_related('checklist', 'owner')
     
     def get_overdue_items(self):
         
@@ -147,3 +466,697 @@ class ChecklistItemRepository:
             checklist__due_date__lt=timezone.now().date(),
             status__in=['pending', 'in-progress']
         ).select_related('checklist')
+    
+    def count_by_status_for_owner(self, owner_id, user):
+        
+        # One grouped query: SELECT status, COUNT(*) ... GROUP BY status
+        return dict(
+            ChecklistItem.objects.filter(owner_id=owner_id, checklist__created_by=user)
+            .order_by()
+            .values_list('status')
+            .annotate(count=Count('id'))
+        )
+    
+    def reassign_owner(self, from_owner_id, to_owner_id, user, checklist_id=None):
+        
+        items = ChecklistItem.objects.filter(owner_id=from_owner_id, checklist__created_by=user)
+        if checklist_id is not None:
+            items = items.filter(checklist_id=checklist_id)
+        
+        # Single UPDATE statement - only the ids are loaded, for the change feed
+        with transaction.atomic():
+            item_ids = list(items.values_list('id', flat=True))
+            updated = ChecklistItem.objects.filter(id__in=item_ids).update(
+                owner_id=to_owner_id,
+                version=F('version') + 1,
+                updated_at=timezone.now()
+            )
+            ChangeRepository().record_item_updates(item_ids)
+        return updated
+    
+    def touch_owner_items(self, owner_id, **changes):
+        """
+        Bump the version of every item of an owner, applying changes, and
+        record them in the change feed - for owner renames and deletes,
+        which change what the items show without going through them.
+        """
+        with transaction.atomic():
+            item_ids = list(ChecklistItem.objects.filter(owner_id=owner_id).values_list('id', flat=True))
+            updated = ChecklistItem.objects.filter(id__in=item_ids).update(
+                version=F('version') + 1,
+                updated_at=timezone.now(),
+                **changes
+            )
+            ChangeRepository().record_item_updates(item_ids)
+        return updated
+    
+    def copy_to_checklist(self, source, checklist_id, keep_owners=True):
+        """
+        Copy items into a checklist as new pending items, in one INSERT ... SELECT.
+        
+        source is an ordered ChecklistItem or TemplateItem queryset; title,
+        description and (with keep_owners) the owner are copied. Status,
+        evidence notes and completed_at start afresh.
+        """
+        now = timezone.now()
+        return insert_from_select(ChecklistItem, source, {
+            'checklist': Value(checklist_id),
+            'title': F('title'),
+            'description': F('description'),
+            'status': Value('pending'),
+            'owner': F('owner') if keep_owners else Value(None, output_field=IntegerField()),
+            'evidence_notes': Value(''),
+            'created_at': Value(now),
+            'updated_at': Value(now),
+            'version': Value(1),
+        })
+    
+    def copy_from_templates(self, checklist_ids):
+        """
+        Fill generated checklists with the items of their templates - one
+        INSERT ... SELECT for all of them (a join of template items and
+        checklists on the template).
+        """
+        now = timezone.now()
+        source = TemplateItem.objects.filter(template__checklists__id__in=checklist_ids).order_by(
+            'template__checklists__id', 'id'
+        )
+        return insert_from_select(ChecklistItem, source, {
+            'checklist': F('template__checklists__id'),
+            'title': F('title'),
+            'description': F('description'),
+            'status': Value('pending'),
+            'owner': F('owner'),
+            'evidence_notes': Value(''),
+            'created_at': Value(now),
+            'updated_at': Value(now),
+            'version': Value(1),
+        })
+
+
+class OwnerRepository:
+    
+    def get_all(self):
+        
+        return Owner.objects.select_related('user').all()
+    
+    def get_by_user(self, user):
+        
+        # Owners are private to the user who created them
+        if not user or not user.is_authenticated:
+            return Owner.objects.none()
+        
+        return Owner.objects.filter(created_by=user).select_related('user')
+    
+    def get_by_id(self, owner_id):
+        
+        try:
+            return Owner.objects.select_related('user').get(id=owner_id)
+        except Owner.DoesNotExist:
+            return None
+    
+    def get_by_id_for_user(self, owner_id, user):
+        
+        # Someone else's owner is simply not found
+        try:
+            return Owner.objects.select_related('user').get(id=owner_id, created_by=user)
+        except (Owner.DoesNotExist, ValueError, TypeError):
+            return None
+    
+    def get_by_name(self, name, user):
+        
+        return Owner.objects.filter(created_by=user, name__iexact=name.strip()).first()
+    
+    def get_or_create_by_name(self, name, user):
+        
+        # Blank names mean "unassigned"
+        name = (name or '').strip()
+        if not name:
+            return None
+        
+        owner = self.get_by_name(name, user)
+        if owner:
+            return owner
+        try:
+            with transaction.atomic():
+                return Owner.objects.create(name=name, created_by=user)
+        except IntegrityError:
+            # Created by a concurrent request in the meantime
+            return self.get_by_name(name, user)
+    
+    def create(self, **kwargs):
+        
+        return Owner.objects.create(**kwargs)
+    
+    def update(self, owner, **kwargs):
+        
+        for key, value in kwargs.items():
+            setattr(owner, key, value)
+        owner.save()
+        return owner
+    
+    def delete(self, owner_id):
+        
+        try:
+            owner = Owner.objects.get(id=owner_id)
+            owner.delete()
+            return True
+        except Owner.DoesNotExist:
+            return False
+
+
+class TemplateRepository:
+    
+    def get_by_user(self, user):
+        
+        if not user or not user.is_authenticated:
+            return ChecklistTemplate.objects.none()
+        
+        # Meta.ordering is ignored in GROUP BY queries, so make it explicit
+        return ChecklistTemplate.objects.filter(created_by=user).annotate(item_count=Count('items')).order_by('name')
+    
+    def get_by_id_for_user(self, template_id, user):
+        
+        return ChecklistTemplate.objects.filter(id=template_id, created_by=user).first()
+    
+    def get_items(self, template_id):
+        
+        return TemplateItem.objects.filter(template_id=template_id).order_by('id')
+    
+    def get_due(self, day, after_id=0, limit=200):
+        
+        # Recurring templates with an occurrence on or before day, in id order
+        # (keyset pagination); templates without recurrence have no next_run_on
+        return list(
+            ChecklistTemplate.objects.filter(next_run_on__lte=day, id__gt=after_id)
+            .order_by('id')[:limit]
+        )
+    
+    def advance(self, template, next_run_on):
+        """
+        Move a template's schedule on: UPDATE ... WHERE next_run_on = <as read>.
+        
+        Returns False when another run advanced it first - that run creates
+        the checklists, this one skips the template.
+        """
+        advanced = ChecklistTemplate.objects.filter(
+            id=template.id,
+            next_run_on=template.next_run_on
+        ).update(next_run_on=next_run_on)
+        if advanced:
+            template.next_run_on = next_run_on
+        return advanced > 0
+    
+    def create(self, **kwargs):
+        
+        return ChecklistTemplate.objects.create(**kwargs)
+    
+    def update(self, template, **kwargs):
+        
+        for key, value in kwargs.items():
+            setattr(template, key, value)
+        template.save()
+        return template
+    
+    def delete(self, template_id):
+        
+        deleted, _ = ChecklistTemplate.objects.filter(id=template_id).delete()
+        return deleted > 0
+    
+    def replace_items(self, template, items):
+        
+        # Template items aren't edited one by one - the list is replaced
+        TemplateItem.objects.filter(template=template).delete()
+        return TemplateItem.objects.bulk_create(
+            [TemplateItem(template=template, **item) for item in items],
+            batch_size=1000
+        )
+    
+    def copy_items_from_checklist(self, template, checklist_id, keep_owners=True):
+        """The checklist's items become the template's, in one INSERT ... SELECT."""
+        source = ChecklistItem.objects.filter(checklist_id=checklist_id).order_by('created_at', 'id')
+        return insert_from_select(TemplateItem, source, {
+            'template': Value(template.id),
+            'title': F('title'),
+            'description': F('description'),
+            'owner': F('owner') if keep_owners else Value(None, output_field=IntegerField()),
+        })
+
+
+class ArchiveRepository:
+    """Archived checklists (see checklists/archive.py)."""
+    
+    def get_by_user(self, user):
+        
+        if not user or not user.is_authenticated:
+            return ArchivedChecklist.objects.none()
+        
+        return ArchivedChecklist.objects.filter(created_by=user).select_related('created_by')
+    
+    def get_for_user(self, checklist_id, user, for_update=False):
+        
+        queryset = ArchivedChecklist.objects.filter(id=checklist_id, created_by=user)
+        if for_update:
+            queryset = queryset.select_for_update()
+        return queryset.select_related('created_by').first()
+    
+    def get_due(self, cutoff):
+        
+        # Completed, and neither the checklist nor any of its items written since cutoff
+        return Checklist.objects.filter(status='completed', updated_at__lt=cutoff).exclude(items__updated_at__gte=cutoff)
+    
+    def get_due_ids(self, cutoff, after_id, limit):
+        
+        # Keyset pagination by id: each batch starts where the last one ended
+        return list(
+            self.get_due(cutoff).filter(id__gt=after_id).order_by('id').values_list('id', flat=True)[:limit]
+        )
+    
+    def count_items(self, checklist_ids):
+        
+        return ChecklistItem.objects.filter(checklist_id__in=checklist_ids).count()
+    
+    def archive(self, checklist_ids, cutoff):
+        """
+        Move the checklists that are still due out of the live tables.
+        
+        Three SELECTs, two INSERTs per 500 checklists and three DELETEs. Returns
+        the (id, created_by_id) of the archived checklists, the number of
+        items and the packed and unpacked payload sizes.
+        """
+        # Checked again here: one may have been reopened since the batch was picked
+        rows = list(
+            self.get_due(cutoff).filter(id__in=checklist_ids).select_for_update().order_by('id').values(*field_names(Checklist))
+        )
+        ids = [row['id'] for row in rows]
+        items = {checklist_id: [] for checklist_id in ids}
+        for item in ChecklistItem.objects.filter(checklist_id__in=ids).order_by('created_at', 'id').values(*field_names(ChecklistItem)):
+            items[item['checklist_id']].append(item)
+        attachments = {checklist_id: [] for checklist_id in ids}
+        attachment_rows = EvidenceAttachment.objects.filter(item__checklist_id__in=ids).order_by('id').values(
+            'item__checklist_id', *field_names(EvidenceAttachment)
+        )
+        for attachment in attachment_rows:
+            attachments[attachment.pop('item__checklist_id')].append(attachment)
+        
+        archived = []
+        blob_links = []
+        packed_size = unpacked_size = 0
+        for row in rows:
+            payload, size = pack(row, items[row['id']], attachments[row['id']])
+            packed_size += len(payload)
+            unpacked_size += size
+            archived.append(ArchivedChecklist(
+                id=row['id'],
+                name=row['name'],
+                description=row['description'],
+                due_date=row['due_date'],
+                status=row['status'],
+                created_by_id=row['created_by_id'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at'],
+                version=row['version'],
+                item_count=len(items[row['id']]),
+                completed_item_count=sum(
+                    1 for item in items[row['id']] if item['status'] in ('completed', 'not-applicable')
+                ),
+                payload=payload
+            ))
+            blob_links.extend(
+                ArchivedChecklist.evidence_blobs.through(archivedchecklist_id=row['id'], evidenceblob_id=blob_id)
+                for blob_id in {attachment['blob_id'] for attachment in attachments[row['id']]}
+            )
+        ArchivedChecklist.objects.bulk_create(archived, batch_size=500)
+        ArchivedChecklist.evidence_blobs.through.objects.bulk_create(blob_links, batch_size=500)
+        
+        # Plain DELETEs - no signal per row; the caller records the tombstones in bulk
+        delete_rows(EvidenceAttachment.objects.filter(item__checklist_id__in=ids))
+        delete_rows(ChecklistItem.objects.filter(checklist_id__in=ids))
+        delete_rows(Checklist.objects.filter(id__in=ids))
+        
+        scopes = [(row['id'], row['created_by_id']) for row in rows]
+        return scopes, sum(len(checklist_items) for checklist_items in items.values()), packed_size, unpacked_size
+    
+    def unpack(self, archived, create_owners=False):
+        """
+        The archived checklist as unsaved Checklist / ChecklistItem instances,
+        with item counts and owners - ready for the serializers.
+        """
+        checklist_row, item_rows, _ = unpack(archived.payload)
+        checklist = to_instance(Checklist, checklist_row)
+        checklist.created_by = archived.created_by
+        checklist.item_count = archived.item_count
+        checklist.completed_item_count = archived.completed_item_count
+        
+        items = [to_instance(ChecklistItem, row) for row in item_rows]
+        checklist.pending_item_count = sum(1 for item in items if item.status in ('pending', 'in-progress'))
+        owners = self.get_owners(archived.created_by, {item.owner_id for item in items if item.owner_id}, create_owners)
+        for item in items:
+            item.checklist = checklist
+            # An owner deleted since archiving is simply gone
+            item.owner = owners.get(item.owner_id)
+        return checklist, items
+    
+    def get_owners(self, user, owner_ids, create=False):
+        """
+        The user's owners by archived owner id. Checklists archived while
+        owners were shared can name another user's owner: the user's owner
+        of the same name stands in for it (with create, one is made).
+        """
+        owners = Owner.objects.in_bulk(owner_ids)
+        foreign = {owner_id: owner.name for owner_id, owner in owners.items() if owner.created_by_id != user.id}
+        if foreign:
+            own = {owner.name: owner for owner in Owner.objects.filter(created_by=user, name__in=foreign.values())}
+            for owner_id, name in foreign.items():
+                if name not in own and create:
+                    own[name] = OwnerRepository().get_or_create_by_name(name, user)
+                owners[owner_id] = own.get(name)
+        return owners
+    
+    def restore(self, archived):
+        """Put an archived checklist and its items back, with their ids, versions and timestamps."""
+        # Owners that only have a stand-in by name are created for the user now
+        checklist, items = self.unpack(archived, create_owners=True)
+        _, _, attachment_rows = unpack(archived.payload)
+        attachments = [to_instance(EvidenceAttachment, row) for row in attachment_rows]
+        
+        # References that may have gone since the checklist was archived
+        if checklist.template_id is not None and (
+            not ChecklistTemplate.objects.filter(id=checklist.template_id).exists()
+            or Checklist.objects.filter(template_id=checklist.template_id, occurrence=checklist.occurrence).exists()
+        ):
+            checklist.template_id = None
+        
+        # An uploader deleted since archiving is simply gone
+        uploaders = User.objects.in_bulk({attachment.uploaded_by_id for attachment in attachments if attachment.uploaded_by_id})
+        for attachment in attachments:
+            if attachment.uploaded_by_id not in uploaders:
+                attachment.uploaded_by_id = None
+        
+        # bulk_create stamps auto_now(_add) fields with the current time - the original ones go back after
+        timestamps = [(obj.created_at, obj.updated_at) for obj in [checklist, *items]]
+        attachment_timestamps = [attachment.created_at for attachment in attachments]
+        Checklist.objects.bulk_create([checklist])
+        ChecklistItem.objects.bulk_create(items, batch_size=500)
+        EvidenceAttachment.objects.bulk_create(attachments, batch_size=500)
+        for obj, (created_at, updated_at) in zip([checklist, *items], timestamps):
+            obj.created_at, obj.updated_at = created_at, updated_at
+        for attachment, created_at in zip(attachments, attachment_timestamps):
+            attachment.created_at = created_at
+        Checklist.objects.bulk_update([checklist], ['created_at', 'updated_at'])
+        ChecklistItem.objects.bulk_update(items, ['created_at', 'updated_at'], batch_size=500)
+        EvidenceAttachment.objects.bulk_update(attachments, ['created_at'], batch_size=500)
+        
+        # Deletes the evidence_blobs links too - the attachments hold the files again
+        archived.delete()
+        return checklist
+
+
+class EvidenceRepository:
+    """Evidence attachments and the stored files behind them (see checklists/evidence.py)."""
+    
+    def get_item_for_user(self, item_id, user):
+        
+        return ChecklistItem.objects.filter(id=item_id, checklist__created_by=user).select_related('checklist').first()
+    
+    def get_by_item(self, item_id):
+        
+        return EvidenceAttachment.objects.filter(item_id=item_id).select_related('blob', 'uploaded_by')
+    
+    def get_for_user(self, attachment_id, user):
+        
+        return EvidenceAttachment.objects.filter(
+            id=attachment_id,
+            item__checklist__created_by=user
+        ).select_related('blob', 'uploaded_by').first()
+    
+    def get_or_create_blob(self, sha256, size):
+        """The locked blob row for a content hash - (blob, created)."""
+        blob = EvidenceBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is not None:
+            return blob, False
+        try:
+            with transaction.atomic():
+                return EvidenceBlob.objects.create(sha256=sha256, size=size), True
+        except IntegrityError:
+            # Created by a concurrent upload of the same content
+            return EvidenceBlob.objects.select_for_update().get(sha256=sha256), False
+    
+    def create(self, **kwargs):
+        
+        return EvidenceAttachment.objects.create(**kwargs)
+    
+    def delete(self, attachment):
+        
+        attachment.delete()
+    
+    def get_unreferenced_blobs(self, blob_ids=None):
+        """
+        Locked blob rows no attachment and no archived checklist uses. NOT
+        EXISTS rather than a LEFT JOIN, which can't be locked FOR UPDATE.
+        """
+        blobs = EvidenceBlob.objects.filter(
+            ~Exists(EvidenceAttachment.objects.filter(blob=OuterRef('pk'))),
+            ~Exists(ArchivedChecklist.evidence_blobs.through.objects.filter(evidenceblob=OuterRef('pk')))
+        )
+        if blob_ids is not None:
+            blobs = blobs.filter(id__in=blob_ids)
+        return list(blobs.select_for_update().order_by('id'))
+    
+    def delete_blobs(self, blobs):
+        
+        return EvidenceBlob.objects.filter(id__in=[blob.id for blob in blobs]).delete()[0]
+
+
+class IdempotencyKeyRepository:
+    
+    def get(self, user, key):
+        
+        return IdempotencyKey.objects.filter(user=user, key=key).first()
+    
+    def claim(self, user, key, fingerprint, ttl):
+        """
+        Reserve a key for a new request. Returns (record, created).
+        
+        The unique constraint on (user, key) decides which of several
+        concurrent requests wins; the others get the existing record.
+        """
+        now = timezone.now()
+        
+        # An expired key is forgotten and can be used again
+        IdempotencyKey.objects.filter(user=user, key=key, expires_at__lte=now).delete()
+        
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + ttl
+                )
+            return record, True
+        except IntegrityError:
+            return self.get(user, key), False
+    
+    def complete(self, record, response_status, response_body, response_headers=None):
+        
+        IdempotencyKey.objects.filter(id=record.id).update(
+            response_status=response_status,
+            response_body=response_body,
+            response_headers=response_headers
+        )
+    
+    def release(self, record):
+        
+        IdempotencyKey.objects.filter(id=record.id).delete()
+    
+    def delete_expired(self):
+        
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+class ChangeRepository:
+    
+    def record(self, instance, action):
+        """Append a change for a Checklist or ChecklistItem instance."""
+        checklist_id, user_id = instance.get_change_scope()
+        
+        version = None
+        if action != 'deleted':
+            # save() leaves an F() expression behind until the version is reloaded
+            if not isinstance(instance.version, int):
+                instance.refresh_from_db(fields=['version'])
+            version = instance.version
+        
+        change = Change.objects.create(
+            resource=instance.change_resource,
+            object_id=instance.pk,
+            checklist_id=checklist_id,
+            user_id=user_id,
+            action=action,
+            version=version
+        )
+        publish_changes_on_commit([change])
+        return change
+    
+    def record_item_updates(self, item_ids):
+        
+        # One SELECT and one bulk INSERT, however many items changed
+        rows = ChecklistItem.objects.filter(id__in=item_ids).values_list(
+            'id', 'checklist_id', 'checklist__created_by_id', 'version'
+        )
+        changes = Change.objects.bulk_create(
+            [
+                Change(
+                    resource=ChecklistItem.change_resource,
+                    object_id=item_id,
+                    checklist_id=checklist_id,
+                    user_id=user_id,
+                    action='updated',
+                    version=version
+                )
+                for item_id, checklist_id, user_id, version in rows
+            ],
+            batch_size=1000
+        )
+        publish_changes_on_commit(changes)
+    
+    def record_checklist_updates(self, checklist_ids):
+        
+        rows = Checklist.objects.filter(id__in=checklist_ids).values_list('id', 'created_by_id', 'version')
+        changes = Change.objects.bulk_create(
+            [
+                Change(
+                    resource=Checklist.change_resource,
+                    object_id=checklist_id,
+                    checklist_id=checklist_id,
+                    user_id=user_id,
+                    action='updated',
+                    version=version
+                )
+                for checklist_id, user_id, version in rows
+            ],
+            batch_size=1000
+        )
+        publish_changes_on_commit(changes)
+    
+    def record_items_created(self, checklist_ids):
+        """
+        'created' changes for the items of new checklists that were inserted
+        in SQL (see ChecklistItemRepository.copy_to_checklist) - also one
+        INSERT ... SELECT, since no post_save signal fired.
+        """
+        items = ChecklistItem.objects.filter(checklist_id__in=checklist_ids).order_by('checklist_id', 'created_at', 'id')
+        self._record_created(ChecklistItem.change_resource, items, checklist_ids, F('checklist_id'), F('checklist__created_by'))
+    
+    def record_checklists_created(self, checklist_ids):
+        
+        # Checklists inserted with bulk_create, and their items
+        checklists = Checklist.objects.filter(id__in=checklist_ids).order_by('id')
+        self._record_created(Checklist.change_resource, checklists, checklist_ids, F('id'), F('created_by'))
+        self.record_items_created(checklist_ids)
+    
+    def _record_created(self, resource, source, checklist_ids, checklist_id, user):
+        
+        # New rows get higher sequences, so they are read back by primary key range
+        last_id = Change.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        insert_from_select(Change, source, {
+            'resource': Value(resource),
+            'object_id': F('id'),
+            'action': Value('created'),
+            'checklist_id': checklist_id,
+            'user': user,
+            'version': F('version'),
+            'created_at': Value(timezone.now()),
+        })
+        # Fetched as tuples: thousands of Change instances would cost more
+        # than the copy itself
+        rows = Change.objects.filter(
+            id__gt=last_id,
+            resource=resource,
+            action='created',
+            checklist_id__in=checklist_ids
+        ).order_by('id').values_list('id', 'object_id', 'checklist_id', 'user_id', 'version')
+        publish_events_on_commit([
+            (user_id, make_event(sequence, resource, object_id, checklist_id, 'created', version))
+            for sequence, object_id, checklist_id, user_id, version in rows
+        ])
+    
+    def record_checklists_deleted(self, scopes):
+        
+        # Tombstones for checklists removed without post_delete signals (archiving)
+        changes = Change.objects.bulk_create(
+            [
+                Change(
+                    resource=Checklist.change_resource,
+                    object_id=checklist_id,
+                    checklist_id=checklist_id,
+                    user_id=user_id,
+                    action='deleted'
+                )
+                for checklist_id, user_id in scopes
+            ],
+            batch_size=1000
+        )
+        publish_changes_on_commit(changes)
+    
+    def get_for_user(self, user, since, limit):
+        
+        # Index range scan on (user, id)
+        return list(Change.objects.filter(user=user, id__gt=since).order_by('id')[:limit])
+
+
+class AsyncChecklistRepository(ChecklistRepository):
+    """
+    Async read methods for the async views (see checklists/async_views.py).
+    
+    Querysets are still built by the inherited sync methods - that never
+    touches the database - and only evaluated here, with the async ORM.
+    """
+    
+    async def aget_by_id(self, checklist_id, queryset=None):
+        
+        if queryset is None:
+            queryset = Checklist.objects.select_related('created_by')
+        return await queryset.filter(id=checklist_id).afirst()
+    
+    async def aexists(self, checklist_id, user=None):
+        
+        queryset = Checklist.objects.filter(id=checklist_id)
+        if user is not None:
+            queryset = queryset.filter(created_by=user)
+        return await queryset.aexists()
+    
+    async def acount(self, queryset):
+        
+        return await queryset.acount()
+    
+    async def alist(self, queryset):
+        
+        return [obj async for obj in queryset]
+    
+    async def aget_freshness(self, queryset):
+        
+        return await queryset.aaggregate(**CHECKLIST_FRESHNESS)
+    
+    async def aget_status_counts(self, user):
+        
+        return await self.get_by_user(user).aaggregate(**self.status_counts())
+    
+    async def aget_completion_percentages(self, user):
+        
+        counted = self.with_item_counts(self.get_by_user(user), ['item_count', 'completed_item_count'])
+        return [checklist.get_completion_percentage() async for checklist in counted]
+
+
+class AsyncChecklistItemRepository(ChecklistItemRepository):
+    """Async read methods, see AsyncChecklistRepository."""
+    
+    async def aget_status_counts(self, user):
+        
+        return await ChecklistItem.objects.filter(checklist__created_by=user).aaggregate(**ITEM_STATUS_COUNTS)
+    
+    async def aget_freshness(self, queryset):
+        
+        return await queryset.aaggregate(**ITEM_FRESHNESS)
@@ -1,13 +1,132 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 from django.utils import timezone
-from .models import Checklist, ChecklistItem
+from .models import Checklist, ChecklistItem, Owner, Change, ChecklistTemplate, TemplateItem, EvidenceAttachment
+from .repositories import OwnerRepository, ITEM_COUNT_ANNOTATIONS
+from .pagination import ChecklistItemCursorPagination, get_embed_size
+from .batch import get_max_requests
 
 
-class ChecklistItemSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Lets a serializer output only a subset of its fields.
+    
+    Pass fields=[...] and/or exclude=[...] when creating the serializer.
+    Dropped fields are removed before serialization, so their
+    SerializerMethodFields are never evaluated.
+    
+    field_dependencies describes what each output field reads from the
+    database, so views can trim the queryset to match:
+        'only'     - columns for QuerySet.only() (defaults to the field name)
+        'select'   - relations for select_related()
+        'prefetch' - relations for prefetch_related()
+        'annotate' - names from the serializer's annotations mapping
+    """
+    
+    field_dependencies = {}
+    
+    # Annotation name -> expression, referenced by field_dependencies
+    annotations = {}
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        super().__init__(*args, **kwargs)
+        
+        if fields is not None or exclude is not None:
+            keep = self.select_field_names(self.fields, fields, exclude)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+    
+    @staticmethod
+    def select_field_names(available, fields=None, exclude=None):
+        
+        # Unknown names are ignored, keeping the declared field order
+        names = [name for name in available if fields is None or name in fields]
+        if exclude:
+            names = [name for name in names if name not in exclude]
+        return names
+    
+    @classmethod
+    def optimize_queryset(cls, queryset, field_names, defer_unused=True):
+        
+        only, select, prefetch, annotate = {'id'}, set(), set(), set()
+        for name in field_names:
+            dependencies = cls.field_dependencies.get(name, {'only': [name]})
+            only.update(dependencies.get('only', []))
+            select.update(dependencies.get('select', []))
+            prefetch.update(dependencies.get('prefetch', []))
+            annotate.update(dependencies.get('annotate', []))
+        
+        # Drop the repository's default joins/prefetches and add back only what is needed
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        if annotate:
+            # Meta.ordering is ignored in GROUP BY queries, so make it explicit
+            if not queryset.query.order_by:
+                queryset = queryset.order_by(*queryset.model._meta.ordering)
+            queryset = queryset.annotate(**{name: cls.annotations[name] for name in sorted(annotate)})
+        if defer_unused:
+            queryset = queryset.only(*sorted(only))
+        return queryset
+
+
+class UserOwnerField(serializers.PrimaryKeyRelatedField):
+    """An owner id - only the requesting user's owners are accepted."""
+    
+    def get_queryset(self):
+        
+        request = self.context.get('request')
+        return OwnerRepository().get_by_user(getattr(request, 'user', None))
+
+
+class OwnerSerializer(serializers.ModelSerializer):
+    
+    class Meta:
+        model = Owner
+        fields = ['id', 'name', 'user', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class OwnerWorkloadSerializer(serializers.Serializer):
+    
+    owner_id = serializers.IntegerField()
+    owner_name = serializers.CharField()
+    total_items = serializers.IntegerField()
+    pending_items = serializers.IntegerField()
+    in_progress_items = serializers.IntegerField()
+    completed_items = serializers.IntegerField()
+    not_applicable_items = serializers.IntegerField()
+
+
+class OwnerReassignSerializer(serializers.Serializer):
+    
+    # Target owner id - null unassigns the items
+    to_owner = serializers.IntegerField(allow_null=True)
+    
+    # Optionally limit the reassignment to one checklist
+    checklist = serializers.IntegerField(required=False)
+
+
+class ChecklistItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     
     # Read-only computed field to show if the item is completed
     is_completed = serializers.SerializerMethodField()
     
+    # Owner name - accepts free text and resolves it to an Owner row
+    assigned_owner = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    
+    # Owner id - takes precedence over assigned_owner when both are sent
+    owner = UserOwnerField(
+        required=False,
+        allow_null=True
+    )
+    
     class Meta:
         model = ChecklistItem
         fields = [
@@ -16,15 +135,24 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
             'title',
             'description',
             'status',
+            'owner',
             'assigned_owner',
             'evidence_notes',
             'completed_at',
             'created_at',
             'updated_at',
+            'version',
             'is_completed'
         ]
         # These fields are automatically managed by Django, so read-only
-        read_only_fields = ['id', 'created_at', 'updated_at', 'is_completed']
+        # version is the item's ETag - send it back in If-Match when updating
+        read_only_fields = ['id', 'created_at', 'updated_at', 'version', 'is_completed']
+    
+    field_dependencies = {
+        'owner': {'only': ['owner']},
+        'assigned_owner': {'only': ['owner__name'], 'select': ['owner']},
+        'is_completed': {'only': ['status']},
+    }
     
     def get_is_completed(self, obj):
         
@@ -52,6 +180,15 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
         if new_status != 'completed' and instance.status == 'completed':
             validated_data['completed_at'] = None
         
+        # Resolve the owner name to an Owner row
+        if 'assigned_owner' in validated_data:
+            assigned_owner = validated_data.pop('assigned_owner')
+            if 'owner' not in validated_data:
+                validated_data['owner'] = OwnerRepository().get_or_create_by_name(
+                    assigned_owner,
+                    self.context['request'].user
+                )
+        
         # Update the instance with validated data
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -62,12 +199,20 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
 
 class ChecklistItemCreateSerializer(serializers.ModelSerializer):
     
+    assigned_owner = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    
+    owner = UserOwnerField(
+        required=False,
+        allow_null=True
+    )
+    
     class Meta:
         model = ChecklistItem
         fields = [
             'title',
             'description',
             'status',
+            'owner',
             'assigned_owner',
             'evidence_notes'
         ]
@@ -79,11 +224,43 @@ class ChecklistItemCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class ChecklistSerializer(serializers.ModelSerializer):
+class EvidenceAttachmentSerializer(serializers.ModelSerializer):
+    
+    # Size and hash of the stored file (shared by every attachment of the same content)
+    size = serializers.IntegerField(source='blob.size', read_only=True)
+    sha256 = serializers.CharField(source='blob.sha256', read_only=True)
     
-    # Nested serialization - includes all items in the checklist
-    # read_only=True because items are managed through separate endpoints
-    items = ChecklistItemSerializer(many=True, read_only=True)
+    uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True, default=None)
+    
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = EvidenceAttachment
+        fields = [
+            'id',
+            'item',
+            'filename',
+            'content_type',
+            'size',
+            'sha256',
+            'uploaded_by',
+            'uploaded_by_username',
+            'created_at',
+            'download_url'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        
+        return reverse('attachment-download', kwargs={'pk': obj.pk}, request=self.context.get('request'))
+
+
+class ChecklistSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    
+    # First page of the checklist's items (CHECKLIST_ITEMS_EMBED_SIZE of them)
+    # The rest is fetched from items_next, the cursor-paginated items endpoint
+    items = serializers.SerializerMethodField()
+    items_next = serializers.SerializerMethodField()
     
     # Computed fields that don't exist in the database
     is_overdue = serializers.SerializerMethodField()
@@ -107,7 +284,9 @@ class ChecklistSerializer(serializers.ModelSerializer):
             'created_by_username',
             'created_at',
             'updated_at',
+            'version',
             'items',
+            'items_next',
             'is_overdue',
             'completion_percentage',
             'total_items',
@@ -119,10 +298,70 @@ class ChecklistSerializer(serializers.ModelSerializer):
             'created_by',
             'created_at',
             'updated_at',
+            'version',
             'is_overdue',
             'completion_percentage'
         ]
     
+    field_dependencies = {
+        'created_by': {'only': ['created_by']},
+        'created_by_username': {'only': ['created_by__username'], 'select': ['created_by']},
+        'items': {},
+        'items_next': {},
+        'is_overdue': {'only': ['due_date', 'status']},
+        'completion_percentage': {'only': ['status'], 'annotate': ['item_count', 'completed_item_count']},
+        'total_items': {'annotate': ['item_count']},
+        'completed_items': {'annotate': ['completed_item_count']},
+        'pending_items': {'annotate': ['pending_item_count']},
+    }
+    
+    annotations = ITEM_COUNT_ANNOTATIONS
+    
+    def _get_items_page(self, obj):
+        
+        # items and items_next share one query per checklist
+        if not hasattr(self, '_items_pages'):
+            self._items_pages = {}
+        if obj.pk not in self._items_pages:
+            paginator = ChecklistItemCursorPagination()
+            self._items_pages[obj.pk] = paginator.get_page(
+                obj.items.select_related('owner'),
+                get_embed_size(self.context.get('request'))
+            )
+        return self._items_pages[obj.pk]
+    
+    async def aload_items_page(self, obj):
+        """Fetch obj's embedded items with the async ORM, so .data runs no query."""
+        if not {'items', 'items_next'} & set(self.fields):
+            return
+        if not hasattr(self, '_items_pages'):
+            self._items_pages = {}
+        paginator = ChecklistItemCursorPagination()
+        self._items_pages[obj.pk] = await paginator.aget_page(
+            obj.items.select_related('owner'),
+            get_embed_size(self.context.get('request'))
+        )
+    
+    def set_items_page(self, obj, items, next_cursor=None):
+        """Embed items that are already loaded (archived checklists) instead of querying."""
+        if not hasattr(self, '_items_pages'):
+            self._items_pages = {}
+        self._items_pages[obj.pk] = (items, next_cursor)
+    
+    def get_items(self, obj):
+        
+        page, _ = self._get_items_page(obj)
+        return ChecklistItemSerializer(page, many=True).data
+    
+    def get_items_next(self, obj):
+        
+        _, next_cursor = self._get_items_page(obj)
+        if next_cursor is None:
+            return None
+        
+        url = reverse('checklist-items', kwargs={'pk': obj.pk}, request=self.context.get('request'))
+        return replace_query_param(url, ChecklistItemCursorPagination.cursor_query_param, next_cursor)
+    
     def get_is_overdue(self, obj):
         
         return obj.is_overdue()
@@ -133,19 +372,15 @@ class ChecklistSerializer(serializers.ModelSerializer):
     
     def get_total_items(self, obj):
         
-        return obj.items.count()
+        return obj.get_item_count()
     
     def get_completed_items(self, obj):
         
-        return obj.items.filter(
-            status__in=['completed', 'not-applicable']
-        ).count()
+        return obj.get_completed_item_count()
     
     def get_pending_items(self, obj):
         
-        return obj.items.filter(
-            status__in=['pending', 'in-progress']
-        ).count()
+        return obj.get_pending_item_count()
     
     def validate_status(self, value):
         
@@ -173,7 +408,7 @@ class ChecklistSerializer(serializers.ModelSerializer):
         return value
 
 
-class ChecklistListSerializer(serializers.ModelSerializer):
+class ChecklistListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     
     # Computed fields
     is_overdue = serializers.SerializerMethodField()
@@ -193,12 +428,23 @@ class ChecklistListSerializer(serializers.ModelSerializer):
             'created_by_username',
             'created_at',
             'updated_at',
+            'version',
             'is_overdue',
             'completion_percentage',
             'total_items',
             'completed_items'
         ]
     
+    field_dependencies = {
+        'created_by_username': {'only': ['created_by__username'], 'select': ['created_by']},
+        'is_overdue': {'only': ['due_date', 'status']},
+        'completion_percentage': {'only': ['status'], 'annotate': ['item_count', 'completed_item_count']},
+        'total_items': {'annotate': ['item_count']},
+        'completed_items': {'annotate': ['completed_item_count']},
+    }
+    
+    annotations = ITEM_COUNT_ANNOTATIONS
+    
     def get_is_overdue(self, obj):
         return obj.is_overdue()
     
@@ -206,12 +452,105 @@ class ChecklistListSerializer(serializers.ModelSerializer):
         return obj.get_completion_percentage()
     
     def get_total_items(self, obj):
-        return obj.items.count()
+        return obj.get_item_count()
     
     def get_completed_items(self, obj):
-        return obj.items.filter(
-            status__in=['completed', 'not-applicable']
-        ).count()
+        return obj.get_completed_item_count()
+
+
+class ChecklistCopySerializer(serializers.Serializer):
+    """Options for cloning a checklist or creating one from a template."""
+    
+    # Defaults: "<name> (copy)" for clones, the template's name and description for templates
+    name = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+    
+    # Defaults: none for clones, today + due_in_days for templates
+    due_date = serializers.DateField(required=False, allow_null=True)
+    
+    # A new checklist has only pending items, so it can't start completed
+    status = serializers.ChoiceField(choices=['draft', 'active'], default='draft')
+    
+    # false leaves the new items unassigned
+    keep_owners = serializers.BooleanField(default=True)
+
+
+class TemplateItemSerializer(serializers.ModelSerializer):
+    
+    owner = UserOwnerField(
+        required=False,
+        allow_null=True
+    )
+    
+    # Owner name, as on checklist items - the owner id wins when both are sent
+    assigned_owner = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    
+    class Meta:
+        model = TemplateItem
+        fields = ['id', 'title', 'description', 'owner', 'assigned_owner']
+        read_only_fields = ['id']
+    
+    def validate_title(self, value):
+        
+        if not value.strip():
+            raise serializers.ValidationError("Title cannot be empty")
+        return value
+
+
+class ChecklistTemplateSerializer(serializers.ModelSerializer):
+    
+    # Writing "items" replaces all of the template's items
+    items = TemplateItemSerializer(many=True, required=False)
+    
+    # On create: copy the items of this checklist instead (in one INSERT ... SELECT)
+    checklist = serializers.IntegerField(write_only=True, required=False)
+    keep_owners = serializers.BooleanField(write_only=True, default=True)
+    
+    class Meta:
+        model = ChecklistTemplate
+        fields = [
+            'id',
+            'name',
+            'description',
+            'due_in_days',
+            'recurrence',
+            'recurrence_start',
+            'next_run_on',
+            'created_by',
+            'created_at',
+            'updated_at',
+            'items',
+            'checklist',
+            'keep_owners'
+        ]
+        # next_run_on follows from recurrence and recurrence_start
+        read_only_fields = ['id', 'next_run_on', 'created_by', 'created_at', 'updated_at']
+    
+    def validate(self, attrs):
+        
+        if 'checklist' in attrs and 'items' in attrs:
+            raise serializers.ValidationError("Send either items or a checklist to copy them from, not both")
+        return attrs
+
+
+class ChecklistTemplateListSerializer(serializers.ModelSerializer):
+    
+    # Annotated by TemplateRepository.get_by_user
+    item_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ChecklistTemplate
+        fields = [
+            'id',
+            'name',
+            'description',
+            'due_in_days',
+            'recurrence',
+            'next_run_on',
+            'item_count',
+            'created_at',
+            'updated_at'
+        ]
 
 
 class ChecklistStatsSerializer(serializers.Serializer):
@@ -226,3 +565,45 @@ class ChecklistStatsSerializer(serializers.Serializer):
     completed_items = serializers.IntegerField()
     overdue_checklists = serializers.IntegerField()
     average_completion = serializers.FloatField()
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    
+    # The change sequence - pass the last one back as ?since=
+    sequence = serializers.IntegerField(source='id')
+    id = serializers.IntegerField(source='object_id')
+    checklist = serializers.IntegerField(source='checklist_id')
+    
+    class Meta:
+        model = Change
+        fields = ['sequence', 'resource', 'id', 'checklist', 'action', 'version']
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    
+    # Echoed back with the result, to match results to requests
+    id = serializers.CharField(max_length=100, required=False)
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(child=serializers.CharField(max_length=1000), required=False)
+    
+    def validate_path(self, value):
+        
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError("Only /api/ paths can be batched")
+        return value
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    
+    requests = BatchOperationSerializer(many=True, allow_empty=False)
+    
+    # All or nothing: one transaction, rolled back by the first failure
+    atomic = serializers.BooleanField(default=False)
+    
+    def validate_requests(self, value):
+        
+        if len(value) > get_max_requests():
+            raise serializers.ValidationError(f"At most {get_max_requests()} requests per batch")
+        return value
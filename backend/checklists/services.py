@@ -1,18 +1,47 @@
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 
-from .models import Checklist, ChecklistItem
-from .repositories import ChecklistRepository, ChecklistItemRepository
-from .exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from .models import Checklist, ChecklistItem, ChecklistTemplate
+from .repositories import (
+    ChecklistRepository,
+    ChecklistItemRepository,
+    OwnerRepository,
+    ChangeRepository,
+    TemplateRepository,
+    ArchiveRepository,
+    EvidenceRepository,
+    AsyncChecklistRepository,
+    AsyncChecklistItemRepository
+)
+from .exceptions import ValidationError, ConcurrencyError
+from . import evidence
+from .batch import get_max_requests
+from .pagination import get_embed_size, get_max_page_size
+from .recurrence import next_occurrence, occurrence_label, occurrences_between
+from .singleflight import single_flight
 from django.utils import timezone
 
 
+def dashboard_stats_key(self, user, freshness):
+    """
+    Flight key of the dashboard stats: the user and the freshness the caller
+    read first. A call only joins a computation that started from the same
+    data, so stats are never older than the ETag sent with them.
+    """
+    return user.pk, tuple(sorted(freshness.items()))
+
+
 class ChecklistService:
     
     def __init__(self):
         self.checklist_repo = ChecklistRepository()
         self.item_repo = ChecklistItemRepository()
+        self.change_repo = ChangeRepository()
     
     def get_all_checklists(self):
         
@@ -27,23 +56,25 @@ class ChecklistService:
         return self.checklist_repo.get_by_id(checklist_id)
     
     def get_checklist_by_id_for_user(self, checklist_id, user):
-       
-        checklist = self.checklist_repo.get_by_id(checklist_id)
-        if not checklist:
-            return None
-        
-        if checklist.created_by != user:
-            raise ValidationError("You don't have permission to access this checklist")
         
-        return checklist
+        # None for someone else's checklist too - the owner is part of the query
+        return self.checklist_repo.get_by_id_for_user(checklist_id, user)
     
-    def get_checklist_items(self, checklist_id):
+    def get_checklist_items(self, checklist_id, user, statuses=None):
         
-        checklist = self.checklist_repo.get_by_id(checklist_id)
-        if not checklist:
+        # Existence check only - the items are paged by the caller
+        if not self.checklist_repo.exists(checklist_id, user=user):
             raise ValidationError("Checklist not found")
         
-        return self.item_repo.get_by_checklist(checklist_id)
+        return self.item_repo.get_by_checklist(checklist_id, statuses=statuses)
+    
+    def get_checklist_freshness(self, checklist_id, user):
+        
+        return self.checklist_repo.get_freshness(Checklist.objects.filter(id=checklist_id, created_by=user))
+    
+    def get_dashboard_freshness(self, user):
+        
+        return self.checklist_repo.get_freshness(self.checklist_repo.get_by_user(user))
     
     def create_checklist(self, user, data):
        
@@ -66,7 +97,7 @@ class ChecklistService:
         
         return checklist
     
-    def update_checklist(self, checklist_id, data, user):
+    def update_checklist(self, checklist_id, data, user, versions=None):
         
         checklist = self.get_checklist_by_id_for_user(checklist_id, user)
         
@@ -87,14 +118,58 @@ class ChecklistService:
             if incomplete_items.exists():
                 raise ValidationError("Cannot mark checklist as completed while items are incomplete")
         
-        # Update through repository
+        # Update through repository - conditional on versions (If-Match) when given
         with transaction.atomic():
             updated_checklist = self.checklist_repo.update(
                 checklist,
+                versions=versions,
                 **{k: v for k, v in data.items() if k in ['name', 'description', 'due_date', 'status']}
             )
         
-        return updated_checklist
+        if updated_checklist is None:
+            raise ConcurrencyError("Checklist", self.checklist_repo.get_version(checklist_id))
+        
+        return self.checklist_repo.load_item_counts(updated_checklist)
+    
+    def set_status(self, queryset, status):
+        """
+        Bulk status change (the admin actions), in SQL. Completing skips
+        checklists with incomplete items - the rule update_checklist
+        enforces. Returns the number of checklists updated.
+        """
+        if status == 'completed':
+            queryset = self.checklist_repo.without_incomplete_items(queryset)
+        return self.checklist_repo.set_status(queryset, status)
+    
+    def create_checklist_with_items(self, user, data, source, keep_owners=True):
+        """
+        Create a checklist and copy the items of source (an ordered item
+        queryset) into it, in the database - see ChecklistItemRepository.copy_to_checklist.
+        """
+        with transaction.atomic():
+            checklist = self.create_checklist(user, data)
+            self.item_repo.copy_to_checklist(source, checklist.id, keep_owners)
+            # The items were inserted in SQL - no signal recorded them
+            self.change_repo.record_items_created([checklist.id])
+        return self.checklist_repo.load_item_counts(checklist)
+    
+    def clone_checklist(self, checklist_id, user, data):
+        
+        source = self.checklist_repo.get_by_id_for_user(checklist_id, user)
+        if not source:
+            raise ValidationError("Checklist not found")
+        
+        return self.create_checklist_with_items(
+            user,
+            {
+                'name': data.get('name') or f'{source.name} (copy)',
+                'description': data.get('description', source.description),
+                'due_date': data.get('due_date'),
+                'status': data.get('status', 'draft'),
+            },
+            self.item_repo.get_by_checklist(source.id).order_by('created_at', 'id'),
+            keep_owners=data.get('keep_owners', True)
+        )
     
     def delete_checklist(self, checklist_id, user):
         
@@ -104,14 +179,13 @@ class ChecklistService:
             raise ValidationError("Checklist not found")
         
         with transaction.atomic():
-            # Delete all items first (cascade should handle this, but being explicit)
-            self.item_repo.delete_by_checklist(checklist_id)
-            # Delete the checklist
+            # Items go with the checklist (on_delete=CASCADE); the change feed
+            # records one tombstone for the checklist instead of one per item
             return self.checklist_repo.delete(checklist_id)
     
     def get_checklist_stats(self, checklist_id):
         
-        checklist = self.checklist_repo.get_by_id(checklist_id)
+        checklist = self.checklist_repo.get_by_id_only(checklist_id, 'status')
         if not checklist:
             raise ValidationError("Checklist not found")
         
@@ -141,49 +215,26 @@ class ChecklistService:
             'completion_percentage': round((completed / total_items) * 100, 2)
         }
     
-    def get_dashboard_stats(self, user):
-        
-        checklists = self.checklist_repo.get_by_user(user)
-        
-        # Get only items from user's checklists
-        user_checklist_ids = checklists.values_list('id', flat=True)
-        user_items = ChecklistItem.objects.filter(checklist_id__in=user_checklist_ids)
-        
-        total_checklists = checklists.count()
-        active_checklists = checklists.filter(status='active').count()
-        completed_checklists = checklists.filter(status='completed').count()
-        draft_checklists = checklists.filter(status='draft').count()
+    @single_flight('dashboard_stats', key=dashboard_stats_key)
+    def get_dashboard_stats(self, user, freshness):
+        """The user's dashboard stats; freshness is get_dashboard_freshness(user), read before."""
         
-        total_items = user_items.count()
-        completed_items = user_items.filter(status='completed').count()
-        pending_items = user_items.filter(status='pending').count()
-        in_progress_items = user_items.filter(status='in-progress').count()
+        # Three queries: checklist totals, item totals, per-checklist completion
+        checklist_counts = self.checklist_repo.get_status_counts(user)
+        item_counts = self.item_repo.get_status_counts(user)
         
-    
-        today = timezone.now().date()
-        overdue_checklists = checklists.filter(
-            due_date__lt=today,
-            status__in=['draft', 'active']
-        ).count()
-        
-        # Calculate average completion percentage across all checklists
+        # Average completion percentage across all checklists
         # Each checklist's completion is based on its items + its own status
+        total_checklists = checklist_counts['total_checklists']
         if total_checklists > 0:
-            total_completion = sum(checklist.get_completion_percentage() for checklist in checklists)
-            avg_completion = round(total_completion / total_checklists, 2)
+            percentages = self.checklist_repo.get_completion_percentages(user)
+            avg_completion = round(sum(percentages) / total_checklists, 2)
         else:
             avg_completion = 0.0
         
         return {
-            'total_checklists': total_checklists,
-            'active_checklists': active_checklists,
-            'completed_checklists': completed_checklists,
-            'draft_checklists': draft_checklists,
-            'total_items': total_items,
-            'completed_items': completed_items,
-            'pending_items': pending_items,
-            'in_progress_items': in_progress_items,
-            'overdue_checklists': overdue_checklists,
+            **checklist_counts,
+            **item_counts,
             'average_completion': avg_completion
         }
 
@@ -193,26 +244,47 @@ class ChecklistItemService:
     def __init__(self):
         self.item_repo = ChecklistItemRepository()
         self.checklist_repo = ChecklistRepository()
+        self.owner_repo = OwnerRepository()
+    
+    def _resolve_owner(self, data, user):
+        
+        # An explicit owner (id or instance) wins over the free-text name.
+        # Either way it is one of the user's owners
+        if 'owner' in data:
+            owner = data['owner']
+            if owner is None:
+                return owner
+            resolved = self.owner_repo.get_by_id_for_user(getattr(owner, 'pk', owner), user)
+            if not resolved:
+                raise ValidationError("Owner not found", field='owner')
+            return resolved
+        
+        return self.owner_repo.get_or_create_by_name(data.get('assigned_owner', ''), user)
     
     def get_all_items(self):
         
         return self.item_repo.get_all()
     
+    def get_user_items(self, user):
+        
+        # Items of the user's checklists - what /api/items/ lists
+        return self.item_repo.get_by_user(user)
+    
     def get_item_by_id(self, item_id):
        
         return self.item_repo.get_by_id(item_id)
     
     def get_items_by_checklist(self, checklist_id):
         
-        checklist = self.checklist_repo.get_by_id(checklist_id)
-        if not checklist:
+        if not self.checklist_repo.exists(checklist_id):
             raise ValidationError("Checklist not found")
         
         return self.item_repo.get_by_checklist(checklist_id)
     
-    def create_item(self, checklist_id, data):
+    def create_item(self, checklist_id, user, data):
         
-        checklist = self.checklist_repo.get_by_id(checklist_id)
+        # Only what the rule below and the change feed (the owner) need
+        checklist = self.checklist_repo.get_by_id_only(checklist_id, 'status', 'created_by', user=user)
         if not checklist:
             raise ValidationError("Checklist not found")
         
@@ -226,15 +298,15 @@ class ChecklistItemService:
                 title=data['title'],
                 description=data.get('description', ''),
                 status=data.get('status', 'pending'),
-                assigned_owner=data.get('assigned_owner', ''),
+                owner=self._resolve_owner(data, user),
                 evidence_notes=data.get('evidence_notes', '')
             )
         
         return item
     
-    def update_item(self, item_id, data):
+    def update_item(self, item_id, user, data, versions=None):
         
-        item = self.item_repo.get_by_id(item_id)
+        item = self.item_repo.get_by_id_for_user(item_id, user)
         if not item:
             raise ValidationError("Item not found")
         
@@ -246,20 +318,645 @@ class ChecklistItemService:
             data['completed_at'] = None
         
         with transaction.atomic():
-            updated_item = self.item_repo.update(
-                item,
-                **{k: v for k, v in data.items() if k in [
-                    'title', 'description', 'status', 'assigned_owner', 
-                    'evidence_notes', 'completed_at'
-                ]}
-            )
+            update_data = {k: v for k, v in data.items() if k in [
+                'title', 'description', 'status', 'evidence_notes', 'completed_at'
+            ]}
+            if 'owner' in data or 'assigned_owner' in data:
+                update_data['owner'] = self._resolve_owner(data, user)
+            
+            updated_item = self.item_repo.update(item, versions=versions, **update_data)
+        
+        if updated_item is None:
+            raise ConcurrencyError("Item", self.item_repo.get_version(item_id))
         
         return updated_item
     
-    def update_item_status(self, item_id, status):
+    def update_item_status(self, item_id, user, status):
        
-        return self.update_item(item_id, {'status': status})
+        return self.update_item(item_id, user, {'status': status})
     
-    def delete_item(self, item_id):
+    def delete_item(self, item_id, user):
+        
+        if not self.item_repo.get_by_id_for_user(item_id, user):
+            raise ValidationError("Item not found")
         
         return self.item_repo.delete(item_id)
+
+
+class OwnerService:
+    
+    def __init__(self):
+        self.owner_repo = OwnerRepository()
+        self.item_repo = ChecklistItemRepository()
+    
+    def get_all_owners(self):
+        
+        return self.owner_repo.get_all()
+    
+    def get_user_owners(self, user):
+        
+        return self.owner_repo.get_by_user(user)
+    
+    def get_owner_by_id(self, owner_id, user):
+        
+        return self.owner_repo.get_by_id_for_user(owner_id, user)
+    
+    def create_owner(self, user, data):
+        
+        name = (data.get('name') or '').strip()
+        if not name:
+            raise ValidationError("Owner name cannot be empty", field='name')
+        
+        # Business rule: Owner names are unique per user (case-insensitive)
+        if self.owner_repo.get_by_name(name, user):
+            raise ValidationError("An owner with this name already exists", field='name')
+        
+        with transaction.atomic():
+            return self.owner_repo.create(name=name, user=data.get('user'), created_by=user)
+    
+    def update_owner(self, owner_id, user, data):
+        
+        owner = self.owner_repo.get_by_id_for_user(owner_id, user)
+        if not owner:
+            raise ValidationError("Owner not found")
+        
+        update_data = {k: v for k, v in data.items() if k in ['name', 'user']}
+        if 'name' in update_data:
+            name = (update_data['name'] or '').strip()
+            if not name:
+                raise ValidationError("Owner name cannot be empty", field='name')
+            existing = self.owner_repo.get_by_name(name, user)
+            if existing and existing.id != owner.id:
+                raise ValidationError("An owner with this name already exists", field='name')
+            update_data['name'] = name
+        
+        renamed = 'name' in update_data and update_data['name'] != owner.name
+        with transaction.atomic():
+            owner = self.owner_repo.update(owner, **update_data)
+            # Items show the owner's name - their versions and the change feed move with it
+            if renamed:
+                self.item_repo.touch_owner_items(owner.id)
+            return owner
+    
+    def delete_owner(self, owner_id, user):
+        
+        if not self.owner_repo.get_by_id_for_user(owner_id, user):
+            raise ValidationError("Owner not found")
+        
+        # Unassign the items here rather than by SET_NULL, so they are versioned and recorded
+        with transaction.atomic():
+            self.item_repo.touch_owner_items(owner_id, owner=None)
+            return self.owner_repo.delete(owner_id)
+    
+    def get_owner_workload(self, owner_id, user):
+        
+        owner = self.owner_repo.get_by_id_for_user(owner_id, user)
+        if not owner:
+            raise ValidationError("Owner not found")
+        
+        counts = self.item_repo.count_by_status_for_owner(owner_id, user)
+        by_status = {value: counts.get(value, 0) for value, _ in ChecklistItem.STATUS_CHOICES}
+        
+        return {
+            'owner_id': owner.id,
+            'owner_name': owner.name,
+            'total_items': sum(by_status.values()),
+            'pending_items': by_status['pending'],
+            'in_progress_items': by_status['in-progress'],
+            'completed_items': by_status['completed'],
+            'not_applicable_items': by_status['not-applicable'],
+        }
+    
+    def reassign_items(self, from_owner_id, to_owner_id, user, checklist_id=None):
+        
+        if not self.owner_repo.get_by_id_for_user(from_owner_id, user):
+            raise ValidationError("Owner not found")
+        
+        # None means "unassign"
+        if to_owner_id is not None and not self.owner_repo.get_by_id_for_user(to_owner_id, user):
+            raise ValidationError("Target owner not found", field='to_owner')
+        
+        with transaction.atomic():
+            return self.item_repo.reassign_owner(from_owner_id, to_owner_id, user, checklist_id)
+
+
+class TemplateService:
+    
+    def __init__(self):
+        self.template_repo = TemplateRepository()
+        self.checklist_repo = ChecklistRepository()
+        self.owner_repo = OwnerRepository()
+    
+    def get_user_templates(self, user):
+        
+        return self.template_repo.get_by_user(user)
+    
+    def get_template_for_user(self, template_id, user):
+        
+        template = self.template_repo.get_by_id_for_user(template_id, user)
+        if not template:
+            raise ValidationError("Template not found")
+        return template
+    
+    def _validate_name(self, name):
+        
+        name = (name or '').strip()
+        if not name:
+            raise ValidationError("Template name cannot be empty", field='name')
+        return name
+    
+    def _schedule(self, recurrence, recurrence_start):
+        """
+        The recurrence fields of a template. The first occurrence is the
+        start date, or the next one on or after today - occurrences before
+        the rule was set are not generated.
+        """
+        if not recurrence:
+            return {'recurrence': '', 'recurrence_start': recurrence_start, 'next_run_on': None}
+        
+        today = timezone.now().date()
+        recurrence_start = recurrence_start or today
+        return {
+            'recurrence': recurrence,
+            'recurrence_start': recurrence_start,
+            'next_run_on': next_occurrence(recurrence, recurrence_start, today - timedelta(days=1)),
+        }
+    
+    def _resolve_item_owners(self, items, user):
+        
+        # As for checklist items: an owner id wins, otherwise the name
+        # resolves to (or creates) one of the user's owners
+        resolved = []
+        for item in items:
+            item = dict(item)
+            assigned_owner = item.pop('assigned_owner', None)
+            if 'owner' not in item and assigned_owner is not None:
+                item['owner'] = self.owner_repo.get_or_create_by_name(assigned_owner, user)
+            resolved.append(item)
+        return resolved
+    
+    def create_template(self, user, data):
+        
+        # Items come either from an existing checklist or from the request
+        checklist_id = data.get('checklist')
+        if checklist_id is not None and not self.checklist_repo.get_by_id_for_user(checklist_id, user):
+            raise ValidationError("Checklist not found", field='checklist')
+        
+        with transaction.atomic():
+            template = self.template_repo.create(
+                name=self._validate_name(data.get('name')),
+                description=data.get('description', ''),
+                due_in_days=data.get('due_in_days'),
+                created_by=user,
+                **self._schedule(data.get('recurrence', ''), data.get('recurrence_start'))
+            )
+            if checklist_id is not None:
+                self.template_repo.copy_items_from_checklist(template, checklist_id, data.get('keep_owners', True))
+            else:
+                self.template_repo.replace_items(template, self._resolve_item_owners(data.get('items', []), user))
+        
+        return template
+    
+    def update_template(self, template_id, user, data):
+        
+        template = self.get_template_for_user(template_id, user)
+        
+        update_data = {k: v for k, v in data.items() if k in ['name', 'description', 'due_in_days']}
+        if 'name' in update_data:
+            update_data['name'] = self._validate_name(update_data['name'])
+        if 'recurrence' in data or 'recurrence_start' in data:
+            update_data.update(self._schedule(
+                data.get('recurrence', template.recurrence),
+                data.get('recurrence_start', template.recurrence_start)
+            ))
+        
+        with transaction.atomic():
+            template = self.template_repo.update(template, **update_data)
+            if 'items' in data:
+                self.template_repo.replace_items(template, self._resolve_item_owners(data['items'], user))
+        
+        return template
+    
+    def delete_template(self, template_id, user):
+        
+        self.get_template_for_user(template_id, user)
+        return self.template_repo.delete(template_id)
+    
+    def instantiate_template(self, template_id, user, data):
+        """A new checklist with the template's items, copied in one statement."""
+        template = self.get_template_for_user(template_id, user)
+        
+        due_date = data.get('due_date')
+        if due_date is None and template.due_in_days is not None:
+            due_date = timezone.now().date() + timedelta(days=template.due_in_days)
+        
+        return ChecklistService().create_checklist_with_items(
+            user,
+            {
+                'name': data.get('name') or template.name,
+                'description': data.get('description', template.description),
+                'due_date': due_date,
+                'status': data.get('status', 'draft'),
+            },
+            self.template_repo.get_items(template.id),
+            keep_owners=data.get('keep_owners', True)
+        )
+
+
+class RecurrenceService:
+    """
+    Creates the checklists of recurring templates (manage.py generate_recurring).
+    
+    Due templates are read in batches through the (next_run_on, id) index.
+    Each batch is one transaction: the templates' schedules are advanced,
+    all their checklists inserted with one bulk INSERT, the items copied
+    with one INSERT ... SELECT and the changes recorded the same way - a
+    handful of statements per batch however many users it covers.
+    
+    Reruns never create a checklist twice: a template is claimed by moving
+    its next_run_on on with a conditional UPDATE, occurrences that already
+    have a checklist are skipped, and (template, occurrence) is unique.
+    """
+    
+    def __init__(self):
+        self.template_repo = TemplateRepository()
+        self.checklist_repo = ChecklistRepository()
+        self.item_repo = ChecklistItemRepository()
+        self.change_repo = ChangeRepository()
+    
+    def generate_due(self, today=None, batch_size=200, dry_run=False):
+        """
+        Generate every occurrence due on or before today; yields a summary
+        per batch: {'templates', 'checklists', 'items'}.
+        
+        A template whose runs were missed gets one checklist per missed
+        occurrence. With dry_run nothing is written.
+        """
+        today = today or timezone.now().date()
+        after_id = 0
+        
+        while True:
+            templates = self.template_repo.get_due(today, after_id, batch_size)
+            if not templates:
+                return
+            after_id = templates[-1].id
+            
+            if dry_run:
+                plan = self._plan_batch(templates, today)
+                yield {'templates': len(templates), 'checklists': sum(len(days) for _, days in plan), 'items': None}
+                continue
+            with transaction.atomic():
+                yield self._generate_batch(templates, today)
+    
+    def _plan_batch(self, templates, today):
+        """(template, occurrences without a checklist yet) for a batch of due templates."""
+        since = min(template.next_run_on for template in templates)
+        existing = self.checklist_repo.get_occurrences([template.id for template in templates], since)
+        
+        plan = []
+        for template in templates:
+            days = occurrences_between(template.recurrence, template.recurrence_start, template.next_run_on, today)
+            plan.append((template, [day for day in days if (template.id, day) not in existing]))
+        return plan
+    
+    def _generate_batch(self, templates, today):
+        
+        checklists = []
+        for template, days in self._plan_batch(templates, today):
+            # Claim the template; a concurrent run that moved it on first generates it
+            if not self.template_repo.advance(template, next_occurrence(template.recurrence, template.recurrence_start, today)):
+                continue
+            checklists.extend(self._build_checklist(template, day) for day in days)
+        
+        checklist_ids = [checklist.id for checklist in self.checklist_repo.bulk_create(checklists)]
+        items = 0
+        if checklist_ids:
+            items = self.item_repo.copy_from_templates(checklist_ids)
+            self.change_repo.record_checklists_created(checklist_ids)
+        return {'templates': len(templates), 'checklists': len(checklist_ids), 'items': items}
+    
+    def _build_checklist(self, template, day):
+        
+        # The period goes after the name, within Checklist.name's 200 characters
+        suffix = f' ({occurrence_label(template.recurrence, day)})'
+        return Checklist(
+            name=template.name[:200 - len(suffix)] + suffix,
+            description=template.description,
+            due_date=day + timedelta(days=template.due_in_days) if template.due_in_days is not None else None,
+            status='active',
+            created_by_id=template.created_by_id,
+            template=template,
+            occurrence=day
+        )
+
+
+class ArchiveService:
+    """
+    Moves old completed checklists to the archive and back (see checklists/archive.py).
+    
+    Due checklists are read in batches by id; each batch is one
+    transaction that re-checks them, packs them into ArchivedChecklist
+    rows and deletes the live rows, recording one tombstone per
+    checklist in the change feed.
+    """
+    
+    def __init__(self):
+        self.archive_repo = ArchiveRepository()
+        self.checklist_repo = ChecklistRepository()
+        self.change_repo = ChangeRepository()
+    
+    def get_archive_after_days(self):
+        
+        return getattr(settings, 'ARCHIVE_AFTER_DAYS', 365)
+    
+    def archive_due(self, days=None, batch_size=200, dry_run=False):
+        """
+        Archive the checklists completed (and untouched) more than days ago;
+        yields a summary per batch: {'checklists', 'items', 'bytes', 'packed_bytes'}.
+        With dry_run nothing is written and the sizes are None.
+        """
+        if days is None:
+            days = self.get_archive_after_days()
+        cutoff = timezone.now() - timedelta(days=days)
+        after_id = 0
+        
+        while True:
+            checklist_ids = self.archive_repo.get_due_ids(cutoff, after_id, batch_size)
+            if not checklist_ids:
+                return
+            after_id = checklist_ids[-1]
+            
+            if dry_run:
+                yield {
+                    'checklists': len(checklist_ids),
+                    'items': self.archive_repo.count_items(checklist_ids),
+                    'bytes': None,
+                    'packed_bytes': None
+                }
+                continue
+            
+            with transaction.atomic():
+                scopes, item_count, packed_size, unpacked_size = self.archive_repo.archive(checklist_ids, cutoff)
+                self.change_repo.record_checklists_deleted(scopes)
+            yield {
+                'checklists': len(scopes),
+                'items': item_count,
+                'bytes': unpacked_size,
+                'packed_bytes': packed_size
+            }
+    
+    def get_archived_checklists(self, user):
+        
+        return self.archive_repo.get_by_user(user)
+    
+    def get_archived_checklist(self, checklist_id, user):
+        """(checklist, items) of one of user's archived checklists, or None."""
+        archived = self.archive_repo.get_for_user(checklist_id, user)
+        if archived is None:
+            return None
+        return self.archive_repo.unpack(archived)
+    
+    def restore_checklist(self, checklist_id, user):
+        
+        with transaction.atomic():
+            archived = self.archive_repo.get_for_user(checklist_id, user, for_update=True)
+            if archived is None:
+                raise ValidationError("Archived checklist not found")
+            
+            checklist = self.archive_repo.restore(archived)
+            self.change_repo.record_checklists_created([checklist.id])
+        
+        return self.checklist_repo.load_item_counts(checklist)
+
+
+class EvidenceService:
+    """
+    Evidence attachments of checklist items (see checklists/evidence.py).
+    
+    Files are stored once per content: attaching content that is stored
+    already only adds a row. A stored file is removed once no attachment
+    and no archived checklist uses it.
+    """
+    
+    def __init__(self):
+        self.evidence_repo = EvidenceRepository()
+    
+    def get_item_attachments(self, item_id, user):
+        
+        if not self.evidence_repo.get_item_for_user(item_id, user):
+            raise ValidationError("Item not found")
+        return self.evidence_repo.get_by_item(item_id)
+    
+    def get_attachment(self, attachment_id, user):
+        
+        return self.evidence_repo.get_for_user(attachment_id, user)
+    
+    def attach(self, item_id, user, uploaded_file):
+        """
+        Attach an upload (a HashedUploadedFile) to one of user's items.
+        Returns (attachment, deduplicated) - deduplicated when the content
+        was stored already.
+        """
+        try:
+            item = self.evidence_repo.get_item_for_user(item_id, user)
+            if not item:
+                raise ValidationError("Item not found")
+            
+            with transaction.atomic():
+                # Locked: a concurrent clear can't remove the file under this upload
+                blob, created = self.evidence_repo.get_or_create_blob(uploaded_file.sha256, uploaded_file.size)
+                # Also puts the file back if a rolled back clear removed it
+                evidence.store(uploaded_file)
+                attachment = self.evidence_repo.create(
+                    item=item,
+                    blob=blob,
+                    filename=uploaded_file.name,
+                    content_type=uploaded_file.content_type[:100],
+                    uploaded_by=user
+                )
+        finally:
+            # Whatever happened, nothing is left behind in tmp/
+            evidence.discard(uploaded_file)
+        
+        return attachment, not created
+    
+    def delete_attachment(self, attachment_id, user):
+        
+        with transaction.atomic():
+            attachment = self.evidence_repo.get_for_user(attachment_id, user)
+            if not attachment:
+                raise ValidationError("Attachment not found")
+            
+            self.evidence_repo.delete(attachment)
+            self._clear_blobs([attachment.blob_id])
+    
+    def clear_unused(self):
+        """Remove every stored file nothing uses any more. Returns (files, bytes)."""
+        with transaction.atomic():
+            return self._clear_blobs()
+    
+    def _clear_blobs(self, blob_ids=None):
+        
+        blobs = self.evidence_repo.get_unreferenced_blobs(blob_ids)
+        self.evidence_repo.delete_blobs(blobs)
+        # Still under the row locks: an upload of the same content waits, then stores it again
+        for blob in blobs:
+            evidence.remove(blob.sha256)
+        return len(blobs), sum(blob.size for blob in blobs)
+
+
+class ChangeService:
+    
+    def __init__(self):
+        self.change_repo = ChangeRepository()
+        self.checklist_repo = ChecklistRepository()
+        self.item_repo = ChecklistItemRepository()
+    
+    def get_page_size(self, limit=None):
+        
+        page_size = getattr(settings, 'CHANGES_PAGE_SIZE', 500)
+        if limit:
+            page_size = limit
+        return min(page_size, getattr(settings, 'CHANGES_MAX_PAGE_SIZE', 1000))
+    
+    def get_changes(self, user, since=0, limit=None):
+        """
+        One page of the user's changes after sequence `since`.
+        
+        Several changes to the same object within the page collapse into the
+        latest one. Current checklists and items for the non-deleted entries
+        are loaded with one query each.
+        """
+        if since < 0:
+            raise ValidationError("since must be a non-negative sequence number", field='since')
+        
+        page_size = self.get_page_size(limit)
+        changes = self.change_repo.get_for_user(user, since, page_size + 1)
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+        
+        # Clients pass this back as ?since= to continue
+        cursor = changes[-1].id if changes else since
+        
+        # Latest change per object wins
+        latest = {}
+        for change in changes:
+            latest[(change.resource, change.object_id)] = change
+        changes = sorted(latest.values(), key=lambda change: change.id)
+        
+        live_ids = {'checklist': [], 'item': []}
+        for change in changes:
+            if change.action != 'deleted':
+                live_ids[change.resource].append(change.object_id)
+        
+        checklists = {}
+        if live_ids['checklist']:
+            checklists = {c.id: c for c in self.checklist_repo.get_by_ids_for_user(live_ids['checklist'], user)}
+        items = {}
+        if live_ids['item']:
+            items = {i.id: i for i in self.item_repo.get_by_ids_for_user(live_ids['item'], user)}
+        
+        return {
+            'changes': changes,
+            'checklists': checklists,
+            'items': items,
+            'cursor': cursor,
+            'has_more': has_more
+        }
+    
+    def get_missed_changes(self, user, since):
+        """
+        Change rows after `since`, without loading the objects.
+
+        Used to replay what an event stream missed while reconnecting.
+        Returns (changes, has_more); when has_more is True the client should
+        catch up through the change feed instead.
+        """
+        if since < 0:
+            raise ValidationError("since must be a non-negative sequence number", field='since')
+        
+        page_size = self.get_page_size()
+        changes = self.change_repo.get_for_user(user, since, page_size + 1)
+        return changes[:page_size], len(changes) > page_size
+
+
+@lru_cache(maxsize=None)
+def get_client_config():
+    """
+    The server settings the frontend works with - page sizes, limits and
+    the allowed values of choice fields. Settings don't change while the
+    process runs, so this is built once per process.
+    """
+    def choices(pairs):
+        return [{'value': value, 'label': label} for value, label in pairs]
+    
+    return {
+        'page_size': api_settings.PAGE_SIZE,
+        'checklist_items_embed_size': get_embed_size(),
+        'checklist_items_page_size': getattr(settings, 'CHECKLIST_ITEMS_PAGE_SIZE', 100),
+        'checklist_items_max_page_size': get_max_page_size(),
+        'changes_page_size': ChangeService().get_page_size(),
+        'batch_max_requests': get_max_requests(),
+        'checklist_statuses': choices(Checklist.STATUS_CHOICES),
+        'item_statuses': choices(ChecklistItem.STATUS_CHOICES),
+        'recurrences': choices(ChecklistTemplate.RECURRENCE_CHOICES),
+        # Media types the API can answer with (see compliance_api/renderers.py)
+        'formats': [
+            renderer.media_type for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+            if renderer.format != 'api'
+        ],
+    }
+
+
+class AsyncChecklistService(ChecklistService):
+    """
+    Async counterparts of ChecklistService's read paths, for the async views.
+    
+    Same queries and results as the sync methods.
+    """
+    
+    def __init__(self):
+        self.checklist_repo = AsyncChecklistRepository()
+        self.item_repo = AsyncChecklistItemRepository()
+    
+    async def aget_checklist_items(self, checklist_id, user, statuses=None):
+        
+        if not await self.checklist_repo.aexists(checklist_id, user=user):
+            raise ValidationError("Checklist not found")
+        
+        return self.item_repo.get_by_checklist(checklist_id, statuses=statuses)
+    
+    async def aget_freshness(self, queryset):
+        
+        return await self.checklist_repo.aget_freshness(queryset)
+    
+    async def aget_checklist_freshness(self, checklist_id, user):
+        
+        return await self.checklist_repo.aget_freshness(Checklist.objects.filter(id=checklist_id, created_by=user))
+    
+    async def aget_dashboard_freshness(self, user):
+        
+        return await self.checklist_repo.aget_freshness(self.checklist_repo.get_by_user(user))
+    
+    async def aget_item_freshness(self, queryset):
+        
+        return await self.item_repo.aget_freshness(queryset)
+    
+    @single_flight('dashboard_stats', key=dashboard_stats_key)
+    async def aget_dashboard_stats(self, user, freshness):
+        
+        checklist_counts = await self.checklist_repo.aget_status_counts(user)
+        item_counts = await self.item_repo.aget_status_counts(user)
+        
+        total_checklists = checklist_counts['total_checklists']
+        if total_checklists > 0:
+            percentages = await self.checklist_repo.aget_completion_percentages(user)
+            avg_completion = round(sum(percentages) / total_checklists, 2)
+        else:
+            avg_completion = 0.0
+        
+        return {
+            **checklist_counts,
+            **item_counts,
+            'average_completion': avg_completion
+        }
@@ -0,0 +1,49 @@
+"""
+Change feed recording.
+
+Every save() and delete() of a Checklist or ChecklistItem - from the
+services, the admin or anywhere else - appends a Change row in the same
+transaction. Writes done with QuerySet.update() send no signals, so the
+repositories record those themselves (see conditional_update).
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Checklist, ChecklistItem
+from .repositories import ChangeRepository
+
+
+def deleted_with(origin, model):
+    """Whether a delete cascades from a model instance or queryset of `model`."""
+    return isinstance(origin, model) or (isinstance(origin, QuerySet) and origin.model is model)
+
+
+@receiver(post_save, sender=Checklist)
+@receiver(post_save, sender=ChecklistItem)
+def record_save(sender, instance, created, raw=False, **kwargs):
+    
+    # Fixtures (loaddata) are not user changes
+    if raw:
+        return
+    ChangeRepository().record(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Checklist)
+def record_checklist_delete(sender, instance, origin=None, **kwargs):
+    
+    # A deleted user's changes go with it - a tombstone would reference the deleted row
+    if deleted_with(origin, get_user_model()):
+        return
+    ChangeRepository().record(instance, 'deleted')
+
+
+@receiver(post_delete, sender=ChecklistItem)
+def record_item_delete(sender, instance, origin=None, **kwargs):
+    
+    # Items deleted along with their checklist are covered by the checklist's tombstone
+    if deleted_with(origin, Checklist) or deleted_with(origin, get_user_model()):
+        return
+    ChangeRepository().record(instance, 'deleted')
@@ -0,0 +1,238 @@
+"""
+Single-flight coalescing for expensive read computations.
+
+When a team opens the dashboard at the same moment, every request would
+run the same aggregation queries at once and compete for the database.
+With @single_flight, concurrent calls with the same key share one
+execution: the first caller (the leader) runs the function, the others
+wait and get its result - or its exception. Nothing is cached; a call
+that starts after the leader finished runs again.
+
+    @single_flight('monthly_report', key=lambda self, user: user.pk)
+    def get_monthly_report(self, user):
+        ...
+
+Works for plain functions (threads of a WSGI worker) and coroutine
+functions (one ASGI event loop). Every caller gets the same result
+object, so callers must not mutate it. Sync calls made inside a
+transaction always run on their own.
+
+Across processes: set SINGLE_FLIGHT_LOCK_DIR and the leader of each
+process also takes an exclusive file lock for the key (fcntl, so POSIX
+only). The process holding the lock writes its result into the lock
+file; a process that had to wait for the lock reads that result instead
+of computing again. Coroutine callers coalesce within the process only.
+
+get_metrics() reports, per flight, how many calls were made, how many
+executions actually ran and how many calls were saved.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A computation in flight, shared by its leader and followers."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            'calls': 0,
+            'executions': 0,
+            'shared': 0,
+            'shared_across_processes': 0,
+        }
+
+    def _count(self, *names):
+
+        with self._lock:
+            for name in names:
+                self.metrics[name] += 1
+
+    def do(self, key, func):
+        """Run func() unless a call with this key is in flight; then share its outcome."""
+        if connection.in_atomic_block:
+            # Another thread's result can't see this transaction's uncommitted writes
+            self._count('calls', 'executions')
+            return func()
+
+        with self._lock:
+            self.metrics['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            self._count('shared')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, func)
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, func):
+        """do() for coroutine functions: func() returns an awaitable."""
+        loop = asyncio.get_running_loop()
+        self._count('calls')
+
+        task = self._tasks.get((loop, key))
+        if task is not None:
+            self._count('shared')
+        else:
+            self._count('executions')
+            # A task, so a cancelled leader does not cancel the followers' result
+            task = self._tasks[(loop, key)] = loop.create_task(func())
+            task.add_done_callback(lambda done: self._finish_task(loop, key, done))
+        return await asyncio.shield(task)
+
+    def _finish_task(self, loop, key, task):
+
+        self._tasks.pop((loop, key), None)
+        # Mark the exception retrieved if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _run(self, key, func):
+
+        lock_dir = getattr(settings, 'SINGLE_FLIGHT_LOCK_DIR', None)
+        if not lock_dir or fcntl is None:
+            self._count('executions')
+            return func()
+
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        path = Path(lock_dir) / f'{self.name}-{digest}.lock'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        waiting_since = time.time()
+
+        with open(path, 'a+b') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process is computing it - wait, then take its result
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                shared = self._read_result(lock_file, waiting_since)
+                if shared is not None:
+                    self._count('shared_across_processes')
+                    return shared[0]
+
+            try:
+                self._count('executions')
+                result = func()
+                self._write_result(lock_file, result)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_result(self, lock_file, since):
+        """(result,) if the lock file holds one written after since, else None."""
+        lock_file.seek(0)
+        data = lock_file.read()
+        if not data:
+            return None
+        try:
+            written_at, result = pickle.loads(data)
+        except Exception:
+            return None
+        # Older results (or a leader that failed) don't count - compute afresh
+        return (result,) if written_at >= since else None
+
+    def _write_result(self, lock_file, result):
+
+        try:
+            data = pickle.dumps((time.time(), result))
+        except Exception:
+            logger.warning('Result of %s cannot be shared across processes', self.name)
+            return
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(data)
+        lock_file.flush()
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name):
+
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
+
+
+def get_metrics():
+    """Counters of every flight in this process: {name: {calls, executions, shared, ...}}."""
+    with _flights_lock:
+        flights = list(_flights.values())
+    metrics = {}
+    for flight in flights:
+        with flight._lock:
+            metrics[flight.name] = dict(flight.metrics, saved=flight.metrics['calls'] - flight.metrics['executions'])
+    return {'pid': os.getpid(), 'flights': metrics}
+
+
+def single_flight(name, key):
+    """
+    Coalesce concurrent calls of the decorated function (or coroutine function).
+
+    key is called with the same arguments and returns the hashable key that
+    identifies identical calls, e.g. lambda self, user: user.pk.
+    """
+    flight = get_flight(name)
+
+    def decorator(func):
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.ado(key(*args, **kwargs), lambda: func(*args, **kwargs))
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return flight.do(key(*args, **kwargs), lambda: func(*args, **kwargs))
+        return wrapper
+
+    return decorator
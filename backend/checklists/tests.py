@@ -0,0 +1,175 @@
+import tempfile
+from pathlib import Path
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from compliance_api.middleware import CompressionMiddleware
+
+from .evidence import download_response, parse_range
+
+
+class ParseRangeTests(SimpleTestCase):
+
+    def test_no_range(self):
+
+        self.assertIsNone(parse_range(None, 100))
+        self.assertIsNone(parse_range('', 100))
+
+    def test_bounded_range(self):
+
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=10-19', 100), (10, 19))
+
+    def test_open_ended_range(self):
+
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+
+    def test_suffix_range(self):
+
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        # A suffix longer than the file is the whole file
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+
+    def test_end_past_the_file_is_clamped(self):
+
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+
+    def test_spaces_are_ignored(self):
+
+        self.assertEqual(parse_range('bytes = 0 - 9', 100), (0, 9))
+
+    def test_whole_file_cases(self):
+
+        # Several ranges, another unit, or no bounds at all - send everything
+        self.assertIsNone(parse_range('bytes=0-9,20-29', 100))
+        self.assertIsNone(parse_range('items=0-9', 100))
+        self.assertIsNone(parse_range('bytes=-', 100))
+
+    def test_unsatisfiable(self):
+
+        with self.assertRaises(ValueError):
+            parse_range('bytes=100-', 100)
+        with self.assertRaises(ValueError):
+            parse_range('bytes=20-10', 100)
+        with self.assertRaises(ValueError):
+            parse_range('bytes=-0', 100)
+
+
+@override_settings(EVIDENCE_ACCEL_REDIRECT=None)
+class DownloadResponseTests(SimpleTestCase):
+
+    content = bytes(range(256)) * 8
+    etag = '"abc123"'
+
+    def setUp(self):
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'blob'
+        self.path.write_bytes(self.content)
+        self.factory = RequestFactory()
+
+    def download(self, **headers):
+
+        request = self.factory.get('/api/attachments/1/download/', headers=headers)
+        response = download_response(request, self.path, len(self.content), 'text/plain', 'notes.txt', self.etag)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self):
+
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), self.content)
+
+    def test_range(self):
+
+        response = self.download(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(self.body(response), self.content[10:20])
+
+    def test_if_range_matching_etag_sends_the_range(self):
+
+        response = self.download(Range='bytes=100-', **{'If-Range': self.etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[100:])
+
+    def test_if_range_other_etag_sends_the_whole_file(self):
+
+        response = self.download(Range='bytes=100-', **{'If-Range': '"other"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Range'))
+        self.assertEqual(self.body(response), self.content)
+
+    def test_if_range_weak_etag_sends_the_whole_file(self):
+
+        # If-Range needs a strong comparison
+        response = self.download(Range='bytes=100-', **{'If-Range': 'W/' + self.etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_unsatisfiable_range(self):
+
+        response = self.download(Range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_none_match(self):
+
+        response = self.download(**{'If-None-Match': self.etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_compressed(self):
+
+        for headers in ({}, {'Range': 'bytes=10-19'}, {'Range': 'bytes=100-', 'If-Range': self.etag}):
+            with self.subTest(headers=headers):
+                response = self.download(**headers)
+                request = self.factory.get('/', headers={'Accept-Encoding': 'gzip'})
+                response = CompressionMiddleware(lambda request: response)(request)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['ETag'], self.etag)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def compress(self, response):
+
+        request = RequestFactory().get('/', headers={'Accept-Encoding': 'gzip'})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, **headers):
+
+        response = HttpResponse(b'{"items": []}' * 200, content_type='application/json', headers=headers)
+        response['ETag'] = '"1"'
+        return response
+
+    def test_compresses_json(self):
+
+        response = self.compress(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"1"')
+
+    def test_skips_ranges_and_opt_out(self):
+
+        partial = self.json_response()
+        partial.status_code = 206
+        opted_out = self.json_response()
+        opted_out.skip_compression = True
+        for response in (
+            partial,
+            self.json_response(**{'Content-Range': 'bytes 0-9/100'}),
+            self.json_response(**{'Accept-Ranges': 'bytes'}),
+            opted_out,
+        ):
+            with self.subTest(response=response):
+                response = self.compress(response)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['ETag'], '"1"')
@@ -1,6 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ChecklistViewSet, ChecklistItemViewSet, DashboardStatsView
+from .views import (
+    ChecklistViewSet,
+    ChecklistItemViewSet,
+    EvidenceAttachmentViewSet,
+    OwnerViewSet,
+    ChecklistTemplateViewSet,
+    DashboardStatsView,
+    ChangeFeedView,
+    MetricsView,
+    BatchView,
+    BootstrapView
+)
+from .async_views import EventStreamView
 
 # ===== AUTO-GENERATED URLS (Using Router) =====
 # Commented out for better readability - using explicit URLs below
@@ -13,6 +25,24 @@ urlpatterns = [
     # GET /api/stats/ - Get dashboard statistics
     path('stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     
+    # GET /api/bootstrap/ - User, stats, first checklist page and config for the first page load
+    path('bootstrap/', BootstrapView.as_view(), name='bootstrap'),
+    
+    # GET /api/metrics/ - Per-process counters (staff only)
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    
+    # ===== Change Feed =====
+    # GET /api/changes/?since=<cursor> - What changed since the cursor (delta sync)
+    path('changes/', ChangeFeedView.as_view(), name='change-feed'),
+    
+    # ===== Batch Requests =====
+    # POST /api/batch/ - Several API requests in one round trip
+    path('batch/', BatchView.as_view(), name='batch'),
+    
+    # ===== Live Updates =====
+    # GET /api/events/ - Server-Sent Events stream of changes and stats (ASGI only)
+    path('events/', EventStreamView.as_view(), name='event-stream'),
+    
     # ===== Checklist URLs =====
     # GET /api/checklists/ - List all checklists
     path('checklists/', ChecklistViewSet.as_view({
@@ -41,6 +71,16 @@ urlpatterns = [
         'post': 'add_item'
     }), name='checklist-add-item'),
     
+    # POST /api/checklists/<id>/clone/ - Copy checklist with all its items
+    path('checklists/<int:pk>/clone/', ChecklistViewSet.as_view({
+        'post': 'clone'
+    }), name='checklist-clone'),
+    
+    # POST /api/checklists/<id>/restore/ - Move an archived checklist back
+    path('checklists/<int:pk>/restore/', ChecklistViewSet.as_view({
+        'post': 'restore'
+    }), name='checklist-restore'),
+    
     # ===== Checklist Item URLs =====
     # GET /api/items/ - List all items
     path('items/', ChecklistItemViewSet.as_view({
@@ -63,4 +103,73 @@ urlpatterns = [
     path('items/<int:pk>/complete/', ChecklistItemViewSet.as_view({
         'post': 'complete'
     }), name='checklistitem-complete'),
+    
+    # ===== Evidence Attachment URLs =====
+    # GET /api/items/<id>/attachments/ - List an item's evidence files
+    # POST /api/items/<id>/attachments/ - Upload an evidence file (multipart, field "file")
+    path('items/<int:item_pk>/attachments/', EvidenceAttachmentViewSet.as_view({
+        'get': 'list',
+        'post': 'create'
+    }), name='item-attachments'),
+    
+    # DELETE /api/attachments/<id>/ - Remove an attachment
+    path('attachments/<int:pk>/', EvidenceAttachmentViewSet.as_view({
+        'delete': 'destroy'
+    }), name='attachment-detail'),
+    
+    # GET /api/attachments/<id>/download/ - Download the file (supports Range)
+    path('attachments/<int:pk>/download/', EvidenceAttachmentViewSet.as_view({
+        'get': 'download'
+    }), name='attachment-download'),
+    
+    # ===== Owner URLs =====
+    # GET /api/owners/ - List owners
+    # POST /api/owners/ - Create owner
+    path('owners/', OwnerViewSet.as_view({
+        'get': 'list',
+        'post': 'create'
+    }), name='owner-list'),
+    
+    # GET /api/owners/<id>/ - Get specific owner
+    # PUT/PATCH /api/owners/<id>/ - Rename owner
+    # DELETE /api/owners/<id>/ - Delete owner
+    path('owners/<int:pk>/', OwnerViewSet.as_view({
+        'get': 'retrieve',
+        'put': 'update',
+        'patch': 'partial_update',
+        'delete': 'destroy'
+    }), name='owner-detail'),
+    
+    # GET /api/owners/<id>/workload/ - Item counts per status for owner
+    path('owners/<int:pk>/workload/', OwnerViewSet.as_view({
+        'get': 'workload'
+    }), name='owner-workload'),
+    
+    # POST /api/owners/<id>/reassign/ - Bulk reassign owner's items
+    path('owners/<int:pk>/reassign/', OwnerViewSet.as_view({
+        'post': 'reassign'
+    }), name='owner-reassign'),
+    
+    # ===== Checklist Template URLs =====
+    # GET /api/templates/ - List templates
+    # POST /api/templates/ - Create template
+    path('templates/', ChecklistTemplateViewSet.as_view({
+        'get': 'list',
+        'post': 'create'
+    }), name='template-list'),
+    
+    # GET /api/templates/<id>/ - Get template with its items
+    # PUT/PATCH /api/templates/<id>/ - Update template
+    # DELETE /api/templates/<id>/ - Delete template
+    path('templates/<int:pk>/', ChecklistTemplateViewSet.as_view({
+        'get': 'retrieve',
+        'put': 'update',
+        'patch': 'partial_update',
+        'delete': 'destroy'
+    }), name='template-detail'),
+    
+    # POST /api/templates/<id>/instantiate/ - Create checklist from template
+    path('templates/<int:pk>/instantiate/', ChecklistTemplateViewSet.as_view({
+        'post': 'instantiate'
+    }), name='template-instantiate'),
 ]
@@ -1,21 +1,252 @@
+from functools import partial
+
+from django.db.models import Value
+from django.http import Http404
+from django.urls import reverse
 from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
+from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, SAFE_METHODS
 from rest_framework.views import APIView
+from users.serializers import UserSerializer
 
 from .serializers import (
     ChecklistSerializer,
     ChecklistListSerializer,
     ChecklistItemSerializer,
     ChecklistItemCreateSerializer,
-    ChecklistStatsSerializer
+    ChecklistStatsSerializer,
+    OwnerSerializer,
+    OwnerWorkloadSerializer,
+    OwnerReassignSerializer,
+    ChangeSerializer,
+    ChecklistCopySerializer,
+    ChecklistTemplateSerializer,
+    ChecklistTemplateListSerializer,
+    EvidenceAttachmentSerializer,
+    BatchRequestSerializer
+)
+from .models import Checklist
+from .fast_serializers import ChecklistListValuesSerializer, ChecklistItemValuesSerializer
+from .pagination import ChecklistItemCursorPagination, get_embed_size
+from .repositories import ChecklistRepository, ChecklistItemRepository
+from .services import (
+    ChecklistService,
+    ChecklistItemService,
+    OwnerService,
+    ChangeService,
+    TemplateService,
+    ArchiveService,
+    EvidenceService,
+    get_client_config
 )
-from .services import ChecklistService, ChecklistItemService
-from .exceptions import ValidationError
+from .conditional import request_validators, not_modified_response, add_validators
+from .exceptions import ValidationError, ConcurrencyError, precondition_failed_response
+from .evidence import UPLOAD_FIELD, HashingUploadHandler, blob_path, download_response, get_max_upload_size
+from .idempotency import idempotent
+from .batch import build_request, run_batch
+from .identity_map import get_identity_map
+from .singleflight import get_metrics
+
+
+class SparseFieldsetMixin:
+    """
+    Adds ?fields=a,b and ?exclude=c query parameters to read requests.
+    
+    Only the chosen fields are serialized, and the queryset is trimmed
+    (.only(), select_related, prefetch_related, annotations) to what those
+    fields need. Read requests without these parameters get the joins and
+    annotations of all fields. Write requests always use the full serializer.
+    """
+    
+    def get_sparse_fieldset(self):
+        
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return {}
+        
+        sparse = {}
+        for param in ('fields', 'exclude'):
+            value = self.request.query_params.get(param)
+            if value:
+                sparse[param] = [name.strip() for name in value.split(',') if name.strip()]
+        return sparse
+    
+    def apply_sparse_fieldset(self, queryset, serializer_class=None):
+        
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        
+        sparse = self.get_sparse_fieldset()
+        serializer_class = serializer_class or self.get_serializer_class()
+        field_names = serializer_class.select_field_names(
+            serializer_class().fields,
+            sparse.get('fields'),
+            sparse.get('exclude')
+        )
+        return serializer_class.optimize_queryset(queryset, field_names, defer_unused=bool(sparse))
+    
+    def get_serializer(self, *args, **kwargs):
+        
+        for param, names in self.get_sparse_fieldset().items():
+            kwargs.setdefault(param, names)
+        return super().get_serializer(*args, **kwargs)
+
+
+class VersionETagMixin:
+    """
+    Optimistic concurrency for single-object endpoints.
+    
+    Responses that return one object carry its version as a strong ETag
+    ("3"; GETs add a fingerprint, "3.5f0c...", see ConditionalGetMixin).
+    Writes may send it back in If-Match; the update is then conditional
+    on that version and fails with 412 if the object has changed since.
+    Writes without If-Match are applied unconditionally.
+    """
+    
+    def get_if_match_versions(self):
+        """Versions listed in If-Match, or None when the header is absent or "*"."""
+        header = self.request.headers.get('If-Match', '').strip()
+        if not header or header == '*':
+            return None
+        
+        versions = []
+        for tag in header.split(','):
+            # Compression weakens our ETags (W/"3"), but the version is the same;
+            # a GET's "3.5f0c..." is version 3 plus a fingerprint of the body
+            tag = tag.strip().removeprefix('W/').strip('"').split('.', 1)[0]
+            if tag.isdigit():
+                versions.append(int(tag))
+        # Nothing parseable can't match any version - the update fails with 412
+        return versions
+    
+    def add_version_etag(self, response, data):
+        
+        version = data.get('version') if isinstance(data, dict) else None
+        if version is not None and status.is_success(response.status_code):
+            response['ETag'] = f'"{version}"'
+        return response
+    
+    def retrieve(self, request, *args, **kwargs):
+        
+        response = super().retrieve(request, *args, **kwargs)
+        return self.add_version_etag(response, response.data)
+    
+    def create(self, request, *args, **kwargs):
+        
+        response = super().create(request, *args, **kwargs)
+        return self.add_version_etag(response, response.data)
+    
+    def update(self, request, *args, **kwargs):
+        
+        response = super().update(request, *args, **kwargs)
+        return self.add_version_etag(response, response.data)
 
 
-class ChecklistViewSet(viewsets.ModelViewSet):
+class ConditionalGetMixin:
+    """
+    HTTP conditional GET for list and retrieve (see checklists/conditional.py).
+    
+    The ETag (and, with retrieve_last_modified, Last-Modified on retrieve)
+    comes from one aggregate query over the rows the response is built from:
+    the user's rows of freshness_repository_class, filtered like the
+    response. When If-None-Match / If-Modified-Since still match, the
+    answer is a 304 and nothing is loaded or serialized.
+    """
+    
+    # Repository with get_by_user(user) and get_freshness(queryset)
+    freshness_repository_class = None
+    
+    # Only sound when a retrieved object embeds nothing that can be deleted
+    retrieve_last_modified = False
+    
+    def get_freshness_queryset(self):
+        """The rows of list/retrieve before filtering, without the serializer's joins."""
+        return self.freshness_repository_class().get_by_user(self.request.user)
+    
+    def get_freshness(self, queryset):
+        
+        return self.freshness_repository_class().get_freshness(queryset)
+    
+    def get_validators(self, freshness, version=None):
+        
+        last_modified = version is not None and self.retrieve_last_modified
+        return request_validators(self.request, freshness, self.action, version=version, last_modified=last_modified)
+    
+    def respond_conditionally(self, validators, respond):
+        
+        not_modified = not_modified_response(self.request, validators)
+        if not_modified is not None:
+            return not_modified
+        return add_validators(respond(), validators)
+    
+    def list(self, request, *args, **kwargs):
+        
+        freshness = self.get_freshness(self.filter_queryset(self.get_freshness_queryset()))
+        return self.respond_conditionally(
+            self.get_validators(freshness),
+            partial(super().list, request, *args, **kwargs)
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        
+        retrieve = partial(super().retrieve, request, *args, **kwargs)
+        try:
+            freshness = self.get_freshness(self.filter_queryset(self.get_freshness_queryset()).filter(pk=kwargs['pk']))
+        except (TypeError, ValueError):
+            # Not an id - get_object() answers 404
+            return retrieve()
+        if not freshness['count']:
+            return retrieve()
+        return self.respond_conditionally(self.get_validators(freshness, freshness['version']), retrieve)
+
+
+class IdentityMapMixin:
+    """
+    Puts the object of detail requests into the request's identity map
+    (see checklists/identity_map.py), so the service's own lookup of the
+    same id - permission check, update, delete - doesn't load it again.
+    """
+    
+    def get_object(self):
+        
+        return get_identity_map().add(super().get_object())
+
+
+class FastListMixin:
+    """
+    Serves the list action through a ValuesListSerializer.
+    
+    Rows are fetched as tuples and converted with precompiled per-field
+    converters instead of building model instances and running the
+    ModelSerializer. The response body is identical to the regular path.
+    """
+    
+    fast_list_serializer_class = None
+    
+    def list(self, request, *args, **kwargs):
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        fast_serializer = self.fast_list_serializer_class(
+            context=self.get_serializer_context(),
+            **self.get_sparse_fieldset()
+        )
+        rows = self.get_list_rows(fast_serializer, queryset)
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.to_representation(page))
+        return Response(fast_serializer.to_representation(rows))
+    
+    def get_list_rows(self, fast_serializer, queryset):
+        
+        return fast_serializer.values_list(queryset)
+
+
+class ChecklistViewSet(SparseFieldsetMixin, ConditionalGetMixin, VersionETagMixin, IdentityMapMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Checklist model.
     
@@ -30,6 +261,13 @@ class ChecklistViewSet(viewsets.ModelViewSet):
     Additional custom endpoints:
     - GET /api/checklists/{id}/items/ - Get items in a checklist
     - POST /api/checklists/{id}/items/ - Add item to a checklist
+    - POST /api/checklists/{id}/clone/ - Copy a checklist with all its items
+    - POST /api/checklists/{id}/restore/ - Move an archived checklist back
+    
+    Read endpoints accept ?fields= / ?exclude= (see SparseFieldsetMixin)
+    and answer If-None-Match / If-Modified-Since (see ConditionalGetMixin).
+    Archived checklists (see checklists/archive.py) are listed with
+    ?include_archived=1 and can always be retrieved by id, read-only.
     """
     
     # Require authentication for all operations
@@ -38,6 +276,12 @@ class ChecklistViewSet(viewsets.ModelViewSet):
     # Use different serializers for list vs detail views
     serializer_class = ChecklistSerializer
     
+    # values_list-based equivalent of ChecklistListSerializer for the list action
+    fast_list_serializer_class = ChecklistListValuesSerializer
+    
+    # Validators of list/retrieve (see ConditionalGetMixin)
+    freshness_repository_class = ChecklistRepository
+    
     # Enable filtering by status
     filterset_fields = ['status']
     
@@ -50,10 +294,63 @@ class ChecklistViewSet(viewsets.ModelViewSet):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.service = ChecklistService()
+        self.archive_service = ArchiveService()
     
     def get_queryset(self):
         
-        return self.service.get_user_checklists(self.request.user)
+        # Schema generation has no user - an empty queryset is enough to describe the view
+        if getattr(self, 'swagger_fake_view', False):
+            return Checklist.objects.none()
+        
+        queryset = self.service.get_user_checklists(self.request.user)
+        return self.apply_sparse_fieldset(queryset)
+    
+    def include_archived(self):
+        
+        return self.request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+    
+    def get_list_rows(self, fast_serializer, queryset):
+        
+        if not self.include_archived():
+            return super().get_list_rows(fast_serializer, queryset)
+        
+        # The archive has the list columns, so both tiers go through the same
+        # fast serializer in one UNION ALL, filtered alike and ordered and paged together
+        archived = self.archive_service.get_archived_checklists(self.request.user)
+        for backend in self.filter_backends:
+            if not issubclass(backend, OrderingFilter):
+                archived = backend().filter_queryset(self.request, archived, self)
+        
+        ordering = queryset.query.order_by or Checklist._meta.ordering
+        for name in ordering:
+            fast_serializer.column(name.lstrip('-'))
+        fast_serializer.add_column_field('archived')
+        
+        live_rows = fast_serializer.values_list(queryset.annotate(archived=Value(False)).order_by())
+        archived_rows = fast_serializer.values_list(archived.annotate(archived=Value(True)).order_by())
+        return live_rows.union(archived_rows, all=True).order_by(*ordering)
+    
+    def retrieve(self, request, *args, **kwargs):
+        
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            archived = self.archive_service.get_archived_checklist(kwargs['pk'], request.user)
+            if archived is None:
+                raise
+        
+        # Archived checklists stay readable under their id; the first page of
+        # items is embedded and items_next pages the rest, as for live ones
+        checklist, items = archived
+        serializer = self.get_serializer(checklist)
+        page, next_cursor = ChecklistItemCursorPagination().get_list_page(items, get_embed_size(request))
+        serializer.set_items_page(checklist, page, next_cursor)
+        return Response(dict(serializer.data, archived=True))
+    
+    def get_checklist_validators(self, pk):
+        """Validators of the items endpoint: the whole checklist, whatever the status filter or page."""
+        freshness = self.service.get_checklist_freshness(pk, self.request.user)
+        return self.get_validators(freshness) if freshness['count'] else None
     
     def get_serializer_class(self):
         
@@ -61,6 +358,12 @@ class ChecklistViewSet(viewsets.ModelViewSet):
             return ChecklistListSerializer
         return ChecklistSerializer
     
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        
+        # Retries with the same Idempotency-Key replay the first response
+        return super().create(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         
         try:
@@ -74,10 +377,12 @@ class ChecklistViewSet(viewsets.ModelViewSet):
        
         try:
             data = serializer.validated_data
+            # serializer.instance is the object update() already loaded
             checklist = self.service.update_checklist(
-                self.get_object().id,
+                serializer.instance.id,
                 data,
-                self.request.user
+                self.request.user,
+                versions=self.get_if_match_versions()
             )
             serializer.instance = checklist
         except ValidationError as e:
@@ -93,41 +398,74 @@ class ChecklistViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='items')
     def items(self, request, pk=None):
         """
-        Get all items for a specific checklist.
+        Get items for a specific checklist, one cursor page at a time.
+        
+        Query parameters:
+        - cursor: continuation token from the previous page's "next" link
+        - page_size: items per page (capped by CHECKLIST_ITEMS_MAX_PAGE_SIZE)
+        - status: only items with these statuses (comma-separated)
         """
+        statuses = [s for s in request.query_params.get('status', '').split(',') if s]
         try:
-            items = self.service.get_checklist_items(pk)
-            serializer = ChecklistItemSerializer(items, many=True)
-            return Response({
-                'success': True,
-                'count': len(items),
-                'items': serializer.data
-            }, status=status.HTTP_200_OK)
+            validators = self.get_checklist_validators(pk)
+            not_modified = not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+            
+            items = self.service.get_checklist_items(pk, request.user, statuses=statuses)
+            items = self.apply_sparse_fieldset(items, ChecklistItemSerializer)
+            
+            paginator = ChecklistItemCursorPagination()
+            page = paginator.paginate_queryset(items, request, view=self)
+            serializer = ChecklistItemSerializer(page, many=True, **self.get_sparse_fieldset())
+            return add_validators(paginator.get_paginated_response(serializer.data), validators)
         except ValidationError as e:
+            # Archived checklists keep their items readable, like retrieve()
+            archived = self.archive_service.get_archived_checklist(pk, request.user)
+            if archived is not None:
+                return self.archived_items_response(archived, statuses)
             return Response({
                 'success': False,
                 'error': e.message
             }, status=status.HTTP_400_BAD_REQUEST)
+        except NotFound:
+            # Invalid cursor - let DRF render the 404
+            raise
         except Exception as e:
             return Response({
                 'success': False,
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    def archived_items_response(self, archived, statuses):
+        """The items action for an archived checklist, paged from its unpacked items."""
+        _, items = archived
+        if statuses:
+            items = [item for item in items if item.status in statuses]
+        
+        paginator = ChecklistItemCursorPagination()
+        page = paginator.paginate_list(items, self.request)
+        serializer = ChecklistItemSerializer(page, many=True, **self.get_sparse_fieldset())
+        return paginator.get_paginated_response(serializer.data)
+    
     @action(detail=True, methods=['post'], url_path='add-item')
+    @idempotent
     def add_item(self, request, pk=None):
         """
         Add a new item to a checklist.
+        
+        Send an Idempotency-Key header to make retries safe.
         """
         try:
             item_service = ChecklistItemService()
-            item = item_service.create_item(pk, request.data)
+            item = item_service.create_item(pk, request.user, request.data)
             serializer = ChecklistItemSerializer(item)
-            return Response({
+            response = Response({
                 'success': True,
                 'item': serializer.data,
                 'message': 'Item added successfully'
             }, status=status.HTTP_201_CREATED)
+            return self.add_version_etag(response, serializer.data)
         except ValidationError as e:
             return Response({
                 'success': False,
@@ -140,7 +478,57 @@ class ChecklistViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ChecklistItemViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'])
+    @idempotent
+    def clone(self, request, pk=None):
+        """
+        Copy a checklist and all its items into a new checklist.
+        
+        The items are copied in the database (one INSERT ... SELECT), as
+        pending, without evidence notes and - unless keep_owners is false -
+        with their owners. Send an Idempotency-Key header to make retries safe.
+        """
+        options = ChecklistCopySerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        
+        try:
+            checklist = self.service.clone_checklist(pk, request.user, options.validated_data)
+            serializer = ChecklistSerializer(checklist, context=self.get_serializer_context())
+            response = Response({
+                'success': True,
+                'checklist': serializer.data,
+                'message': 'Checklist cloned successfully'
+            }, status=status.HTTP_201_CREATED)
+            return self.add_version_etag(response, serializer.data)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['post'])
+    def restore(self, request, pk=None):
+        """
+        Move an archived checklist back to the live tables, with its items,
+        ids, versions and timestamps (see checklists/archive.py).
+        """
+        try:
+            checklist = self.archive_service.restore_checklist(pk, request.user)
+            serializer = ChecklistSerializer(checklist, context=self.get_serializer_context())
+            response = Response({
+                'success': True,
+                'checklist': serializer.data,
+                'message': 'Checklist restored successfully'
+            }, status=status.HTTP_200_OK)
+            return self.add_version_etag(response, serializer.data)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ChecklistItemViewSet(SparseFieldsetMixin, ConditionalGetMixin, VersionETagMixin, IdentityMapMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for ChecklistItem model.
     
@@ -153,16 +541,24 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
     
     Custom endpoints:
     - POST /api/items/{id}/complete/ - Mark item as completed
+    
+    Read endpoints accept ?fields= / ?exclude= (see SparseFieldsetMixin)
+    and answer If-None-Match / If-Modified-Since (see ConditionalGetMixin).
     """
     
     serializer_class = ChecklistItemSerializer
+    fast_list_serializer_class = ChecklistItemValuesSerializer
     permission_classes = [IsAuthenticated]
     
+    # Validators of list/retrieve (see ConditionalGetMixin); an item is one row
+    freshness_repository_class = ChecklistItemRepository
+    retrieve_last_modified = True
+    
     # Enable filtering by status and checklist
     filterset_fields = ['status', 'checklist']
     
     # Enable searching
-    search_fields = ['title', 'description', 'assigned_owner']
+    search_fields = ['title', 'description', 'owner__name']
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -170,13 +566,17 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         
-        return self.service.get_all_items()
+        # Scoped to the caller in the query itself: the list, its COUNT and
+        # the validators cost what the user's items cost, not the whole table
+        return self.apply_sparse_fieldset(self.service.get_user_items(self.request.user))
     
     def perform_create(self, serializer):
         
         try:
             checklist_id = self.request.data.get('checklist')
-            item = self.service.create_item(checklist_id, serializer.validated_data)
+            # Validating "checklist" loaded it already - the service finds it in the identity map
+            get_identity_map().add(serializer.validated_data.get('checklist'))
+            item = self.service.create_item(checklist_id, self.request.user, serializer.validated_data)
             serializer.instance = item
         except ValidationError as e:
             raise serializers.ValidationError(e.message)
@@ -185,8 +585,10 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         
         try:
             item = self.service.update_item(
-                self.get_object().id,
-                serializer.validated_data
+                serializer.instance.id,
+                self.request.user,
+                serializer.validated_data,
+                versions=self.get_if_match_versions()
             )
             serializer.instance = item
         except ValidationError as e:
@@ -195,14 +597,17 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         
         try:
-            self.service.delete_item(instance.id)
+            self.service.delete_item(instance.id, self.request.user)
         except ValidationError as e:
             raise serializers.ValidationError(e.message)
     
     @action(detail=True, methods=['post'])
+    @idempotent
     def complete(self, request, pk=None):
         """
         Mark a checklist item as completed.
+        
+        Send an Idempotency-Key header to make retries safe.
         """
         try:
             data = {'status': 'completed'}
@@ -210,18 +615,21 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
             if evidence_notes:
                 data['evidence_notes'] = evidence_notes
             
-            item = self.service.update_item(pk, data)
+            item = self.service.update_item(pk, request.user, data, versions=self.get_if_match_versions())
             serializer = self.get_serializer(item)
-            return Response({
+            response = Response({
                 'success': True,
                 'item': serializer.data,
                 'message': 'Item marked as completed'
             }, status=status.HTTP_200_OK)
+            return self.add_version_etag(response, serializer.data)
         except ValidationError as e:
             return Response({
                 'success': False,
                 'error': e.message
             }, status=status.HTTP_400_BAD_REQUEST)
+        except ConcurrencyError as e:
+            return precondition_failed_response(e)
         except Exception as e:
             return Response({
                 'success': False,
@@ -229,12 +637,318 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class EvidenceAttachmentViewSet(viewsets.GenericViewSet):
+    """
+    Evidence files attached to checklist items (see checklists/evidence.py):
+    - GET /api/items/{id}/attachments/ - List an item's attachments
+    - POST /api/items/{id}/attachments/ - Upload a file (multipart, field "file")
+    - GET /api/attachments/{id}/download/ - Download a file (Range requests supported)
+    - DELETE /api/attachments/{id}/ - Remove an attachment
+    
+    Uploads are streamed to disk and hashed as they arrive; content that is
+    stored already is not stored again.
+    """
+    
+    serializer_class = EvidenceAttachmentSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    
+    # Multipart uploads and file downloads don't fit in a JSON batch
+    batchable = False
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service = EvidenceService()
+    
+    def initialize_request(self, request, *args, **kwargs):
+        
+        # Before anything reads the body: the upload goes straight to the evidence store
+        self.upload_handler = HashingUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return super().initialize_request(request, *args, **kwargs)
+    
+    def perform_content_negotiation(self, request, force=False):
+        
+        # A download is a file whatever the Accept header says (errors are still JSON)
+        return super().perform_content_negotiation(request, force=force or self.action == 'download')
+    
+    def list(self, request, item_pk=None):
+        
+        try:
+            attachments = self.service.get_item_attachments(item_pk, request.user)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = self.get_serializer(attachments, many=True)
+        return Response(serializer.data)
+    
+    def create(self, request, item_pk=None):
+        
+        uploaded_file = request.FILES.get(UPLOAD_FIELD)
+        if self.upload_handler.too_large:
+            return Response({
+                'success': False,
+                'error': f'File is larger than {get_max_upload_size() // 2**20} MB'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        if uploaded_file is None:
+            return Response({
+                'success': False,
+                'error': f'Upload the file as multipart/form-data field "{UPLOAD_FIELD}"'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            attachment, deduplicated = self.service.attach(item_pk, request.user, uploaded_file)
+            serializer = self.get_serializer(attachment)
+            return Response({
+                'success': True,
+                'attachment': serializer.data,
+                'deduplicated': deduplicated,
+                'message': 'Evidence uploaded successfully'
+            }, status=status.HTTP_201_CREATED)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    def destroy(self, request, pk=None):
+        
+        try:
+            self.service.delete_attachment(pk, request.user)
+        except ValidationError as e:
+            raise NotFound(e.message)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        The attached file. Answers Range with 206 and If-None-Match (the
+        content's SHA-256) with 304; the file is sent by the server's file
+        wrapper, not read into Python.
+        """
+        attachment = self.service.get_attachment(pk, request.user)
+        if attachment is None:
+            raise NotFound()
+        path = blob_path(attachment.blob.sha256)
+        if not path.exists():
+            raise NotFound('Evidence file is missing')
+        
+        return download_response(
+            request,
+            path,
+            attachment.blob.size,
+            attachment.content_type,
+            attachment.filename,
+            f'"{attachment.blob.sha256}"'
+        )
+
+
+class OwnerViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for Owner model.
+    
+    Owners are normalized assignees for checklist items, private to the
+    user who created them:
+    - GET /api/owners/ - List the user's owners
+    - POST /api/owners/ - Create an owner
+    - GET /api/owners/{id}/ - Get a specific owner
+    - PUT/PATCH /api/owners/{id}/ - Rename or relink an owner
+    - DELETE /api/owners/{id}/ - Delete an owner (items become unassigned)
+    
+    Custom endpoints:
+    - GET /api/owners/{id}/workload/ - Item counts per status for the owner
+    - POST /api/owners/{id}/reassign/ - Move the owner's items to another owner
+    """
+    
+    serializer_class = OwnerSerializer
+    permission_classes = [IsAuthenticated]
+    
+    search_fields = ['name']
+    ordering_fields = ['name', 'created_at']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service = OwnerService()
+    
+    def get_queryset(self):
+        
+        return self.service.get_user_owners(self.request.user)
+    
+    def perform_create(self, serializer):
+        
+        try:
+            owner = self.service.create_owner(self.request.user, serializer.validated_data)
+            serializer.instance = owner
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+    
+    def perform_update(self, serializer):
+        
+        try:
+            owner = self.service.update_owner(
+                serializer.instance.id,
+                self.request.user,
+                serializer.validated_data
+            )
+            serializer.instance = owner
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+    
+    def perform_destroy(self, instance):
+        
+        try:
+            self.service.delete_owner(instance.id, self.request.user)
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+    
+    @action(detail=True, methods=['get'])
+    def workload(self, request, pk=None):
+        """
+        Get item counts per status for an owner across the user's checklists.
+        """
+        try:
+            workload = self.service.get_owner_workload(pk, request.user)
+            serializer = OwnerWorkloadSerializer(workload)
+            return Response({
+                'success': True,
+                'workload': serializer.data
+            }, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['post'])
+    def reassign(self, request, pk=None):
+        """
+        Reassign all of an owner's items (in the user's checklists) in one UPDATE.
+        """
+        serializer = OwnerReassignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            updated = self.service.reassign_items(
+                pk,
+                serializer.validated_data['to_owner'],
+                request.user,
+                serializer.validated_data.get('checklist')
+            )
+            return Response({
+                'success': True,
+                'updated_items': updated,
+                'message': f'{updated} item(s) reassigned'
+            }, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ChecklistTemplateViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for ChecklistTemplate model.
+    
+    Templates are reusable checklists, private to their creator:
+    - GET /api/templates/ - List the user's templates
+    - POST /api/templates/ - Create a template (with items, or copied from a checklist)
+    - GET /api/templates/{id}/ - Get a template with its items
+    - PUT/PATCH /api/templates/{id}/ - Update a template ("items" replaces all items)
+    - DELETE /api/templates/{id}/ - Delete a template
+    
+    Custom endpoints:
+    - POST /api/templates/{id}/instantiate/ - Create a checklist from the template
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    search_fields = ['name', 'description']
+    ordering_fields = ['name', 'created_at', 'updated_at']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service = TemplateService()
+    
+    def get_queryset(self):
+        
+        queryset = self.service.get_user_templates(self.request.user)
+        if self.action != 'list':
+            queryset = queryset.prefetch_related('items__owner')
+        return queryset
+    
+    def get_serializer_class(self):
+        
+        if self.action == 'list':
+            return ChecklistTemplateListSerializer
+        return ChecklistTemplateSerializer
+    
+    def perform_create(self, serializer):
+        
+        try:
+            template = self.service.create_template(self.request.user, serializer.validated_data)
+            serializer.instance = template
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+    
+    def perform_update(self, serializer):
+        
+        try:
+            template = self.service.update_template(
+                serializer.instance.id,
+                self.request.user,
+                serializer.validated_data
+            )
+            serializer.instance = template
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+    
+    def perform_destroy(self, instance):
+        
+        try:
+            self.service.delete_template(instance.id, self.request.user)
+        except ValidationError as e:
+            raise serializers.ValidationError(e.message)
+    
+    @action(detail=True, methods=['post'])
+    @idempotent
+    def instantiate(self, request, pk=None):
+        """
+        Create a checklist from the template.
+        
+        The template's items are copied in one INSERT ... SELECT, so this
+        takes about as long for 500 items as for 5. Send an Idempotency-Key
+        header to make retries safe.
+        """
+        options = ChecklistCopySerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        
+        try:
+            checklist = self.service.instantiate_template(pk, request.user, options.validated_data)
+            serializer = ChecklistSerializer(checklist, context=self.get_serializer_context())
+            return Response({
+                'success': True,
+                'checklist': serializer.data,
+                'message': 'Checklist created from template'
+            }, status=status.HTTP_201_CREATED)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+
 class DashboardStatsView(APIView):
     """
     API endpoint for dashboard statistics using service layer.
     
     GET /api/stats/
     
+    Answers If-None-Match / If-Modified-Since with 304 (see conditional.py).
+    
     Returns:
     {
         "total_checklists": 15,
@@ -258,14 +972,230 @@ class DashboardStatsView(APIView):
         """
         try:
             service = ChecklistService()
-            stats = service.get_dashboard_stats(request.user)
+            freshness = service.get_dashboard_freshness(request.user)
+            validators = request_validators(request, freshness, 'stats')
+            not_modified = not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+            
+            # Shared only with calls that read the same freshness (see dashboard_stats_key)
+            stats = service.get_dashboard_stats(request.user, freshness)
             serializer = ChecklistStatsSerializer(stats)
-            return Response({
+            return add_validators(Response({
                 'success': True,
                 'stats': serializer.data
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK), validators)
         except Exception as e:
             return Response({
                 'success': False,
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MetricsView(APIView):
+    """
+    Counters of this worker process (staff only).
+    
+    GET /api/metrics/
+    
+    Returns:
+    {
+        "success": true,
+        "single_flight": {
+            "pid": 4242,
+            "flights": {
+                "dashboard_stats": {"calls": 120, "executions": 31, "shared": 89,
+                                    "shared_across_processes": 0, "saved": 89}
+            }
+        }
+    }
+    
+    Each worker counts for itself - add the numbers up across workers.
+    """
+    
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        
+        return Response({
+            'success': True,
+            'single_flight': get_metrics()
+        }, status=status.HTTP_200_OK)
+
+
+class BootstrapView(APIView):
+    """
+    Everything the frontend needs on its first page load, in one request.
+    
+    GET /api/bootstrap/
+    
+    Returns the bodies of GET /api/auth/me/, GET /api/stats/ and the first
+    page of GET /api/checklists/, plus the server config:
+    {
+        "success": true,
+        "user": {"id": 1, "username": "alice", ...},
+        "stats": {"total_checklists": 15, ...},
+        "checklists": {"count": 15, "next": ".../api/checklists/?page=2", "previous": null, "results": [...]},
+        "config": {"page_size": 20, "checklist_statuses": [...], ...}
+    }
+    
+    Stats and the checklist page are built from the same rows, so one
+    freshness query validates the whole response: If-None-Match /
+    If-Modified-Since get a 304 before anything else is loaded. The
+    config is built once per process.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get_checklists_page(self, request):
+        """The first page of GET /api/checklists/, as that endpoint returns it."""
+        list_request = Request(build_request(request, {'method': 'GET', 'path': reverse('checklist-list')}))
+        view = ChecklistViewSet(request=list_request, action='list', args=(), kwargs={}, format_kwarg=None)
+        # The list itself, without its conditional GET - the validators below cover these rows
+        return FastListMixin.list(view, list_request).data
+    
+    def get(self, request):
+        
+        service = ChecklistService()
+        user = UserSerializer(request.user).data
+        config = get_client_config()
+        
+        freshness = service.get_dashboard_freshness(request.user)
+        validators = request_validators(request, freshness, 'bootstrap', tuple(user.items()), repr(config))
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        
+        stats = service.get_dashboard_stats(request.user, freshness)
+        return add_validators(Response({
+            'success': True,
+            'user': user,
+            'stats': ChecklistStatsSerializer(stats).data,
+            'checklists': self.get_checklists_page(request),
+            'config': config
+        }, status=status.HTTP_200_OK), validators)
+
+
+class ChangeFeedView(APIView):
+    """
+    Delta sync: everything that changed in the user's checklists since a cursor.
+    
+    GET /api/changes/?since=<cursor>&limit=<n>
+    
+    Returns:
+    {
+        "success": true,
+        "changes": [
+            {"sequence": 41, "resource": "checklist", "id": 3, "checklist": 3,
+             "action": "updated", "version": 5, "data": {...}},
+            {"sequence": 42, "resource": "item", "id": 17, "checklist": 3,
+             "action": "deleted", "version": null, "data": null}
+        ],
+        "cursor": "42",
+        "has_more": false
+    }
+    
+    Start with since=0 (or omit it), then pass back "cursor" until
+    has_more is false. "data" is the current object (checklists as in the
+    list endpoint, items as in the items endpoint); deletes are tombstones.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        
+        try:
+            since = int(request.query_params.get('since') or 0)
+            limit = int(request.query_params.get('limit') or 0)
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': 'since and limit must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            feed = ChangeService().get_changes(request.user, since, limit if limit > 0 else None)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'error': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializers_by_resource = {
+            'checklist': (feed['checklists'], ChecklistListSerializer),
+            'item': (feed['items'], ChecklistItemSerializer),
+        }
+        context = {'request': request}
+        
+        changes = []
+        for change in feed['changes']:
+            entry = ChangeSerializer(change).data
+            entry['data'] = None
+            if change.action != 'deleted':
+                objects, serializer_class = serializers_by_resource[change.resource]
+                obj = objects.get(change.object_id)
+                if obj is None:
+                    # Deleted since - its tombstone comes later in the feed
+                    continue
+                entry['data'] = serializer_class(obj, context=context).data
+            changes.append(entry)
+        
+        return Response({
+            'success': True,
+            'changes': changes,
+            'cursor': str(feed['cursor']),
+            'has_more': feed['has_more']
+        }, status=status.HTTP_200_OK)
+
+
+class BatchView(APIView):
+    """
+    Several API requests in one round trip (see checklists/batch.py).
+    
+    POST /api/batch/
+    {
+        "atomic": false,
+        "requests": [
+            {"id": "detail", "method": "GET", "path": "/api/checklists/5/"},
+            {"id": "stats", "method": "GET", "path": "/api/stats/"}
+        ]
+    }
+    
+    Returns every result, in order:
+    {
+        "success": true,
+        "rolled_back": false,
+        "responses": [
+            {"id": "detail", "status": 200, "headers": {"ETag": "..."}, "body": {...}},
+            ...
+        ]
+    }
+    
+    The batch itself answers 200 unless the envelope is invalid; each
+    sub-request has its own status.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    # A batch can't contain another batch
+    batchable = False
+    
+    def post(self, request):
+        
+        serializer = BatchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'error': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        results, rolled_back = run_batch(
+            request,
+            serializer.validated_data['requests'],
+            atomic=serializer.validated_data['atomic']
+        )
+        return Response({
+            'success': True,
+            'rolled_back': rolled_back,
+            'responses': results
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,19 @@
+"""
+Lazy access to drf-yasg for view modules.
+
+API workers (compliance_api.settings_api) do not install drf_yasg, and
+importing it costs startup time (it pulls in pkg_resources). Views
+decorate their methods through this module instead of drf_yasg.utils, so
+the import only happens where the docs are actually served.
+"""
+
+from django.apps import apps
+
+
+def swagger_auto_schema(**kwargs):
+    """drf_yasg's swagger_auto_schema, or a no-op when drf_yasg is not installed."""
+    if not apps.is_installed('drf_yasg'):
+        return lambda view_method: view_method
+
+    from drf_yasg.utils import swagger_auto_schema as decorator
+    return decorator(**kwargs)
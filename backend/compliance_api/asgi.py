@@ -3,14 +3,40 @@ ASGI config for compliance_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server to enable the live updates stream (/api/events/):
+
+    uvicorn compliance_api.asgi:application --host 0.0.0.0 --port 8000
+
+Set DJANGO_SETTINGS_MODULE=compliance_api.settings_api for API-only workers.
+
+Requests are routed through compliance_api.urls_asgi, which serves the hot
+read endpoints with async views (see checklists/async_views.py). Set
+ASYNC_READ_VIEWS = False to use the regular DRF views for everything.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'compliance_api.settings')
 
-application = get_asgi_application()
+
+class AsyncReadASGIHandler(ASGIHandler):
+    """ASGIHandler that resolves requests with the async URLconf."""
+
+    def create_request(self, scope, body_file):
+
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None and getattr(settings, 'ASYNC_READ_VIEWS', True):
+            request.urlconf = 'compliance_api.urls_asgi'
+        return request, error_response
+
+
+# Same as django.core.asgi.get_asgi_application(), with the handler above
+django.setup(set_prefix=False)
+application = AsyncReadASGIHandler()
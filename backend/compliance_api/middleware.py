@@ -0,0 +1,252 @@
+"""
+Response compression middleware.
+
+Checklist detail responses embed every item with its description and
+evidence notes, so they are large and compress very well. This middleware
+negotiates the best encoding the client accepts (zstd, brotli or gzip,
+depending on which libraries are installed) and compresses:
+
+- regular responses above COMPRESSION_MIN_SIZE bytes, in one shot
+- StreamingHttpResponse bodies (e.g. exports), incrementally, chunk by chunk
+
+Responses that already have a Content-Encoding, are too small, carry an
+already-compressed content type (images, archives, ...) or are event
+streams are left alone. So are file downloads: FileResponses (which the
+WSGI server may send with sendfile()), byte-range responses (206, or any
+with Content-Range / Accept-Ranges - offsets count the stored bytes, and
+If-Range needs their strong ETag) and responses with
+skip_compression = True.
+"""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+# Content types that are already compressed - compressing again wastes CPU
+INCOMPRESSIBLE_TYPES = (
+    'image/',
+    'video/',
+    'audio/',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-bzip2',
+    'application/x-7z-compressed',
+    'application/zstd',
+    'application/pdf',
+    'application/octet-stream',
+)
+
+# Text-like image formats still compress well
+COMPRESSIBLE_EXCEPTIONS = ('image/svg+xml',)
+
+# Long-lived streams: a compressor per idle connection costs far more memory
+# than the few bytes of each event it would save
+UNCOMPRESSED_STREAM_TYPES = ('text/event-stream',)
+
+
+class GzipEncoder:
+
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        # mtime=0 keeps the output deterministic for identical bodies
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return _ChunkCompressor(
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush
+        )
+
+
+class BrotliEncoder:
+
+    name = 'br'
+
+    def __init__(self, quality=5):
+        self.quality = quality
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.quality)
+        return _ChunkCompressor(
+            lambda chunk: compressor.process(chunk) + compressor.flush(),
+            compressor.finish
+        )
+
+
+class ZstdEncoder:
+
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return _ChunkCompressor(
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush
+        )
+
+
+class _ChunkCompressor:
+    """
+    Incremental compressor for streaming bodies.
+
+    Every chunk is flushed, so the client can decode data as it arrives
+    instead of waiting for the end of the stream.
+    """
+
+    def __init__(self, process, finish):
+        self.process = process
+        self.finish = finish
+
+    def compress_sequence(self, sequence):
+        for chunk in sequence:
+            data = self.process(chunk)
+            if data:
+                yield data
+        yield self.finish()
+
+    async def acompress_sequence(self, sequence):
+        async for chunk in sequence:
+            data = self.process(chunk)
+            if data:
+                yield data
+        yield self.finish()
+
+
+def available_encoders():
+    """Encoders usable in this process, most preferred first."""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(ZstdEncoder())
+    if brotli is not None:
+        encoders.append(BrotliEncoder())
+    encoders.append(GzipEncoder())
+    return encoders
+
+
+def parse_accept_encoding(header):
+    """Return {coding: qvalue} for an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with the best encoding the client accepts.
+
+    Settings:
+        COMPRESSION_MIN_SIZE - bodies smaller than this (bytes) are sent as-is
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.encoders = available_encoders()
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def select_encoder(self, request):
+
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        wildcard = accepted.get('*', 0.0)
+
+        # Highest client quality wins; ties go to the server's preference order
+        best, best_quality = None, 0.0
+        for encoder in self.encoders:
+            quality = accepted.get(encoder.name, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoder, quality
+        return best
+
+    def process_response(self, request, response):
+
+        # Someone already encoded this response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        # Files and byte ranges go out as stored (see the module docstring)
+        if getattr(response, 'skip_compression', False) or isinstance(response, FileResponse):
+            return response
+        if response.status_code == 206 or response.has_header('Content-Range') or response.has_header('Accept-Ranges'):
+            return response
+
+        # It's not worth compressing tiny bodies
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type.startswith(INCOMPRESSIBLE_TYPES) and content_type not in COMPRESSIBLE_EXCEPTIONS:
+            return response
+        if content_type in UNCOMPRESSED_STREAM_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoder = self.select_encoder(request)
+        if encoder is None:
+            return response
+
+        if response.streaming:
+            stream = encoder.stream()
+            if response.is_async:
+                response.streaming_content = stream.acompress_sequence(response.streaming_content)
+            else:
+                response.streaming_content = stream.compress_sequence(response.streaming_content)
+            # The compressed size is unknown until the stream is finished
+            del response.headers['Content-Length']
+        else:
+            compressed = encoder.compress(response.content)
+            # Return the compressed content only if it's actually shorter
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag no longer matches the encoded bytes, so make it weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoder.name
+
+        return response
@@ -0,0 +1,83 @@
+"""
+Fast JSON parsing for request bodies.
+
+FastJSONParser accepts the same input as DRF's JSONParser, but decodes
+with orjson when it is installed and falls back to stdlib json otherwise.
+
+MessagePackParser and CBORParser accept the binary formats of
+renderers.py (Content-Type: application/msgpack or application/cbor).
+The decoded document is validated by the same serializers as JSON.
+"""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - optional dependency
+    cbor2 = None
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in replacement for rest_framework.parsers.JSONParser.
+    """
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        
+        try:
+            data = stream.read()
+            # orjson reads UTF-8 bytes directly; other charsets are decoded first
+            if codecs.lookup(encoding).name != 'utf-8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, LookupError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies (requires msgpack).
+    """
+    media_type = 'application/msgpack'
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        
+        try:
+            # Maps with non-string keys are rejected like JSON would
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=True)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % (str(exc) or 'invalid data'))
+
+
+class CBORParser(BaseParser):
+    """
+    Parses CBOR request bodies (requires cbor2).
+    """
+    media_type = 'application/cbor'
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        
+        try:
+            return cbor2.loads(stream.read())
+        except (ValueError, cbor2.CBORDecodeError) as exc:
+            raise ParseError('CBOR parse error - %s' % str(exc))
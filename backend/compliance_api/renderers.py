@@ -0,0 +1,135 @@
+"""
+Fast JSON rendering for API responses.
+
+FastJSONRenderer produces the same output as DRF's JSONRenderer, but uses
+orjson when it is installed. orjson encodes straight to bytes in C and
+handles datetimes natively, which is noticeably cheaper on large responses
+such as checklist details with thousands of items. Anything orjson cannot
+encode on its own (decimals, lazy strings, querysets, ...) is passed to
+DRF's JSONEncoder, so both renderers convert those types the same way.
+
+The output is not identical in every case:
+
+- NaN and Infinity are written as null. DRF's strict renderer raises
+  ValueError for them instead. No field in this API produces them
+  (average_completion is computed from counts with a zero guard), so
+  checking every float in Python on each response is not worth the cost.
+- orjson only supports two-space indentation. A client asking for any
+  other indent (Accept: application/json; indent=4) gets DRF's stdlib
+  output, and so does a subclass that sets strict = False.
+
+Without orjson the renderer simply falls back to DRF's stdlib json path.
+
+MessagePackRenderer and CBORRenderer render the same data as compact
+binary documents for clients that ask for them (Accept: application/msgpack
+or application/cbor). Keys are no longer repeated as quoted strings and
+numbers are not formatted as text, which makes large item lists smaller
+and cheaper to encode and decode. Values go through the same conversions
+as JSON, so a field holds the same value in every format: datetimes are
+DRF's ISO 8601 strings, decimals are numbers. They need the msgpack /
+cbor2 packages and are only registered when those are installed (see
+REST_FRAMEWORK in settings.py).
+"""
+
+import datetime
+import decimal
+import uuid
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - optional dependency
+    cbor2 = None
+
+
+# Reuse DRF's conversions for types orjson does not support natively
+_encode_fallback = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for rest_framework.renderers.JSONRenderer.
+    """
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        
+        # orjson only supports two-space indentation and has no NaN literal
+        if orjson is None or indent not in (None, 2) or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if data is None:
+            return b''
+        
+        # Same datetime format as DRF: UTC offsets are written as "Z"
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        
+        ret = orjson.dumps(data, default=_encode_fallback, option=option)
+        
+        # Match DRF, which escapes these for safe embedding in JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders responses as MessagePack (requires msgpack).
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        
+        if data is None:
+            return b''
+        # Strings as str, binary as bin (the MessagePack 2.0 types)
+        return msgpack.packb(data, default=_encode_fallback, use_bin_type=True)
+
+
+def _encode_cbor_fallback(encoder, value):
+    encoder.encode(_encode_fallback(value))
+
+
+# cbor2 has tags of its own for these; encode them as JSON does instead
+_CBOR_ENCODERS = {
+    datetime.datetime: _encode_cbor_fallback,
+    datetime.date: _encode_cbor_fallback,
+    datetime.time: _encode_cbor_fallback,
+    decimal.Decimal: _encode_cbor_fallback,
+    uuid.UUID: _encode_cbor_fallback,
+}
+
+
+class CBORRenderer(BaseRenderer):
+    """
+    Renders responses as CBOR (requires cbor2).
+    """
+    media_type = 'application/cbor'
+    format = 'cbor'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        
+        if data is None:
+            return b''
+        return cbor2.dumps(data, encoders=_CBOR_ENCODERS, default=_encode_cbor_fallback)
@@ -0,0 +1,185 @@
+"""
+Precomputed OpenAPI schema.
+
+Generating the schema walks every URL pattern, view and serializer, which
+takes far longer than any API request. The schema only changes when the
+code does, so it is built once - by `manage.py generate_openapi_schema` at
+image build time, or on the first request of a process if no file exists -
+and then served from memory with a strong ETag. Clients revalidate with
+If-None-Match and get a 304 until the next deploy changes the document.
+
+Settings:
+    OPENAPI_SCHEMA_DIR         - where schema.json / schema.yaml are written
+    OPENAPI_SCHEMA_PRECOMPUTED - serve the stored schema (default: not DEBUG);
+                                 when False the schema is generated per request
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+
+# Swagger/OpenAPI schema configuration
+API_INFO = openapi.Info(
+    title="Compliance Checklist API",
+    default_version='v1',
+    description="""API documentation for the Compliance Checklist application.
+
+    This API provides endpoints for:
+    - User authentication (register, login, logout)
+    - Checklist management (create, read, update, delete)
+    - Checklist item management (create, read, update, delete)
+    - Dashboard statistics
+
+    **Authentication**: Most endpoints require token-based authentication.
+
+    **Steps to get started:**
+    1. Use POST /api/auth/login/ with username and password to get your token
+    2. Click "Authorize" button and enter: Token YOUR_TOKEN_HERE
+    3. Try other endpoints with your token
+    """,
+    terms_of_service="https://www.example.com/terms/",
+    contact=openapi.Contact(email="contact@compliance.local"),
+    license=openapi.License(name="MIT License"),
+)
+
+# Stored document format -> codec that encodes it
+SCHEMA_CODECS = {
+    'json': OpenAPICodecJson,
+    'yaml': OpenAPICodecYaml,
+}
+
+SchemaDocument = namedtuple('SchemaDocument', ['content', 'etag'])
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def get_schema_dir():
+    return Path(getattr(settings, 'OPENAPI_SCHEMA_DIR', settings.BASE_DIR / 'openapi'))
+
+
+def is_precomputed():
+    return getattr(settings, 'OPENAPI_SCHEMA_PRECOMPUTED', not settings.DEBUG)
+
+
+def generate_schema():
+    """
+    Build the public schema without a request.
+
+    No host or scheme is recorded, so Swagger UI and ReDoc use the ones the
+    page was served from - the same file works behind any domain.
+    """
+    generator = OpenAPISchemaGenerator(API_INFO)
+    return generator.get_schema(request=None, public=True)
+
+
+def encode_schema(schema, schema_format):
+    return SCHEMA_CODECS[schema_format](validators=[]).encode(schema)
+
+
+def write_schema(directory=None):
+    """Generate the schema and write every format to directory. Returns the paths."""
+    directory = Path(directory or get_schema_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+
+    schema = generate_schema()
+    paths = []
+    for schema_format in SCHEMA_CODECS:
+        path = directory / f'schema.{schema_format}'
+        _write_atomic(path, encode_schema(schema, schema_format))
+        paths.append(path)
+    return paths
+
+
+def _write_atomic(path, content):
+
+    # Workers reading the file never see a half-written document
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def get_schema_document(schema_format):
+    """
+    Return the SchemaDocument for a format, loading it once per process.
+
+    Reads the file written by generate_openapi_schema; if there is none,
+    the schema is generated in-process (once, shared by all formats).
+    """
+    document = _documents.get(schema_format)
+    if document is not None:
+        return document
+
+    with _documents_lock:
+        if schema_format not in _documents:
+            path = get_schema_dir() / f'schema.{schema_format}'
+            try:
+                content = path.read_bytes()
+            except FileNotFoundError:
+                if 'schema' not in _documents:
+                    _documents['schema'] = generate_schema()
+                content = encode_schema(_documents['schema'], schema_format)
+            etag = '"%s"' % hashlib.sha256(content).hexdigest()
+            _documents[schema_format] = SchemaDocument(content, etag)
+        return _documents[schema_format]
+
+
+def clear_schema_cache():
+    with _documents_lock:
+        _documents.clear()
+
+
+_SchemaView = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+
+class SchemaView(_SchemaView):
+    """
+    drf-yasg schema view that serves the precomputed document.
+
+    Only the spec renderers (swagger.json, swagger.yaml and the
+    ?format=openapi fetch made by Swagger UI / ReDoc) are affected. The UI
+    pages themselves never generate the full schema.
+    """
+
+    def get(self, request, version='', format=None):
+
+        renderer = request.accepted_renderer
+        if not is_precomputed() or not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        schema_format = 'yaml' if issubclass(renderer.codec_class, OpenAPICodecYaml) else 'json'
+        document = get_schema_document(schema_format)
+
+        response = HttpResponse(
+            document.content,
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response.headers['ETag'] = document.etag
+        # Cacheable, but always revalidated - a deploy must be visible at once
+        patch_cache_control(response, public=True, no_cache=True)
+
+        # 304 Not Modified when the client already has this document
+        return get_conditional_response(request, etag=document.etag, response=response)
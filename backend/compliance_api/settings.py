@@ -5,6 +5,7 @@ This file contains all the configuration for our Django project.
 It includes database settings, installed apps, middleware, and security settings.
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
 
@@ -19,7 +20,8 @@ SECRET_KEY = 'django-insecure-dev-key-change-in-production-abc123xyz'
 
 # SECURITY WARNING: don't run with debug turned on in production!
 # Debug mode shows detailed error pages - useful for development
-DEBUG = True
+# Set DEBUG=False in the environment for production
+DEBUG = os.environ.get('DEBUG', 'True').lower() in ('true', '1', 'yes')
 
 # List of hosts that can access this Django application
 # In production, this should be set to your actual domain
@@ -53,15 +55,20 @@ INSTALLED_APPS = [
 # Order matters! Each request passes through these in order
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',  # Security enhancements
+    'compliance_api.middleware.CompressionMiddleware',  # gzip/br/zstd responses (must wrap body-changing middleware)
     'django.contrib.sessions.middleware.SessionMiddleware',  # Session management
     'corsheaders.middleware.CorsMiddleware',  # CORS handling (must be before CommonMiddleware)
     'django.middleware.common.CommonMiddleware',  # Common utilities
     'django.middleware.csrf.CsrfViewMiddleware',  # CSRF protection
     'django.contrib.auth.middleware.AuthenticationMiddleware',  # User authentication
+    'checklists.identity_map.IdentityMapMiddleware',  # One instance per row within a request
     'django.contrib.messages.middleware.MessageMiddleware',  # Message framework
     'django.middleware.clickjacking.XFrameOptionsMiddleware',  # Clickjacking protection
 ]
 
+# Responses smaller than this many bytes are not compressed
+COMPRESSION_MIN_SIZE = 1024
+
 # Root URL configuration - tells Django where to find our URL patterns
 ROOT_URLCONF = 'compliance_api.urls'
 
@@ -143,15 +150,106 @@ REST_FRAMEWORK = {
     ],
     
     # Renderer classes - how data is formatted in responses
+    # FastJSONRenderer uses orjson when installed, stdlib json otherwise
+    # The browsable API is only added in DEBUG (see below)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',  # JSON format
-        'rest_framework.renderers.BrowsableAPIRenderer',  # Nice web UI for testing
+        'compliance_api.renderers.FastJSONRenderer',  # JSON format
+    ],
+    
+    # Parser classes - how request bodies are read
+    'DEFAULT_PARSER_CLASSES': [
+        'compliance_api.parsers.FastJSONParser',  # JSON bodies (orjson when installed)
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     
     # Custom exception handler for user-friendly error messages
     'EXCEPTION_HANDLER': 'checklists.exceptions.custom_exception_handler',
 }
 
+# Binary formats for clients that ask for them (Accept / Content-Type:
+# application/msgpack or application/cbor) - only when the library is installed
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('compliance_api.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('compliance_api.parsers.MessagePackParser')
+if find_spec('cbor2') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('compliance_api.renderers.CBORRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('compliance_api.parsers.CBORParser')
+
+# Nice web UI for testing - only in development, it is costly to render
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append(
+        'rest_framework.renderers.BrowsableAPIRenderer'
+    )
+
+
+# Checklist item paging (see checklists/pagination.py)
+# Items embedded in checklist detail; the rest is fetched with the items_next cursor
+CHECKLIST_ITEMS_EMBED_SIZE = 50
+# Default and maximum page size of /api/checklists/<id>/items/
+CHECKLIST_ITEMS_PAGE_SIZE = 100
+CHECKLIST_ITEMS_MAX_PAGE_SIZE = 500
+
+
+# Change feed (/api/changes/) - default and maximum changes per page
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_PAGE_SIZE = 1000
+
+
+# Batch requests (/api/batch/, see checklists/batch.py) - sub-requests per batch
+BATCH_MAX_REQUESTS = 20
+
+
+# Archival (see checklists/archive.py) - completed checklists untouched for
+# this many days are moved to the archive by manage.py archive_checklists
+ARCHIVE_AFTER_DAYS = 365
+
+
+# Evidence attachments (see checklists/evidence.py) - where files are stored
+# (one per distinct content) and the largest upload accepted
+EVIDENCE_ROOT = BASE_DIR / 'evidence'
+EVIDENCE_MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50 MB
+# Behind nginx, let it send the files: an internal location that serves EVIDENCE_ROOT
+# EVIDENCE_ACCEL_REDIRECT = '/protected-evidence/'
+
+
+# Single-flight coalescing of stats computations (see checklists/singleflight.py)
+# Set a directory (POSIX only) to also coalesce across worker processes with file locks
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR') or None
+
+
+# Under ASGI, serve the hot read endpoints with async views (see checklists/async_views.py)
+ASYNC_READ_VIEWS = True
+
+
+# Live updates (/api/events/, see checklists/broker.py) - served by compliance_api.asgi
+# LocalBackend reaches one process; use checklists.broker.RedisBackend with several workers
+EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'checklists.broker.LocalBackend')
+EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+# Events buffered per stream; a stream that falls further behind is told to resync
+EVENTS_QUEUE_SIZE = 100
+# Keep-alive comment interval, and how long a stream lives before the browser reconnects
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_STREAM_MAX_AGE = 300
+# Writes within this many seconds share one stats delta
+EVENTS_STATS_DEBOUNCE = 0.5
+# Reconnect delay sent to EventSource, in milliseconds
+EVENTS_RETRY_MS = 3000
+
+
+# Idempotency-Key replay (see checklists/idempotency.py)
+# Stored responses are kept this many seconds - run `manage.py clear_idempotency_keys` to purge
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# How long a duplicate waits for the in-flight original before getting a 409
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+
+
+# OpenAPI schema (see compliance_api/schema.py)
+# Written by `manage.py generate_openapi_schema` and served with an ETag
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+# In DEBUG the schema is generated per request so code changes show up at once
+OPENAPI_SCHEMA_PRECOMPUTED = not DEBUG
+
 
 # CORS settings
 # Allow our React frontend to make requests to the Django backend
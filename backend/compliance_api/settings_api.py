@@ -0,0 +1,73 @@
+"""
+Settings profile for API-only workers.
+
+The API authenticates with tokens, so API workers do not need sessions,
+CSRF, the messages framework, clickjacking headers, the admin or the
+Swagger UI. This profile removes them from the middleware chain and the
+app registry, which makes every request pass through fewer layers and
+makes worker startup import less code.
+
+Run the API workers with:
+    DJANGO_SETTINGS_MODULE=compliance_api.settings_api
+
+and keep one admin worker on compliance_api.settings for /admin/,
+/swagger/, /redoc/ and management commands (migrate, createsuperuser,
+generate_openapi_schema). Both profiles share the same database.
+
+Compare the two with `python manage.py benchmark_settings_profile`.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+
+# Apps the API itself needs - no admin, sessions, messages, static files or drf_yasg
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    
+    'rest_framework',
+    'rest_framework.authtoken',
+    'corsheaders',
+    'django_filters',
+    
+    'users',
+    'checklists',
+]
+
+# Token authentication is done by DRF, so the session, CSRF, auth,
+# messages and clickjacking middleware have nothing to do here
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',  # Security enhancements
+    'compliance_api.middleware.CompressionMiddleware',  # gzip/br/zstd responses (must wrap body-changing middleware)
+    'corsheaders.middleware.CorsMiddleware',  # CORS handling (must be before CommonMiddleware)
+    'django.middleware.common.CommonMiddleware',  # Common utilities
+    'checklists.identity_map.IdentityMapMiddleware',  # One instance per row within a request
+]
+
+# API routes only - /admin/, /swagger/ and /redoc/ live on the admin worker
+ROOT_URLCONF = 'compliance_api.urls_api'
+
+# No admin or messages templates to render
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,  # rest_framework templates for the browsable API in DEBUG
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+# The browsable API needs sessions and static files, so JSON (and the binary
+# formats, when installed) only
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_RENDERER_CLASSES': [
+        renderer for renderer in REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']  # noqa: F405
+        if renderer != 'rest_framework.renderers.BrowsableAPIRenderer'
+    ],
+}
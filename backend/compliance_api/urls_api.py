@@ -0,0 +1,18 @@
+"""
+URL configuration for API workers (compliance_api.settings_api).
+
+Same API routes as compliance_api.urls, without the Django admin and the
+Swagger/ReDoc pages - those are served by the admin worker.
+"""
+
+from django.urls import path, include
+
+urlpatterns = [
+    # User authentication endpoints (login, register, logout)
+    # Prefix: /api/auth/
+    path('api/auth/', include('users.urls')),
+    
+    # Checklist and item management endpoints
+    # Prefix: /api/
+    path('api/', include('checklists.urls')),
+]
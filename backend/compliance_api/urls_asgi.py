@@ -0,0 +1,35 @@
+"""
+URL configuration for requests served by compliance_api.asgi.
+
+The async read views (checklists/async_views.py) come first; every other
+path - and every request those views pass on - is handled by ROOT_URLCONF,
+so this works with both settings profiles.
+"""
+
+from django.conf import settings
+from django.urls import path, include
+
+from checklists import async_views
+
+urlpatterns = [
+    # GET /api/auth/health/ - Health check
+    path('api/auth/health/', async_views.health_check),
+    
+    # GET /api/stats/ - Dashboard statistics
+    path('api/stats/', async_views.dashboard_stats),
+    
+    # GET /api/checklists/ - List checklists (POST falls through to the DRF view)
+    path('api/checklists/', async_views.checklist_list),
+    
+    # GET /api/checklists/<id>/ - Checklist detail (writes fall through)
+    path('api/checklists/<int:pk>/', async_views.checklist_detail),
+    
+    # GET /api/checklists/<id>/items/ - Cursor-paginated items
+    path('api/checklists/<int:pk>/items/', async_views.checklist_items),
+    
+    # GET /api/items/ - List items (POST falls through)
+    path('api/items/', async_views.item_list),
+    
+    # Everything else
+    path('', include(settings.ROOT_URLCONF)),
+]
@@ -10,7 +10,7 @@ from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from drf_yasg.utils import swagger_auto_schema
+from compliance_api.apidocs import swagger_auto_schema
 
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
 from .services import UserService, AuthenticationService
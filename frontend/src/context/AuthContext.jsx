@@ -1,5 +1,5 @@
-import React, { createContext, useState, useContext, useEffect } from "react";
-import { authAPI } from "../services/api";
+import React, { createContext, useState, useContext, useEffect, useRef } from "react";
+import { authAPI, bootstrapAPI } from "../services/api";
 
 // Create the context
 const AuthContext = createContext(null);
@@ -11,6 +11,12 @@ export const AuthProvider = ({ children }) => {
 
   const [loading, setLoading] = useState(true);
 
+  // Server config from /api/bootstrap/
+  const [config, setConfig] = useState(null);
+
+  // The rest of the bootstrap response (stats, checklists) until a page takes it
+  const bootstrapRef = useRef({});
+
   useEffect(() => {
     checkAuth();
   }, []);
@@ -21,9 +27,10 @@ export const AuthProvider = ({ children }) => {
 
     if (token && savedUser) {
       try {
-        // Validate the token by fetching current user
-        const response = await authAPI.getCurrentUser();
-        setUser(response.data.user || response.data);
+        // Validate the token - and load what the first page needs in the same request
+        const response = await bootstrapAPI.get();
+        applyBootstrap(response.data);
+        setUser(response.data.user);
         setIsAuthenticated(true);
       } catch (error) {
         // Token is invalid, clear it
@@ -39,6 +46,28 @@ export const AuthProvider = ({ children }) => {
     setLoading(false);
   };
 
+  const applyBootstrap = ({ stats, checklists, config }) => {
+    bootstrapRef.current = { stats, checklists };
+    setConfig(config);
+  };
+
+  // Fetch the bootstrap data after login/register; pages fall back to their own requests if it fails
+  const loadBootstrap = async () => {
+    try {
+      const response = await bootstrapAPI.get();
+      applyBootstrap(response.data);
+    } catch (error) {
+      console.error("Bootstrap failed:", error);
+    }
+  };
+
+  // Hands out a part of the bootstrap response once; later page loads fetch fresh data
+  const takeBootstrap = (part) => {
+    const data = bootstrapRef.current[part];
+    delete bootstrapRef.current[part];
+    return data;
+  };
+
   const login = async (email, password) => {
     try {
       const response = await authAPI.login({ email, password });
@@ -46,6 +75,7 @@ export const AuthProvider = ({ children }) => {
 
       localStorage.setItem("token", token);
       localStorage.setItem("user", JSON.stringify(user));
+      await loadBootstrap();
 
       // Update state
       setUser(user);
@@ -66,6 +96,7 @@ export const AuthProvider = ({ children }) => {
       // Store token and user in localStorage
       localStorage.setItem("token", token);
       localStorage.setItem("user", JSON.stringify(user));
+      await loadBootstrap();
 
       // Update state
       setUser(user);
@@ -88,6 +119,8 @@ export const AuthProvider = ({ children }) => {
       // Clear local storage and state
       localStorage.removeItem("token");
       localStorage.removeItem("user");
+      bootstrapRef.current = {};
+      setConfig(null);
       setUser(null);
       setIsAuthenticated(false);
     }
@@ -98,6 +131,8 @@ export const AuthProvider = ({ children }) => {
     isAuthenticated,
     user,
     loading,
+    config,
+    takeBootstrap,
     login,
     register,
     logout,
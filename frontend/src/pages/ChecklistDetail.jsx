@@ -24,6 +24,8 @@ const ChecklistDetail = () => {
   });
   const [deleteChecklistModal, setDeleteChecklistModal] = useState(false);
   const [itemSearchTerm, setItemSearchTerm] = useState(""); // Search items
+  const [itemsNext, setItemsNext] = useState(null); // Cursor link to the next page of items
+  const [loadingMoreItems, setLoadingMoreItems] = useState(false);
 
   // New item form data
   const [newItem, setNewItem] = useState({
@@ -41,7 +43,11 @@ const ChecklistDetail = () => {
   const fetchChecklist = async () => {
     try {
       const response = await checklistAPI.getById(id);
-      setChecklist(response.data);
+      const data = response.data;
+
+      // Detail embeds only the first page of items - the rest load on demand
+      setChecklist({ ...data, items: data.items || [] });
+      setItemsNext(data.items_next || null);
     } catch (err) {
       console.error("Error fetching checklist:", err);
       setError("Failed to load checklist");
@@ -50,6 +56,25 @@ const ChecklistDetail = () => {
     }
   };
 
+  const loadMoreItems = async () => {
+    if (!itemsNext) return;
+    setLoadingMoreItems(true);
+    try {
+      const page = await checklistAPI.getItemsPage(itemsNext);
+      setChecklist((prev) => ({
+        ...prev,
+        items: prev.items.concat(page.data.items),
+      }));
+      setItemsNext(page.data.next);
+    } catch (err) {
+      console.error("Error loading items:", err);
+      setError("Failed to load more items");
+      setTimeout(() => setError(""), 3000);
+    } finally {
+      setLoadingMoreItems(false);
+    }
+  };
+
   const handleAddItem = async (e) => {
     e.preventDefault();
 
@@ -757,6 +782,21 @@ const ChecklistDetail = () => {
             )}
           </p>
         )}
+
+        {itemsNext && (
+          <div className="text-center mt-4">
+            <p className="text-sm text-gray-500 mb-2">
+              Showing {checklist.items.length} of {checklist.total_items} items
+            </p>
+            <button
+              onClick={loadMoreItems}
+              disabled={loadingMoreItems}
+              className="btn btn-secondary"
+            >
+              {loadingMoreItems ? "Loading..." : "Load more items"}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Delete Item Confirmation Modal */}
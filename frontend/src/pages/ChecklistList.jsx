@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import { checklistAPI } from "../services/api";
+import { useAuth } from "../context/AuthContext";
 import LoadingSpinner from "../components/LoadingSpinner";
 import StatusBadge from "../components/StatusBadge";
 import Modal from "../components/Modal";
@@ -9,6 +10,7 @@ import ErrorAlert from "../components/ErrorAlert";
 
 const ChecklistList = () => {
   const navigate = useNavigate();
+  const { takeBootstrap } = useAuth();
   const [checklists, setChecklists] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
@@ -37,6 +39,14 @@ const ChecklistList = () => {
   }, [filter]);
 
   const fetchChecklists = async () => {
+    // Right after login the unfiltered first page came with /api/bootstrap/
+    const initialPage = filter === "all" ? takeBootstrap("checklists") : null;
+    if (initialPage) {
+      setChecklists(initialPage.results);
+      setLoading(false);
+      return;
+    }
+
     try {
       setLoading(true);
       const params = {};
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { dashboardAPI } from '../services/api';
+import { useAuth } from '../context/AuthContext';
 import LoadingSpinner from '../components/LoadingSpinner';
 import StatCard from '../components/StatCard';
 import ErrorAlert from '../components/ErrorAlert';
@@ -10,8 +11,16 @@ const Dashboard = () => {
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const { takeBootstrap } = useAuth();
 
   useEffect(() => {
+    // Right after login the stats came with /api/bootstrap/
+    const initialStats = takeBootstrap('stats');
+    if (initialStats) {
+      setStats(initialStats);
+      setLoading(false);
+      return;
+    }
     fetchStats();
   }, []);
 
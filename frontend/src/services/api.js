@@ -113,10 +113,36 @@ export const checklistAPI = {
   
   delete: (id) => api.delete(`/api/checklists/${id}/`),
 
-  getItems: (checklistId) => api.get(`/api/checklists/${checklistId}/items/`),
+  getItems: (checklistId, params = {}) => api.get(`/api/checklists/${checklistId}/items/`, { params }),
+
+  // Follow an items_next / next cursor link returned by the API
+  getItemsPage: (url) => api.get(url),
   
 
   addItem: (checklistId, data) => api.post(`/api/checklists/${checklistId}/add-item/`, data),
+
+  // Copy with all items (reset to pending) - data: { name, due_date, status, keep_owners }
+  clone: (id, data = {}) => api.post(`/api/checklists/${id}/clone/`, data),
+
+  // Move an archived checklist (getAll({ include_archived: 1 })) back to the live ones
+  restore: (id) => api.post(`/api/checklists/${id}/restore/`),
+};
+
+
+export const templateAPI = {
+
+  getAll: (params = {}) => api.get('/api/templates/', { params }),
+
+  getById: (id) => api.get(`/api/templates/${id}/`),
+
+  // data: { name, description, due_in_days, items } or { name, checklist, keep_owners }
+  create: (data) => api.post('/api/templates/', data),
+
+  patch: (id, data) => api.patch(`/api/templates/${id}/`, data),
+
+  delete: (id) => api.delete(`/api/templates/${id}/`),
+
+  instantiate: (id, data = {}) => api.post(`/api/templates/${id}/instantiate/`, data),
 };
 
 
@@ -138,9 +164,57 @@ export const itemAPI = {
 };
 
 
+export const evidenceAPI = {
+
+  list: (itemId) => api.get(`/api/items/${itemId}/attachments/`),
+
+  // file: a File from an <input type="file">; onUploadProgress receives axios progress events
+  upload: (itemId, file, onUploadProgress) => {
+    const form = new FormData();
+    form.append('file', file);
+    // Overrides the JSON default; axios adds the multipart boundary
+    return api.post(`/api/items/${itemId}/attachments/`, form, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      onUploadProgress,
+    });
+  },
+
+  // As a Blob - the download needs the auth header, so it can't be a plain link
+  download: (id) => api.get(`/api/attachments/${id}/download/`, { responseType: 'blob' }),
+
+  delete: (id) => api.delete(`/api/attachments/${id}/`),
+};
+
+
 export const dashboardAPI = {
 
   getStats: () => api.get('/api/stats/'),
 };
 
+
+export const bootstrapAPI = {
+  // Current user, dashboard stats, first page of checklists and server config in one request
+  get: () => api.get('/api/bootstrap/'),
+};
+
+
+export const batchAPI = {
+  // requests: [{ id, method, path, body, headers }] - results come back in order in response.responses
+  run: (requests, { atomic = false } = {}) => api.post('/api/batch/', { requests, atomic }),
+};
+
+
+export const changesAPI = {
+  // Changes after a cursor - pass back response.cursor until has_more is false
+  getSince: (since = 0, params = {}) => api.get('/api/changes/', { params: { since, ...params } }),
+};
+
+
+export const eventsAPI = {
+  // Live "stats", "change" and "resync" events - EventSource can't send headers, so the token goes in the URL
+  open: () => new EventSource(
+    `${API_BASE_URL}/api/events/?token=${encodeURIComponent(localStorage.getItem('token') || '')}`
+  ),
+};
+
 export default api;